@@ -0,0 +1,234 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+# Waiting callers are admitted in priority order, then arrival order:
+# short questions and sessions that have made few calls go first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+def resolve(future):
+    """Wake a coroutine waiting on future"""
+    if not future.done():
+        future.set_result(True)
+
+
+class Rejected(Exception):
+    """Raised when a call is not admitted; reason is 'rate_limited', 'queue_full' or 'queue_timeout'"""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+
+class TokenBucket:
+    """rate tokens a second, holding at most burst; a rate of 0 or less never runs out"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated', 'taken')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = now
+        self.taken = 0
+
+    def refill(self, now):
+        """Add the tokens earned since the last refill"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now):
+        """Take one token if there is one; return whether it was taken"""
+        if self.rate > 0:
+            self.refill(now)
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+        self.taken += 1
+        return True
+
+    def wait_time(self, now):
+        """Seconds until a token is available"""
+        if self.rate <= 0:
+            return 0.0
+        self.refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class Waiter:
+    """A queued caller; notify() wakes it once it has been granted a slot"""
+
+    __slots__ = ('notify', 'granted', 'cancelled')
+
+    def __init__(self, notify):
+        self.notify = notify
+        self.granted = False
+        self.cancelled = False
+
+
+class AdmissionControl:
+    """Decide which upstream calls may start now, which wait, and which are refused (thread version)
+
+    Three limits apply. Each session has a token bucket (session_rate calls
+    a second, bursts of session_burst); a session that has used it up is
+    refused straight away with reason 'rate_limited'. All calls share a
+    global bucket (global_rate, global_burst) standing in for the upstream
+    quota, and at most max_concurrent run at once. Calls that the global
+    limits hold back wait in a priority queue of at most max_queue; beyond
+    that they are refused with 'queue_full', and after queue_timeout seconds
+    of waiting with 'queue_timeout'. Callers answer refused calls some
+    other way instead of waiting on the upstream.
+    """
+
+    def __init__(self, max_concurrent=16, max_queue=64, queue_timeout=5.0, global_rate=0.0, global_burst=10,
+                 session_rate=0.5, session_burst=10, new_session_calls=3, max_sessions=10000):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.new_session_calls = new_session_calls
+        self.max_sessions = max_sessions
+        self.global_bucket = TokenBucket(global_rate, global_burst, time.monotonic())
+        self.sessions = OrderedDict()
+        self.queue = []
+        self.order = itertools.count()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {'rate_limited': 0, 'queue_full': 0, 'queue_timeout': 0}
+
+    def reject(self, reason, message):
+        """Count a refusal and raise it (lock held)"""
+        self.rejected[reason] += 1
+        raise Rejected(reason, message)
+
+    def enter(self, session_id, short, notify):
+        """Admit a call now (return None) or queue it (return its Waiter); raise Rejected if refused"""
+        now = time.monotonic()
+        with self.lock:
+            priority = PRIORITY_HIGH if short else PRIORITY_NORMAL
+            if session_id is not None:
+                bucket = self.sessions.get(session_id)
+                if bucket is None:
+                    bucket = self.sessions[session_id] = TokenBucket(self.session_rate, self.session_burst, now)
+                    while len(self.sessions) > self.max_sessions:
+                        self.sessions.popitem(last=False)
+                else:
+                    self.sessions.move_to_end(session_id)
+                if bucket.taken < self.new_session_calls:
+                    priority = PRIORITY_HIGH
+                if not bucket.take(now):
+                    self.reject('rate_limited', f"session over {self.session_rate:g} upstream calls a second")
+
+            if not self.waiting and self.running < self.max_concurrent and self.global_bucket.take(now):
+                self.running += 1
+                self.admitted += 1
+                return None
+            if self.waiting >= self.max_queue:
+                self.reject('queue_full', f"{self.waiting} calls already waiting")
+            waiter = Waiter(notify)
+            heapq.heappush(self.queue, (priority, next(self.order), waiter))
+            self.waiting += 1
+            self.queued += 1
+            return waiter
+
+    def dispatch(self):
+        """Grant free slots to waiters in priority order (lock held); return seconds until a token, or None"""
+        now = time.monotonic()
+        while self.queue and self.running < self.max_concurrent:
+            waiter = self.queue[0][2]
+            if waiter.cancelled:
+                heapq.heappop(self.queue)
+                continue
+            if not self.global_bucket.take(now):
+                return self.global_bucket.wait_time(now)
+            heapq.heappop(self.queue)
+            self.waiting -= 1
+            self.running += 1
+            self.admitted += 1
+            waiter.granted = True
+            waiter.notify()
+        return None
+
+    def poll(self, waiter, deadline):
+        """Admit waiters that can go; return seconds waiter should sleep, None once granted; raise on timeout"""
+        with self.lock:
+            delay = self.dispatch()
+            if waiter.granted:
+                return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                waiter.cancelled = True
+                self.waiting -= 1
+                self.reject('queue_timeout', f"not admitted within {self.queue_timeout:g}s")
+            return min(remaining, delay) if delay is not None else remaining
+
+    def acquire(self, session_id=None, short=False):
+        """Block until the call may start, then hold a slot until release(); raise Rejected if it is refused"""
+        event = threading.Event()
+        waiter = self.enter(session_id, short, event.set)
+        if waiter is None:
+            return
+        deadline = time.monotonic() + self.queue_timeout
+        while True:
+            delay = self.poll(waiter, deadline)
+            if delay is None:
+                return
+            event.wait(delay)
+
+    def release(self):
+        """Free the slot of a finished call and admit the next waiter"""
+        with self.lock:
+            self.running -= 1
+            self.dispatch()
+
+    def stats(self):
+        """Return a snapshot of the admission counters"""
+        with self.lock:
+            return {
+                'running': self.running,
+                'waiting': self.waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': dict(self.rejected),
+                'sessions': len(self.sessions)
+            }
+
+
+class AsyncAdmissionControl(AdmissionControl):
+    """AdmissionControl for coroutines: waiting for a slot does not block the event loop"""
+
+    async def acquire(self, session_id=None, short=False):
+        """Wait until the call may start; raise Rejected if it is refused"""
+        future = asyncio.get_running_loop().create_future()
+        waiter = self.enter(session_id, short, functools.partial(resolve, future))
+        if waiter is None:
+            return
+        deadline = time.monotonic() + self.queue_timeout
+        try:
+            while True:
+                delay = self.poll(waiter, deadline)
+                if delay is None:
+                    return
+                await asyncio.wait([future], timeout=delay)
+        except asyncio.CancelledError:
+            # A caller that went away gives back a slot it was just granted
+            with self.lock:
+                if waiter.granted:
+                    self.running -= 1
+                    self.dispatch()
+                elif not waiter.cancelled:
+                    waiter.cancelled = True
+                    self.waiting -= 1
+            raise
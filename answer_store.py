@@ -0,0 +1,157 @@
+import atexit
+import os
+import threading
+import time
+
+from cache import SQLiteConnections
+
+
+class AnswerStore:
+    """Model answers kept on disk, so a restart does not begin with an empty cache
+
+    Answers are stored per (normalized question, version) in a SQLite file
+    in WAL mode. version identifies the model and prompt that produced
+    them, so changing either makes older answers invisible; prune() then
+    deletes them. save() and record_hit() only queue the change: a
+    background thread writes queued changes in one transaction every
+    flush_interval seconds, or sooner once max_batch are waiting, so no
+    request waits on the disk. warm() loads the most used answers back
+    at startup.
+    """
+
+    def __init__(self, path, version, flush_interval=1.0, max_batch=256, max_entries=100000, busy_timeout=5.0):
+        self.path = path
+        self.version = version
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_entries = max_entries
+        self.connections = SQLiteConnections(path, busy_timeout)
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.writes = {}
+        self.hits = {}
+        self.writer = None
+        self.writer_pid = None
+        self.flushed = 0
+        self.flushes = 0
+        self.lookups = 0
+        self.found = 0
+        self.warmed = 0
+        self.errors = 0
+
+        db = self.connections.get()
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('CREATE TABLE IF NOT EXISTS answers (key TEXT NOT NULL, version TEXT NOT NULL, html TEXT NOT NULL, '
+                   'hits INTEGER NOT NULL DEFAULT 0, written REAL NOT NULL, PRIMARY KEY (key, version))')
+        db.execute('CREATE INDEX IF NOT EXISTS answers_hot ON answers (version, hits)')
+        atexit.register(self.flush)
+
+    def save(self, key, html):
+        """Queue an answer to be written"""
+        with self.lock:
+            self.writes[key] = html
+            queued = len(self.writes) + len(self.hits)
+        self.ensure_writer(queued)
+
+    def record_hit(self, key):
+        """Queue one more use of a stored answer, which ranks it for warm()"""
+        with self.lock:
+            self.hits[key] = self.hits.get(key, 0) + 1
+            queued = len(self.writes) + len(self.hits)
+        self.ensure_writer(queued)
+
+    def ensure_writer(self, queued):
+        """Start the writer thread in this process if needed; wake it when a batch is full"""
+        if self.writer_pid != os.getpid():
+            with self.lock:
+                if self.writer_pid != os.getpid():
+                    self.writer = threading.Thread(target=self.run_writer, name='answer-store', daemon=True)
+                    self.writer_pid = os.getpid()
+                    self.writer.start()
+        if queued >= self.max_batch:
+            self.wake.set()
+
+    def run_writer(self):
+        """Flush queued changes every flush_interval seconds, or when woken"""
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every queued change in one transaction"""
+        with self.lock:
+            writes, self.writes = self.writes, {}
+            hits, self.hits = self.hits, {}
+        if not writes and not hits:
+            return
+        now = time.time()
+        db = self.connections.get()
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            db.executemany('INSERT INTO answers (key, version, html, written) VALUES (?, ?, ?, ?) '
+                           'ON CONFLICT (key, version) DO UPDATE SET html = excluded.html, written = excluded.written',
+                           [(key, self.version, html, now) for key, html in writes.items()])
+            db.executemany('UPDATE answers SET hits = hits + ? WHERE key = ? AND version = ?',
+                           [(count, key, self.version) for key, count in hits.items()])
+            db.execute('COMMIT')
+        except Exception as e:
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            self.errors += 1
+            print(f"Answer store write failed, dropping {len(writes)} answer(s): {e}")
+            return
+        self.flushed += len(writes)
+        self.flushes += 1
+
+    def lookup(self, key):
+        """Return the stored answer for key under the current version, or None"""
+        with self.lock:
+            self.lookups += 1
+            html = self.writes.get(key)
+        if html is None:
+            row = self.connections.get().execute('SELECT html FROM answers WHERE key = ? AND version = ?',
+                                                 (key, self.version)).fetchone()
+            html = row[0] if row else None
+        if html is not None:
+            with self.lock:
+                self.found += 1
+        return html
+
+    def warm(self, load, limit=500, seconds=2.0):
+        """Pass the most used answers to load(key, html), stopping after limit or seconds; return the count"""
+        deadline = time.monotonic() + seconds
+        loaded = 0
+        rows = self.connections.get().execute(
+            'SELECT key, html FROM answers WHERE version = ? ORDER BY hits DESC, written DESC LIMIT ?',
+            (self.version, limit))
+        for key, html in rows:
+            if time.monotonic() >= deadline:
+                break
+            load(key, html)
+            loaded += 1
+        self.warmed += loaded
+        return loaded
+
+    def prune(self):
+        """Delete answers from other versions, and the least used beyond max_entries; return the count"""
+        db = self.connections.get()
+        deleted = db.execute('DELETE FROM answers WHERE version != ?', (self.version,)).rowcount
+        deleted += db.execute('DELETE FROM answers WHERE rowid IN (SELECT rowid FROM answers '
+                              'ORDER BY hits DESC, written DESC LIMIT -1 OFFSET ?)', (self.max_entries,)).rowcount
+        return deleted
+
+    def stats(self):
+        """Return a snapshot of the store counters"""
+        with self.lock:
+            return {
+                'path': self.path,
+                'version': self.version,
+                'queued': len(self.writes) + len(self.hits),
+                'written': self.flushed,
+                'flushes': self.flushes,
+                'write_errors': self.errors,
+                'lookups': self.lookups,
+                'found': self.found,
+                'warmed': self.warmed
+            }
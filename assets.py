@@ -0,0 +1,156 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from collections import namedtuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# One file as served: its variants map a content coding ('identity',
+# 'gzip', 'br') to (body, etag)
+Asset = namedtuple('Asset', ['content_type', 'cache_control', 'variants'])
+AssetReply = namedtuple('AssetReply', ['status', 'body', 'headers'])
+
+# Fingerprinted names change whenever the content does, so browsers may keep
+# them for a year without asking again. Everything else is revalidated with
+# its ETag on every use, which costs a 304 and no body when nothing changed
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# Smaller files gain less from compression than the header costs
+MIN_COMPRESS_BYTES = 256
+# Preferred first when the client accepts several
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+REFERENCE_PATTERN = re.compile(r'(?P<attr>href|src)="(?P<path>[^":?#]+)"')
+
+
+def fingerprinted_name(path, digest):
+    """app.js -> app.<digest>.js"""
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.{digest}{extension}"
+
+
+def compress(body, encoding):
+    """Compress body at the highest level; it only happens once per file"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=11)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows (q > 0)"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def etag_matches(header, etag):
+    """Whether an If-None-Match header names etag (weak comparison, as RFC 9110 asks)"""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+class AssetBundle:
+    """The files under root, loaded once with fingerprinted names and precompressed variants
+
+    Every file is served under its own name and under a fingerprinted one
+    (app.js and app.<sha256 prefix>.js). References in the entry page are
+    rewritten to the fingerprinted names, so the page is the only thing a
+    returning browser asks for, and that usually ends in a 304. gzip (and
+    brotli, when the brotli package is installed) variants are built here,
+    not per request. Files changed on disk are picked up on restart.
+    """
+
+    def __init__(self, root, entry='index.html', digest_length=10):
+        self.root = root
+        self.entry = entry
+        self.assets = {}
+        self.fingerprints = {}
+
+        for directory, _, names in os.walk(root):
+            for name in sorted(names):
+                path = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/')
+                if path == entry:
+                    continue
+                with open(os.path.join(root, path), 'rb') as f:
+                    body = f.read()
+                digest = hashlib.sha256(body).hexdigest()[:digest_length]
+                hashed = fingerprinted_name(path, digest)
+                self.fingerprints[path] = hashed
+                self.assets[path] = self.build(path, body, digest, REVALIDATE)
+                self.assets[hashed] = self.assets[path]._replace(cache_control=IMMUTABLE)
+
+        entry_path = os.path.join(root, entry)
+        if os.path.exists(entry_path):
+            with open(entry_path, encoding='utf-8') as f:
+                page = REFERENCE_PATTERN.sub(self.rewrite_reference, f.read()).encode('utf-8')
+            self.assets[entry] = self.build(entry, page, hashlib.sha256(page).hexdigest()[:digest_length],
+                                            REVALIDATE)
+
+    def build(self, path, body, digest, cache_control):
+        """Make the Asset for one file, keeping compressed variants only when they are smaller"""
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        variants = {'identity': (body, f'"{digest}"')}
+        if content_type.startswith(COMPRESSIBLE_TYPES) and len(body) >= MIN_COMPRESS_BYTES:
+            for encoding in ENCODINGS:
+                compressed = compress(body, encoding)
+                if len(compressed) < len(body):
+                    variants[encoding] = (compressed, f'"{digest}-{encoding}"')
+        return Asset(content_type, cache_control, variants)
+
+    def rewrite_reference(self, match):
+        """Point a local href or src at the fingerprinted name"""
+        hashed = self.fingerprints.get(match.group('path').lstrip('/'))
+        if hashed is None:
+            return match.group(0)
+        return f'{match.group("attr")}="/{hashed}"'
+
+    def url_for(self, path):
+        """The fingerprinted URL of a file, or its plain URL if it is not in the bundle"""
+        return '/' + self.fingerprints.get(path, path)
+
+    def respond(self, path, accept_encoding='', if_none_match=''):
+        """Pick the best variant of path for the client; return an AssetReply, or None if there is no such file"""
+        asset = self.assets.get(path.lstrip('/') or self.entry)
+        if asset is None:
+            return None
+        accepted = accepted_encodings(accept_encoding)
+        encoding = next((encoding for encoding in ENCODINGS if encoding in asset.variants and encoding in accepted),
+                        'identity')
+        body, etag = asset.variants[encoding]
+        headers = {'ETag': etag, 'Cache-Control': asset.cache_control, 'Vary': 'Accept-Encoding'}
+        if etag_matches(if_none_match, etag):
+            return AssetReply(304, b'', headers)
+        headers['Content-Type'] = asset.content_type
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return AssetReply(200, body, headers)
+
+    def stats(self):
+        """Files in the bundle with their sizes per variant"""
+        return {
+            path: {encoding: len(body) for encoding, (body, _) in asset.variants.items()}
+            for path, asset in self.assets.items()
+            if path not in self.fingerprints.values()
+        }
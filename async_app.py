@@ -0,0 +1,729 @@
+import asyncio
+import functools
+import json
+import os
+import time
+import uuid
+
+import aiohttp
+from aiohttp import web
+
+import app as chat_app
+from app import (ADMISSION_SETTINGS, BATCH_CONCURRENCY, BATCH_TIMEOUT, LATENCY_BUDGET, OUT_OF_SCOPE_RESPONSE,
+                 PORT, HUGGINGFACE_API_KEY, ROUTER_SETTINGS, ChatAnswer, admission_stage, backend_calls,
+                 batch_results, batch_timeout, cache_answer, cache_report, cache_stage, cached_answer, chat_answers,
+                 chat_in_flight, chat_seconds, classify_batch, conversation_cache_key, conversation_context,
+                 conversations, fallback_reason, fallback_stage, fixtures_stage, format_stage, inference_client,
+                 is_tournament_related, is_usable_response, json_object, leaderboards, metrics, model_backends, offline_fallbacks,
+                 parse_chat_batch, record_answer, record_batch, remember_turn, request_session, scope_stage,
+                 set_session_cookie, swiss_tournaments, upstream_in_flight, upstream_responses, upstream_stage)
+from fixtures import build_fixtures_response
+from scheduler import build_schedule_response
+from formatting import StreamingFormatter, format_response
+from prompts import SHORT, prompt_variant
+from admission import AsyncAdmissionControl, Rejected
+from backends import UpstreamStatus
+from router import AsyncModelRouter
+from offline import answer_fixture_question, get_offline_response
+from breaker import CircuitOpen
+from metrics import CONTENT_TYPE
+from singleflight import AsyncSingleFlight, CallAbandoned, TooManyWaiters
+from standings import leaderboard_from_request, page_from_request, results_from_request
+from swiss import (pair_from_request, report_from_request, round_from_request, standings_from_request,
+                   swiss_from_request)
+from upstream import RETRY_STATUSES, UpstreamTiming, jittered_backoff, parse_stream_line, record_outcome
+
+# Upper bound on upstream generations in flight; further requests wait their turn
+UPSTREAM_CONCURRENCY = int(os.getenv('ASYNC_UPSTREAM_CONCURRENCY', 256))
+
+# Upstream calls from this app are admitted like app.admission's, sized to
+# the client's concurrency; /metrics adds its queue to the Flask app's
+admission = AsyncAdmissionControl(max_concurrent=int(os.getenv('ADMISSION_MAX_CONCURRENT', UPSTREAM_CONCURRENCY)),
+                                  **ADMISSION_SETTINGS)
+chat_app.admission_controls.append(admission)
+
+# Questions are routed over app.model_backends as in the Flask app, hedges
+# running as tasks. The first backend uses the app's client; create_app
+# opens a client for each of the others
+model_router = AsyncModelRouter(model_backends, **ROUTER_SETTINGS)
+backend_clients = {}
+
+# Identical questions asked at the same time share one upstream call
+inflight_requests = AsyncSingleFlight(max_waiters=int(os.getenv('COALESCE_MAX_WAITERS', 1000)))
+
+# Generations that outlived their request's latency budget; the event loop
+# only keeps weak references to tasks
+background_generations = set()
+
+
+class AsyncInferenceClient:
+    """Non-blocking counterpart of upstream.InferenceClient built on aiohttp
+
+    Same retry policy and circuit breaker handling: connection errors and
+    502/503/504 responses are retried with jittered backoff, read timeouts
+    are not. A semaphore caps
+    concurrent upstream calls, so a burst of users queues here instead of
+    opening hundreds of connections.
+    """
+
+    def __init__(self, api_key, concurrency=UPSTREAM_CONCURRENCY, connect_timeout=3.05, read_timeout=20,
+                 max_retries=2, backoff_base=0.5, backoff_max=4.0, breaker=None):
+        self.api_key = api_key
+        self.breaker = breaker
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+
+    async def start(self):
+        """Open the pooled session; must run inside the event loop"""
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            headers={'Authorization': f'Bearer {self.api_key}'},
+            timeout=self.timeout
+        )
+
+    async def close(self):
+        """Close pooled connections"""
+        if self.session is not None:
+            await self.session.close()
+
+    async def request(self, url, payload):
+        """POST with retries; returns (response, timing) with the body unread
+
+        The caller must release the response. Raises aiohttp errors or
+        asyncio.TimeoutError when no attempt produced a response, and
+        CircuitOpen without trying while the breaker is open.
+        """
+        if self.breaker is None:
+            return await self.request_with_retries(url, payload)
+        if not self.breaker.allow():
+            raise CircuitOpen(f"upstream circuit open, not calling {url}")
+
+        outcome = None
+        try:
+            response, timing = await self.request_with_retries(url, payload)
+            outcome = response.status == 200 or f"status {response.status}"
+            return response, timing
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            record_outcome(self.breaker, outcome)
+
+    async def request_with_retries(self, url, payload):
+        """The retry loop behind request(), without the circuit breaker"""
+        start = time.perf_counter()
+        backoff = 0.0
+        attempt = 0
+        while True:
+            try:
+                response = await self.session.post(url, json=payload)
+            except aiohttp.SocketTimeoutError:
+                # Read timeout: the generation may still be running upstream
+                raise
+            except aiohttp.ClientConnectionError:
+                if attempt >= self.max_retries:
+                    raise
+                delay = jittered_backoff(attempt, self.backoff_base, self.backoff_max)
+            else:
+                if response.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response, UpstreamTiming(attempt + 1, time.perf_counter() - start, backoff, response.status)
+                estimated = 0
+                try:
+                    estimated = float((await response.json(content_type=None)).get('estimated_time', 0))
+                except (ValueError, AttributeError, aiohttp.ClientError):
+                    pass
+                response.release()
+                delay = jittered_backoff(attempt, self.backoff_base, self.backoff_max, estimated)
+
+            await asyncio.sleep(delay)
+            backoff += delay
+            attempt += 1
+
+    async def generate(self, url, payload):
+        """Run one generation and return (status, parsed JSON or None, timing)"""
+        async with self.semaphore:
+            response, timing = await self.request(url, payload)
+            try:
+                if response.status != 200:
+                    return response.status, None, timing
+                return response.status, await response.json(content_type=None), timing
+            finally:
+                response.release()
+
+    async def stream(self, url, payload, parse_line=parse_stream_line):
+        """Yield generated token text from a streaming generation, parsing each line with parse_line"""
+        async with self.semaphore:
+            response, timing = await self.request(url, dict(payload, stream=True))
+            try:
+                if response.status != 200:
+                    raise aiohttp.ClientResponseError(response.request_info, (), status=response.status)
+                async for raw_line in response.content:
+                    text = parse_line(raw_line.decode('utf-8').strip())
+                    if text:
+                        yield text
+            finally:
+                response.release()
+
+
+async def offline_answer_async(message, timestamp, reason, source='offline'):
+    """Async version of app.offline_answer: the offline answer is built in a worker thread"""
+    offline_fallbacks.labels(reason).inc()
+    html = await asyncio.to_thread(fallback_stage.timed_call, get_offline_response, message, timestamp)
+    return ChatAnswer(html, source)
+
+
+async def handle_chat_request_async(client, message, session_id=None, use_cache=True, budget=None):
+    """Async version of app.handle_chat_request, returning a ChatAnswer
+
+    The upstream call never blocks the event loop; offline routing,
+    response formatting and cache reads and writes (SQLite when the cache
+    is shared or an answer store is set) run in worker threads.
+    """
+    started = time.perf_counter()
+    with chat_in_flight.labels('chat'):
+        answer = await answer_chat_request_async(client, message, session_id, use_cache, budget)
+    remember_turn(session_id, message, answer)
+    return record_answer(answer, 'chat', started)
+
+
+async def answer_chat_request_async(client, message, session_id, use_cache, budget):
+    """The body of handle_chat_request_async, timing each stage"""
+    budget = (LATENCY_BUDGET if budget is None else budget) or None
+    timestamp = int(time.time())
+    try:
+        if not scope_stage.timed_call(is_tournament_related, message):
+            return ChatAnswer(OUT_OF_SCOPE_RESPONSE, 'out_of_scope')
+
+        fixture_answer = await asyncio.to_thread(fixtures_stage.timed_call, answer_fixture_question, message)
+        if fixture_answer is not None:
+            return ChatAnswer(fixture_answer, 'fixtures')
+
+        if chat_app.USE_OFFLINE_MODE:
+            return await offline_answer_async(message, timestamp, 'offline_mode')
+
+        context = conversation_context(session_id, message)
+        cache_key = conversation_cache_key(message, context) if use_cache else None
+        generate = lambda: generate_answer_async(client, message, timestamp, cache_key, context.text, session_id)
+        if cache_key is None:
+            if budget is None:
+                return await generate()
+            task = asyncio.ensure_future(generate())
+            background_generations.add(task)
+            task.add_done_callback(background_generations.discard)
+            return await asyncio.wait_for(asyncio.shield(task), budget)
+
+        answer = await asyncio.to_thread(cache_stage.timed_call, cached_answer, cache_key)
+        if answer is not None:
+            return answer
+
+        # Identical questions already being answered share that upstream call
+        try:
+            return await inflight_requests.do(cache_key, generate, timeout=budget)
+        except TooManyWaiters as e:
+            print(f"Not joining in-flight request: {e}")
+            return await offline_answer_async(message, timestamp, 'busy')
+
+    except asyncio.TimeoutError:
+        print(f"No model answer within the {budget}s latency budget, answering offline")
+        return await offline_answer_async(message, timestamp, 'deadline', 'deadline')
+    except Exception as e:
+        print(f"Error in async chat service: {e}")
+        return await offline_answer_async(message, timestamp, 'exception')
+
+
+async def admit(session_id, variant):
+    """Wait for admission to call the model, timed as the 'admission' stage; raise Rejected if refused"""
+    started = time.perf_counter()
+    try:
+        await admission.acquire(session_id, variant is SHORT)
+    finally:
+        admission_stage.observe(time.perf_counter() - started)
+
+
+def backend_client(client, backend):
+    """The client for a model backend: client for the first, else the one create_app opened"""
+    return client if backend is model_backends[0] else backend_clients[backend.name]
+
+
+async def call_backend_async(client, message, variant, context, backend):
+    """Async version of app.call_backend"""
+    status = 'error'
+    try:
+        with upstream_in_flight:
+            status, result, timing = await backend_client(client, backend).generate(
+                backend.url, backend.payload(message, variant, context))
+        status = str(status)
+        upstream_responses.labels(status).inc()
+        if status != '200':
+            raise UpstreamStatus(backend.name, status)
+        return backend.parse(result)
+    finally:
+        backend_calls.labels(backend.name, status).inc()
+
+
+async def generate_answer_async(client, message, timestamp, cache_key, context='', session_id=None):
+    """Ask the model to answer one question as a ChatAnswer, falling back to an offline answer"""
+    try:
+        variant = prompt_variant(message)
+        await admit(session_id, variant)
+        started = time.perf_counter()
+        try:
+            backend, generated = await model_router.generate(
+                functools.partial(call_backend_async, client, message, variant, context))
+        finally:
+            upstream_stage.observe(time.perf_counter() - started)
+            admission.release()
+
+        api_response = await asyncio.to_thread(format_stage.timed_call, format_response, generated)
+        if is_usable_response(api_response):
+            await asyncio.to_thread(cache_answer, cache_key, api_response)
+            return ChatAnswer(api_response, 'model')
+        print(f"API response from {backend.name} too short or contains 'undefined': {api_response}")
+        reason = 'unusable'
+
+    except Rejected as e:
+        print(f"Not admitted to the API: {e}")
+        reason = e.reason
+    except CircuitOpen as e:
+        print(f"Skipping API call: {e}")
+        reason = 'circuit_open'
+    except (UpstreamStatus, aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        print(f"API request exception: {e}")
+        reason = fallback_reason(e)
+    return await offline_answer_async(message, timestamp, reason)
+
+
+async def handle_chat_batch_async(client, messages, semaphore, use_cache=True, timeout=BATCH_TIMEOUT):
+    """Async version of app.handle_chat_batch; semaphore bounds this app's batch calls upstream
+
+    Questions still waiting for the semaphore at the deadline are dropped;
+    those already generating finish in the background and are cached.
+    """
+    timestamp = int(time.time())
+    answers, upstream = await asyncio.to_thread(classify_batch, messages, use_cache, timestamp)
+    started = set()
+
+    async def generate(message, cache_key):
+        async with semaphore:
+            started.add(cache_key)
+            call = lambda: generate_answer_async(client, message, timestamp, cache_key if use_cache else None)
+            if use_cache:
+                return await inflight_requests.do(cache_key, call)
+            return await call()
+
+    calls = {cache_key: asyncio.ensure_future(generate(message, cache_key))
+             for cache_key, (message, _) in upstream.items()}
+    if calls:
+        await asyncio.wait(calls.values(), timeout=timeout)
+
+    for cache_key, call in calls.items():
+        message, indexes = upstream[cache_key]
+        if not call.done():
+            if cache_key in started:
+                background_generations.add(call)
+                call.add_done_callback(background_generations.discard)
+            else:
+                call.cancel()
+            answer = await offline_answer_async(message, timestamp, 'deadline', 'deadline')
+        elif call.exception() is not None:
+            print(f"Batch item failed: {call.exception()}")
+            answer = await offline_answer_async(message, timestamp, fallback_reason(call.exception()))
+        else:
+            answer = call.result()
+        for index in indexes:
+            answers[index] = answer
+    return answers
+
+
+async def chat(request):
+    """API endpoint for chat interactions"""
+    try:
+        data = await request_data(request)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    try:
+        message = data.get('message', '')
+        session_id, new_session = request_session(request.cookies)
+        answer = await handle_chat_request_async(request.app['client'], message, session_id,
+                                                 use_cache=not data.get('fresh', False))
+        response = web.json_response({"response": answer.html, "source": answer.source})
+        return set_session_cookie(response, session_id) if new_session else response
+    except Exception as e:
+        print(f"Error processing chat request: {e}")
+        return web.json_response({"error": "An error occurred while processing your request"}, status=500)
+
+
+async def request_data(request):
+    """Return the JSON object in a request body, or {} when there is none; ValueError for anything else, as app's"""
+    return json_object(await request.read())
+
+
+async def no_data(request):
+    """Request data for routes that take none"""
+    return {}
+
+
+async def query_data(request):
+    """The query string as request data"""
+    return dict(request.query)
+
+
+async def chat_batch(request):
+    """Answer a list of messages in one request, as app.chat_batch"""
+    try:
+        data = await request_data(request)
+        ids, messages = parse_chat_batch(data)
+        timeout = batch_timeout(data)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    started = time.perf_counter()
+    with chat_in_flight.labels('batch'):
+        answers = await handle_chat_batch_async(request.app['client'], messages, request.app['batch_semaphore'],
+                                                use_cache=not data.get('fresh', False), timeout=timeout)
+    record_batch(answers, started)
+    return web.json_response({"results": batch_results(ids, answers)})
+
+
+async def chat_stream(request):
+    """Streaming chat endpoint with the same events as app.chat_stream"""
+    try:
+        data = await request_data(request)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    started = time.perf_counter()
+    try:
+        with chat_in_flight.labels('stream'):
+            return await stream_chat_answer(request, data)
+    finally:
+        chat_seconds.labels('stream').observe(time.perf_counter() - started)
+
+
+async def stream_chat_answer(request, data):
+    """The body of chat_stream: send the answer's events as it is generated"""
+    use_cache = not data.get('fresh', False)
+    message = data.get('message', '')
+    timestamp = int(time.time())
+    session_id, new_session = request_session(request.cookies)
+
+    stream = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache',
+                                         'X-Accel-Buffering': 'no'})
+    if new_session:
+        set_session_cookie(stream, session_id)
+    await stream.prepare(request)
+
+    async def send(event, payload):
+        await stream.write(f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode())
+
+    async def send_done(answer):
+        remember_turn(session_id, message, answer)
+        chat_answers.labels(answer.source).inc()
+        await send('done', answer._asdict())
+
+    try:
+        # Answers that need no generation go out as a single 'done' event.
+        # "fresh": true skips the cache and any call already in flight, and
+        # the new answer is not cached, as in app.handle_chat_request
+        context = conversation_context(session_id, message)
+        cache_key = conversation_cache_key(message, context) if use_cache else None
+        answer = None
+        if not scope_stage.timed_call(is_tournament_related, message):
+            answer = ChatAnswer(OUT_OF_SCOPE_RESPONSE, 'out_of_scope')
+        else:
+            fixture_answer = await asyncio.to_thread(fixtures_stage.timed_call, answer_fixture_question, message)
+            if fixture_answer is not None:
+                answer = ChatAnswer(fixture_answer, 'fixtures')
+            elif chat_app.USE_OFFLINE_MODE:
+                answer = await offline_answer_async(message, timestamp, 'offline_mode')
+            elif cache_key is not None:
+                answer = await asyncio.to_thread(cache_stage.timed_call, cached_answer, cache_key)
+        if answer is not None:
+            await send_done(answer)
+            return stream
+
+        # A question already being answered for someone else is sent when that finishes
+        call = None
+        if cache_key is not None:
+            call, leader = inflight_requests.join(cache_key)
+            if not leader:
+                await send_done(await inflight_requests.wait(call))
+                return stream
+
+        api_response = None
+        try:
+            variant = prompt_variant(message)
+            formatter = StreamingFormatter()
+            generated = []
+            reason = 'unusable'
+            backend = None
+            try:
+                await admit(session_id, variant)
+                try:
+                    # Streams stay on one backend, as in app.stream_model_answer
+                    backend = model_router.choose()
+                    started = time.perf_counter()
+                    payload = backend.payload(message, variant, context.text, stream=True)
+                    async for token in backend_client(request.app['client'], backend).stream(backend.url, payload,
+                                                                                           backend.stream_text):
+                        generated.append(token)
+                        await send('chunk', {'html': formatter.feed(token), 'preview': formatter.preview()})
+                finally:
+                    admission.release()
+                upstream_responses.labels('200').inc()
+                backend_calls.labels(backend.name, '200').inc()
+                model_router.record(backend, time.perf_counter() - started, True)
+                api_response = await asyncio.to_thread(format_stage.timed_call, format_response, ''.join(generated))
+            except Rejected as e:
+                print(f"Not admitted to the API: {e}")
+                reason = e.reason
+            except aiohttp.ClientResponseError as e:
+                print(f"Streaming API request failed with status {e.status}")
+                upstream_responses.labels(str(e.status)).inc()
+                backend_calls.labels(backend.name, str(e.status)).inc()
+                model_router.record(backend, time.perf_counter() - started, False)
+                reason = 'status'
+            except (CircuitOpen, aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"Streaming API request failed: {e}")
+                if backend is not None and not isinstance(e, CircuitOpen):
+                    model_router.record(backend, time.perf_counter() - started, False)
+                reason = fallback_reason(e)
+
+            if api_response is not None and is_usable_response(api_response):
+                await asyncio.to_thread(cache_answer, cache_key, api_response)
+                answer = ChatAnswer(api_response, 'model')
+            else:
+                answer = await offline_answer_async(message, timestamp, reason)
+        finally:
+            # Waiters must hear back even if this client disconnected mid-stream
+            if call is not None:
+                if answer is not None:
+                    inflight_requests.complete(cache_key, call, result=answer)
+                else:
+                    inflight_requests.complete(cache_key, call,
+                                               error=CallAbandoned("stream closed before the answer finished"))
+        await send_done(answer)
+
+    except (ConnectionResetError, asyncio.CancelledError):
+        raise
+    except Exception as e:
+        print(f"Error in async streaming chat service: {e}")
+        await send_done(await offline_answer_async(message, timestamp, 'exception'))
+    return stream
+
+
+async def fixtures(request):
+    """Generate fixtures from a JSON body or query string, as app.fixtures"""
+    try:
+        data = await request_data(request) if request.method == 'POST' else dict(request.query)
+        return web.json_response(await asyncio.to_thread(build_fixtures_response, data))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+
+async def schedule(request):
+    """Generate and schedule fixtures, as app.schedule"""
+    try:
+        return web.json_response(await asyncio.to_thread(build_schedule_response, await request_data(request)))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+
+async def create_swiss(request):
+    """Start a Swiss tournament, as app.create_swiss"""
+    try:
+        tournament = swiss_from_request(await request_data(request))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    tournament_id = uuid.uuid4().hex
+    swiss_tournaments.set(tournament_id, tournament)
+    return web.json_response(dict(tournament.stats(), id=tournament_id), status=201)
+
+
+async def swiss_response(request, handler, read_data):
+    """Run a swiss request handler in a worker thread: 404 if the tournament is unknown, 400 on bad input
+
+    The handler gets the data await read_data(request) returns.
+    """
+    tournament = swiss_tournaments.get(request.match_info['tournament_id'])
+    if tournament is None:
+        return web.json_response({"error": "Unknown or expired tournament"}, status=404)
+    try:
+        data = await read_data(request)
+        return web.json_response(await asyncio.to_thread(handler, tournament, data))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+
+async def swiss_round(request):
+    """Report a Swiss tournament's progress and latest round"""
+    return await swiss_response(request, round_from_request, no_data)
+
+
+async def swiss_pair(request):
+    """Pair the next Swiss round"""
+    return await swiss_response(request, pair_from_request, no_data)
+
+
+async def swiss_results(request):
+    """Report results for boards of the current (or a given) round"""
+    return await swiss_response(request, report_from_request, request_data)
+
+
+async def swiss_standings(request):
+    """Return a page of standings with Buchholz and Sonneborn-Berger tiebreaks"""
+    return await swiss_response(request, standings_from_request, query_data)
+
+
+async def create_leaderboard(request):
+    """Start live standings, as app.create_leaderboard"""
+    try:
+        leaderboard = leaderboard_from_request(await request_data(request))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    leaderboard_id = uuid.uuid4().hex
+    leaderboards.set(leaderboard_id, leaderboard)
+    return web.json_response(dict(leaderboard.stats(), id=leaderboard_id), status=201)
+
+
+async def leaderboard_response(request, handler, read_data):
+    """Run a standings request handler in a worker thread: 404 if the leaderboard is unknown, 400 on bad input
+
+    The handler gets the data await read_data(request) returns.
+    """
+    leaderboard = leaderboards.get(request.match_info['leaderboard_id'])
+    if leaderboard is None:
+        return web.json_response({"error": "Unknown or expired leaderboard"}, status=404)
+    try:
+        data = await read_data(request)
+        return web.json_response(await asyncio.to_thread(handler, leaderboard, data))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+
+async def leaderboard_page(request):
+    """Return a page of standings, as app.leaderboard_page"""
+    return await leaderboard_response(request, page_from_request, query_data)
+
+
+async def leaderboard_results(request):
+    """Report (or retract) match results"""
+    return await leaderboard_response(request, results_from_request, request_data)
+
+
+async def cache_stats(request):
+    """Report response cache hit/miss, paraphrase match and answer store counters"""
+    return web.json_response(cache_report())
+
+
+async def inflight_stats(request):
+    """Report request coalescing counters (coalesced = upstream calls saved)"""
+    return web.json_response(inflight_requests.stats())
+
+
+async def metrics_endpoint(request):
+    """Expose the same metrics as app.metrics_endpoint"""
+    return web.Response(body=metrics.render().encode(), headers={'Content-Type': CONTENT_TYPE})
+
+
+async def conversation_stats(request):
+    """Report conversation store size and evictions"""
+    return web.json_response(conversations.stats())
+
+
+async def admission_stats(request):
+    """Report admission queue depth, running calls and refusals by reason"""
+    return web.json_response(admission.stats())
+
+
+async def backend_stats(request):
+    """Report each model backend's average latency, error rate, calls and breaker state, best first"""
+    return web.json_response(model_router.stats())
+
+
+async def breaker_stats(request):
+    """Report the upstream circuit breaker state and recent transitions"""
+    return web.json_response(request.app['client'].breaker.stats())
+
+
+async def index(request):
+    """Serve the main page"""
+    return serve_asset(request, 'index.html')
+
+
+async def static_file(request):
+    """Serve app.js, styles.css and the other files in public/, plain or fingerprinted"""
+    return serve_asset(request, request.match_info['filename'])
+
+
+def serve_asset(request, path):
+    """Answer a GET for a file in public/, negotiating encoding and honouring If-None-Match"""
+    reply = chat_app.static_assets.respond(path, request.headers.get('Accept-Encoding', ''),
+                                           request.headers.get('If-None-Match', ''))
+    if reply is None:
+        raise web.HTTPNotFound()
+    return web.Response(body=reply.body, status=reply.status, headers=reply.headers)
+
+
+def create_app(client=None):
+    """Build the aiohttp application; the client is started with the app"""
+    application = web.Application()
+    application['client'] = client or AsyncInferenceClient(
+        HUGGINGFACE_API_KEY,
+        connect_timeout=inference_client.connect_timeout,
+        read_timeout=inference_client.read_timeout,
+        max_retries=inference_client.max_retries,
+        breaker=inference_client.breaker
+    )
+
+    for backend in model_backends[1:]:
+        backend_clients[backend.name] = AsyncInferenceClient(
+            backend.api_key,
+            connect_timeout=inference_client.connect_timeout,
+            read_timeout=inference_client.read_timeout,
+            max_retries=inference_client.max_retries,
+            breaker=backend.breaker
+        )
+
+    async def start_client(application):
+        clients = [application['client'], *backend_clients.values()]
+        for client in clients:
+            await client.start()
+        yield
+        for client in clients:
+            await client.close()
+
+    application['batch_semaphore'] = asyncio.Semaphore(BATCH_CONCURRENCY)
+    application.cleanup_ctx.append(start_client)
+    application.router.add_get('/', index)
+    application.router.add_post('/api/chat', chat)
+    application.router.add_post('/api/chat/stream', chat_stream)
+    application.router.add_post('/api/chat/batch', chat_batch)
+    application.router.add_get('/api/fixtures', fixtures)
+    application.router.add_post('/api/fixtures', fixtures)
+    application.router.add_post('/api/schedule', schedule)
+    application.router.add_post('/api/swiss', create_swiss)
+    application.router.add_get('/api/swiss/{tournament_id}', swiss_round)
+    application.router.add_post('/api/swiss/{tournament_id}/pair', swiss_pair)
+    application.router.add_post('/api/swiss/{tournament_id}/results', swiss_results)
+    application.router.add_get('/api/swiss/{tournament_id}/standings', swiss_standings)
+    application.router.add_post('/api/standings', create_leaderboard)
+    application.router.add_get('/api/standings/{leaderboard_id}', leaderboard_page)
+    application.router.add_post('/api/standings/{leaderboard_id}/results', leaderboard_results)
+    application.router.add_get('/api/cache/stats', cache_stats)
+    application.router.add_get('/api/inflight/stats', inflight_stats)
+    application.router.add_get('/api/conversations/stats', conversation_stats)
+    application.router.add_get('/api/admission/stats', admission_stats)
+    application.router.add_get('/api/backends/stats', backend_stats)
+    application.router.add_get('/api/breaker/stats', breaker_stats)
+    application.router.add_get('/metrics', metrics_endpoint)
+    application.router.add_get('/{filename:.+}', static_file)
+    return application
+
+
+if __name__ == '__main__':
+    print(f"Tournament Planner Bot async server running on port {PORT}")
+    web.run_app(create_app(), host='0.0.0.0', port=PORT)
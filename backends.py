@@ -0,0 +1,117 @@
+import json
+from urllib.parse import urlsplit
+
+from prompts import build_messages, build_prompt
+from upstream import parse_stream_line
+
+# Model backends describe how to ask one model server for an answer: the
+# payload a question becomes, and how text comes back, whole or streamed.
+# They hold no connections; the app keeps one client per backend, and
+# router.ModelRouter picks which backend a question goes to. When none of
+# them answers, the app falls back to the offline responder as before.
+
+
+class UpstreamStatus(Exception):
+    """Raised when a backend answers with a status other than 200"""
+
+    def __init__(self, backend, status):
+        super().__init__(f"{backend} returned status {status}")
+        self.status = status
+
+
+def extract_generated_text(result):
+    """Pull generated_text out of the API's list or dict response shapes"""
+    if isinstance(result, list) and len(result) > 0:
+        if 'generated_text' in result[0]:
+            return result[0]['generated_text']
+        return str(result[0])
+    if isinstance(result, dict) and 'generated_text' in result:
+        return result['generated_text']
+    return str(result)
+
+
+class HuggingFaceBackend:
+    """A text-generation model on the Hugging Face Inference API, or a server speaking its API
+
+    The instruction prompt goes out as 'inputs' with the variant's
+    generation parameters. Answers come back as [{"generated_text": ...}]
+    or a bare dict, and streams as server-sent token events.
+    """
+
+    def __init__(self, url, api_key, breaker=None, name=None):
+        self.url = url
+        self.api_key = api_key
+        self.breaker = breaker
+        self.name = name or 'hf:' + url.rstrip('/').rsplit('/', 1)[-1]
+
+    def payload(self, message, variant, context='', stream=False):
+        """The request body asking this model about message"""
+        payload = {
+            'inputs': build_prompt(message, variant, context),
+            'parameters': variant.parameters,
+            'options': {'use_cache': False, 'wait_for_model': True}
+        }
+        if stream:
+            payload['stream'] = True
+        return payload
+
+    def parse(self, result):
+        """The generated text in a decoded response body"""
+        return extract_generated_text(result)
+
+    def stream_text(self, line):
+        """The token text in one line of a streamed response, or None"""
+        return parse_stream_line(line)
+
+
+class OpenAICompatibleBackend:
+    """A chat model behind an OpenAI-compatible /v1/chat/completions endpoint
+
+    llama.cpp, vLLM, Ollama and most local model servers offer one. The
+    prompt goes out as system and user messages so the server applies the
+    model's own chat template, with the variant's token budget as
+    max_tokens.
+    """
+
+    def __init__(self, url, model='', api_key='', breaker=None, name=None):
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.breaker = breaker
+        self.name = name or 'openai:' + (model or urlsplit(url).netloc)
+
+    def payload(self, message, variant, context='', stream=False):
+        """The request body asking this model about message"""
+        parameters = variant.parameters
+        return {
+            'model': self.model,
+            'messages': build_messages(message, variant, context),
+            'max_tokens': parameters['max_new_tokens'],
+            'temperature': parameters['temperature'],
+            'top_p': parameters['top_p'],
+            'stream': stream
+        }
+
+    def parse(self, result):
+        """The generated text in a decoded response body; ValueError for any other shape"""
+        try:
+            return result['choices'][0]['message']['content'] or ''
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"unexpected chat completion response: {str(result)[:200]}")
+
+    def stream_text(self, line):
+        """The token text in one line of a streamed response, or None
+
+        Events look like data: {"choices": [{"delta": {"content": ...}}]},
+        and the stream ends with data: [DONE].
+        """
+        if not line.startswith('data:'):
+            return None
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return None
+        event = json.loads(data)
+        if 'error' in event:
+            raise ValueError(event['error'])
+        choices = event.get('choices') or [{}]
+        return (choices[0].get('delta') or {}).get('content') or None
@@ -0,0 +1,115 @@
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_inference import start_stub
+
+# A model replica with four generation slots, 0.2 s a generation
+SLOTS = 4
+stub, stub_url = start_stub(latency=0.2, slots=SLOTS)
+os.environ.update(HUGGINGFACE_MODEL_URL=stub_url, ADMISSION_MAX_CONCURRENT=str(SLOTS))
+
+import app
+from admission import AdmissionControl
+
+DURATION = 6.0
+SPAMMER_THREADS = 12
+USERS = 8
+USER_INTERVAL = 1.0
+QUESTIONS = [
+    'What prizes work well for a club tournament?',
+    'How should I seed a 16 team bracket?',
+    'What is a round robin?',
+    'How do I schedule a double elimination bracket?',
+]
+
+
+def ask(session_id, question, latencies, sources):
+    """Answer one fresh question for a session, recording its latency and source"""
+    start = time.perf_counter()
+    answer = app.handle_chat_request(question, use_cache=False, budget=0, session_id=session_id)
+    latencies.append((time.perf_counter() - start) * 1000)
+    sources.append(answer.source)
+
+
+def spammer(stop, latencies, sources):
+    """One session asking back to back until stopped"""
+    index = 0
+    while not stop.is_set():
+        ask('spammer', QUESTIONS[index % len(QUESTIONS)], latencies, sources)
+        index += 1
+        time.sleep(0.01)
+
+
+def user(number, stop, latencies, sources):
+    """A session asking one question every USER_INTERVAL seconds"""
+    index = number
+    while not stop.is_set():
+        started = time.perf_counter()
+        ask(f"user-{number}", QUESTIONS[index % len(QUESTIONS)], latencies, sources)
+        index += 1
+        stop.wait(max(0.0, USER_INTERVAL - (time.perf_counter() - started)))
+
+
+def run(control):
+    """Run the spammer and the users against control; return per-group results and the deepest queue"""
+    app.admission = control
+    app.admission_controls[:] = [control]
+    stop = threading.Event()
+    results = {'spammer': ([], []), 'users': ([], [])}
+    threads = [threading.Thread(target=spammer, args=(stop, *results['spammer']))
+               for _ in range(SPAMMER_THREADS)]
+    threads += [threading.Thread(target=user, args=(number, stop, *results['users'])) for number in range(USERS)]
+    deepest = 0
+    # Keep the app's per-request logging out of the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + DURATION
+        while time.monotonic() < deadline:
+            deepest = max(deepest, control.waiting)
+            time.sleep(0.01)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return results, deepest
+
+
+def percentile(values, fraction):
+    """The value at fraction of the way through the sorted values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(label, control):
+    """Run one configuration and print its rows"""
+    requests_before = stub.requests
+    results, deepest = run(control)
+    print(f"\n{label}:")
+    for group, (latencies, sources) in results.items():
+        counts = {source: sources.count(source) for source in sorted(set(sources))}
+        print(f"  {group:8} {len(latencies):5} asked  p50 {statistics.median(latencies):7.1f} ms  "
+              f"p95 {percentile(latencies, 0.95):7.1f} ms  {counts}")
+    stats = control.stats()
+    print(f"  upstream calls {stub.requests - requests_before}, deepest admission queue {deepest}, "
+          f"refused {stats['rejected']}")
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("ADMISSION CONTROL BENCHMARK")
+    print("=" * 50)
+    print(f"{SLOTS} generation slots at 0.2 s; one session with {SPAMMER_THREADS} threads asking back to back, "
+          f"{USERS} users asking every {USER_INTERVAL:g} s, for {DURATION:g} s")
+
+    # Effectively no admission control: every call goes straight upstream
+    report('No admission control', AdmissionControl(max_concurrent=10 ** 6, max_queue=10 ** 6, session_rate=0))
+    report('Admission control (defaults)', AdmissionControl(max_concurrent=SLOTS, **app.ADMISSION_SETTINGS))
+    stub.shutdown()
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_store import AnswerStore
+
+ANSWER = "<p>Seed the strongest teams apart so they meet late.</p>" * 20
+ANSWERS = 20000
+
+
+def elapsed_ms(func, *args):
+    """Run func(*args); return (result, milliseconds)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("ANSWER STORE BENCHMARK")
+    print("=" * 50)
+
+    path = os.path.join(tempfile.mkdtemp(), 'answers.sqlite3')
+    store = AnswerStore(path, 'v1', flush_interval=3600, max_batch=ANSWERS + 1)
+    keys = [f"how do i seed a {teams} team bracket" for teams in range(ANSWERS)]
+
+    _, queue_ms = elapsed_ms(lambda: [store.save(key, ANSWER) for key in keys])
+    print(f"\nsave() on the request path: {queue_ms * 1000 / ANSWERS:.2f} us per answer (queued)")
+    _, flush_ms = elapsed_ms(store.flush)
+    print(f"Flushing {ANSWERS} answers in one transaction: {flush_ms:.0f} ms")
+    for key in keys[:1000]:
+        store.record_hit(key)
+    _, flush_ms = elapsed_ms(store.flush)
+    print(f"Flushing 1000 hit counts: {flush_ms:.1f} ms")
+
+    _, lookup_ms = elapsed_ms(lambda: [store.lookup(key) for key in keys[:5000]])
+    print(f"lookup() of a stored answer: {lookup_ms * 1000 / 5000:.1f} us")
+
+    print(f"\n  {'warm limit':>10} {'loaded':>7} {'ms':>7}")
+    for limit in (500, 5000, ANSWERS):
+        loaded, warm_ms = elapsed_ms(store.warm, lambda key, html: None, limit, 10.0)
+        print(f"  {limit:>10} {loaded:>7} {warm_ms:7.1f}")
+    loaded, warm_ms = elapsed_ms(store.warm, lambda key, html: time.sleep(0.0001), ANSWERS, 0.2)
+    print(f"\nWith a 0.2 s budget and a slow loader, warm() stopped after {loaded} answers in {warm_ms:.0f} ms")
+
+    stale = AnswerStore(path, 'v2')
+    print(f"A new prompt version sees {stale.warm(lambda key, html: None)} answers and prunes {stale.prune()}")
@@ -0,0 +1,102 @@
+import gzip
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, send_from_directory
+
+import app as chat_app
+
+ACCEPT_ENCODING = 'gzip, deflate'
+LOCAL_REFERENCE = re.compile(r'(?:href|src)="(/?[^":?#]+)"')
+# A mobile connection, for the time to first render estimate
+RTT = 0.08
+BYTES_PER_SECOND = 1.5e6 / 8
+
+
+def baseline_app():
+    """The app as it served public/ before: Flask's static route, plain files, revalidated every visit"""
+    baseline = Flask('baseline', static_folder=chat_app.STATIC_FOLDER, static_url_path='')
+
+    @baseline.route('/')
+    def index():
+        return send_from_directory(chat_app.STATIC_FOLDER, 'index.html')
+
+    return baseline
+
+
+def visit(client, browser_cache):
+    """Load the page like a browser with browser_cache; return (requests, body bytes, round trips)"""
+    requests = body_bytes = 0
+    round_trips = 1
+
+    def fetch(url):
+        nonlocal requests, body_bytes
+        cached = browser_cache.get(url)
+        if cached and 'immutable' in cached['cache_control']:
+            return cached['body']
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        if cached:
+            headers['If-None-Match'] = cached['etag']
+        response = client.get(url, headers=headers)
+        requests += 1
+        body_bytes += len(response.data)
+        if response.status_code == 304:
+            return cached['body']
+        body = response.get_data()
+        if response.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        browser_cache[url] = {'etag': response.headers.get('ETag', ''), 'body': body,
+                              'cache_control': response.headers.get('Cache-Control', '')}
+        return body
+
+    page = fetch('/')
+    before = requests
+    for reference in LOCAL_REFERENCE.findall(page.decode('utf-8', 'replace')):
+        fetch('/' + reference.lstrip('/'))
+    if requests > before:
+        round_trips += 1
+    return requests, body_bytes, round_trips
+
+
+def render_estimate(round_trips, body_bytes):
+    """Seconds to first render on the RTT / bandwidth model"""
+    return round_trips * RTT + body_bytes / BYTES_PER_SECOND
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("STATIC ASSET BENCHMARK")
+    print("=" * 50)
+
+    print("\nAssets: " + ', '.join(f"{path} {sizes['identity']} B"
+                                   + ''.join(f", {encoding} {size} B" for encoding, size in sizes.items()
+                                             if encoding != 'identity')
+                                   for path, sizes in chat_app.static_assets.stats().items()))
+    print(f"\nEstimated first render at {RTT * 1000:.0f} ms RTT and {BYTES_PER_SECOND * 8 / 1e6:.1f} Mbit/s")
+    print(f"\n  {'':10} {'visit':7} {'reqs':>5} {'bytes':>7} {'rtts':>5} {'render ms':>10}")
+    for name, server in (('before', baseline_app()), ('after', chat_app.app)):
+        client = server.test_client()
+        browser_cache = {}
+        for visit_name in ('first', 'repeat'):
+            requests, body_bytes, round_trips = visit(client, browser_cache)
+            print(f"  {name:10} {visit_name:7} {requests:5} {body_bytes:7} {round_trips:5} "
+                  f"{render_estimate(round_trips, body_bytes) * 1000:10.0f}")
+
+    client = chat_app.app.test_client()
+    url = chat_app.static_assets.url_for('app.js')
+    etag = client.get(url, headers={'Accept-Encoding': ACCEPT_ENCODING}).headers['ETag']
+    baseline = baseline_app().test_client()
+    number = 2000
+    cases = {
+        'before, app.js': lambda: baseline.get('/app.js'),
+        'after, app.js gzip': lambda: client.get(url, headers={'Accept-Encoding': ACCEPT_ENCODING}),
+        'after, app.js 304': lambda: client.get(url, headers={'Accept-Encoding': ACCEPT_ENCODING,
+                                                                'If-None-Match': etag}),
+    }
+    print(f"\n  {'server time per request':24} {'us':>7}")
+    for name, case in cases.items():
+        print(f"  {name:24} {min(timeit.repeat(case, number=number, repeat=3)) / number * 1e6:7.0f}")
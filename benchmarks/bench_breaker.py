@@ -0,0 +1,59 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_inference import start_stub
+
+RECOVERY_TIME = 2
+
+stub, stub_url = start_stub(latency=0.05, slow_latency=3)
+os.environ.update(HUGGINGFACE_MODEL_URL=stub_url, UPSTREAM_READ_TIMEOUT='1', BREAKER_FAILURE_THRESHOLD='3',
+                  BREAKER_WINDOW='30', BREAKER_RECOVERY_TIME=str(RECOVERY_TIME))
+
+import app
+
+QUESTION = 'How should I seed a 16 team bracket?'
+
+
+def phase(label, mode, count):
+    """Send count uncached questions with the stub in mode; print latency and breaker state"""
+    stub.mode = mode
+    client = app.app.test_client()
+    print(f"\n{label} (stub {mode}):")
+    for _ in range(count):
+        before = stub.requests
+        start = time.perf_counter()
+        # Keep the app's per-request logging out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            client.post('/api/chat', json={'message': QUESTION, 'fresh': True})
+        elapsed = (time.perf_counter() - start) * 1000
+        called = 'called upstream' if stub.requests > before else 'skipped upstream'
+        print(f"  {elapsed:8.1f} ms  {called:16}  breaker {app.upstream_breaker.state}")
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("CIRCUIT BREAKER CHECK")
+    print("=" * 50)
+    print(f"Threshold 3 failures, {RECOVERY_TIME} s recovery, 1 s read timeout")
+
+    phase('Healthy upstream', 'healthy', 3)
+    phase('Upstream returning 500s', 'failing', 6)
+    print(f"\n  ... waiting {RECOVERY_TIME} s for the breaker to half-open")
+    time.sleep(RECOVERY_TIME)
+    phase('Upstream still failing: probe reopens', 'failing', 2)
+    time.sleep(RECOVERY_TIME)
+    phase('Upstream recovered: probe closes', 'healthy', 3)
+    phase('Upstream too slow (3 s answers)', 'slow', 6)
+    time.sleep(RECOVERY_TIME)
+    phase('Upstream recovered', 'healthy', 2)
+
+    print("\nTransitions:")
+    for transition in app.upstream_breaker.stats()['transitions']:
+        print(f"  {transition['from']:>9} -> {transition['to']:9} {transition['reason']}")
+    stub.shutdown()
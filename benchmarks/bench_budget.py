@@ -0,0 +1,85 @@
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_inference import start_stub
+
+BUDGET = 0.5
+
+stub, stub_url = start_stub(latency=2.0)
+os.environ.update(HUGGINGFACE_MODEL_URL=stub_url, LATENCY_BUDGET=str(BUDGET))
+
+import app
+import async_app
+
+QUESTION = 'How should I seed a 16 team bracket?'
+
+
+def ask(client, message, fresh=False):
+    """POST one question; return (source, milliseconds)"""
+    start = time.perf_counter()
+    # Keep the app's per-request logging out of the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = client.post('/api/chat', json={'message': message, 'fresh': fresh}).get_json()
+    return data['source'], (time.perf_counter() - start) * 1000
+
+
+def show(label, source, elapsed):
+    """Print one result row"""
+    print(f"  {label:44} {source:9} {elapsed:8.1f} ms")
+
+
+async def ask_async(client, message):
+    """Ask through the async handler; return (source, milliseconds)"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        answer = await async_app.handle_chat_request_async(client, message)
+    return answer.source, (time.perf_counter() - start) * 1000
+
+
+async def async_checks():
+    """Same deadline-then-cache sequence through the aiohttp handler"""
+    client = async_app.AsyncInferenceClient('stub-key')
+    await client.start()
+    try:
+        question = 'What is the best format for 12 teams?'
+        show('first ask (2 s model)', *await ask_async(client, question))
+        with contextlib.redirect_stdout(io.StringIO()):
+            await asyncio.sleep(2)
+        show('same question after the generation finished', *await ask_async(client, question))
+    finally:
+        await client.close()
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("LATENCY BUDGET CHECK")
+    print("=" * 50)
+    print(f"Budget {BUDGET} s\n")
+
+    client = app.app.test_client()
+    print("Flask:")
+    show('first ask (2 s model)', *ask(client, QUESTION))
+    # The generation finishes (and logs) in the background meanwhile
+    with contextlib.redirect_stdout(io.StringIO()):
+        time.sleep(2)
+    show('same question after the generation finished', *ask(client, QUESTION))
+    stub.latency = 0.1
+    show('new question (0.1 s model)', *ask(client, 'How do I plan a round robin for 8 teams?'))
+    stub.latency = 2.0
+    show('fresh answer (2 s model)', *ask(client, QUESTION, fresh=True))
+    start = time.perf_counter()
+    with app.app.test_request_context(), contextlib.redirect_stdout(io.StringIO()):
+        answer = app.handle_chat_request('How many courts do I need for 20 teams?', budget=0)
+    show('no budget (2 s model)', answer.source, (time.perf_counter() - start) * 1000)
+
+    print("\naiohttp:")
+    asyncio.run(async_checks())
+    print(f"\nUpstream calls: {stub.requests}")
+    stub.shutdown()
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversations import ConversationStore, compact_text, estimate_tokens
+from prompts import build_prompt, prompt_variant
+from stub_inference import DEFAULT_TEXT
+
+QUESTIONS = [
+    "We're running a 24-team, two-day football tournament on 3 pitches on 14 June",
+    "Should we do groups of four and then a knockout?",
+    "How many referees will we need?",
+    "What prizes work well?",
+    "What should day one look like?",
+    "How do we handle no-shows?",
+    "What tiebreakers should the groups use?",
+    "Any tips for volunteers?",
+]
+ANSWER = "<p>" + DEFAULT_TEXT + "</p><ul><li>Book the venue early</li><li>Publish the bracket the night before</li></ul>"
+TURNS = 40
+BUDGET = 300
+
+
+def per_call_us(func, calls):
+    """Microseconds per call of func(index) over range(calls)"""
+    start = time.perf_counter()
+    for index in range(calls):
+        func(index)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("CONVERSATION STORE BENCHMARK")
+    print("=" * 50)
+
+    # Prompt size as a conversation goes on: every earlier turn pasted in
+    # verbatim, against the store's budgeted context
+    store = ConversationStore()
+    history = ''
+    print(f"\nPrompt tokens by turn, {BUDGET} token context budget")
+    print(f"  {'turn':>4} {'no history':>10} {'full history':>12} {'store':>6}")
+    for turn in range(TURNS):
+        question = QUESTIONS[turn % len(QUESTIONS)]
+        variant = prompt_variant(question)
+        context = store.context('user', BUDGET)
+        if turn in (0, 1, 2, 4, 8, 16, 39):
+            print(f"  {turn + 1:4} {estimate_tokens(build_prompt(question, variant)):10} "
+                  f"{estimate_tokens(build_prompt(question, variant, history)):12} "
+                  f"{estimate_tokens(build_prompt(question, variant, context.text)):6}")
+        history += f"User: {question}\nYou: {compact_text(ANSWER, 10 ** 6)}\n"
+        store.record('user', question, ANSWER)
+    print(f"Facts kept after {TURNS} turns: {store.context('user', BUDGET).text.splitlines()[0]}")
+
+    store = ConversationStore()
+    record_us = per_call_us(lambda index: store.record(f"s{index % 1000}", QUESTIONS[index % len(QUESTIONS)], ANSWER),
+                            20000)
+    context_us = per_call_us(lambda index: store.context(f"s{index % 1000}", BUDGET), 20000)
+    print(f"\nrecord(): {record_us:.1f} us, context(): {context_us:.1f} us")
+
+    # Many sessions under a small cap: old sessions go, memory stays bounded
+    max_bytes = 8 * 1024 * 1024
+    tracemalloc.start()
+    store = ConversationStore(max_bytes=max_bytes, max_sessions=10 ** 6)
+    baseline = tracemalloc.get_traced_memory()[0]
+    for index in range(100000):
+        for turn in range(3):
+            store.record(f"session-{index}", QUESTIONS[(index + turn) % len(QUESTIONS)], ANSWER)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    stats = store.stats()
+    print(f"\n100000 sessions x 3 turns with a {max_bytes // 1024 // 1024} MB cap: {stats['sessions']} kept, "
+          f"{stats['evictions']} evicted")
+    print(f"Estimated {stats['bytes'] / 1024 / 1024:.1f} MB, measured {used / 1024 / 1024:.1f} MB")
@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import (DOUBLE_ELIMINATION, GROUPS, ROUND_ROBIN, SINGLE_ELIMINATION, fixtures_json, generate_fixtures,
+                      match_count, render_fixtures_html)
+from offline import answer_fixture_question
+
+CASES = [
+    (ROUND_ROBIN, 500),
+    (ROUND_ROBIN, 1024),
+    (SINGLE_ELIMINATION, 4096),
+    (DOUBLE_ELIMINATION, 4096),
+    (DOUBLE_ELIMINATION, 8192),
+    (GROUPS, 4096),
+]
+
+QUESTIONS = [
+    '16 team bracket',
+    'fixtures for twelve teams',
+    'How many matches in an 8-team round robin?',
+    'double elimination for 100 players',
+    'create fixtures for 32 teams in groups',
+]
+
+
+def best_ms(func, number=5):
+    """Best of number runs, in milliseconds"""
+    return min(timeit.repeat(func, number=1, repeat=number)) * 1000
+
+
+def round_robin_is_complete(fixtures, count):
+    """Every pair meets exactly once and nobody plays twice in a round"""
+    pairs = set()
+    for matches in fixtures.stages[0].rounds:
+        seeds = [seed for match in matches for seed in (match.home, match.away)]
+        if len(seeds) != len(set(seeds)):
+            return False
+        pairs.update(frozenset((match.home, match.away)) for match in matches)
+    return len(pairs) == count * (count - 1) // 2
+
+
+def elimination_is_complete(fixtures, count, losses):
+    """Each match eliminates at most one entrant: losses * (count - 1) matches, plus the grand final reset"""
+    expected = losses * (count - 1) + (1 if losses == 2 else 0)
+    return match_count(fixtures) == expected
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("FIXTURES ENGINE BENCHMARK")
+    print("=" * 50)
+
+    print(f"\n  {'format':20} {'entrants':>8} {'matches':>8} {'generate ms':>12} {'json ms':>8} {'html ms':>8}")
+    for format, count in CASES:
+        generate_ms = best_ms(lambda: generate_fixtures(format, count))
+        fixtures = generate_fixtures(format, count)
+        json_ms = best_ms(lambda: json.dumps(fixtures_json(fixtures)), number=3)
+        html_ms = best_ms(lambda: render_fixtures_html(fixtures), number=3)
+        print(f"  {format:20} {count:8} {match_count(fixtures):8} {generate_ms:12.1f} {json_ms:8.1f} {html_ms:8.1f}")
+
+    print("\nChecks:")
+    for count in (2, 3, 7, 8, 99, 500):
+        print(f"  round robin {count:4}: every pair once {round_robin_is_complete(generate_fixtures(ROUND_ROBIN, count), count)}")
+    for count in (2, 3, 5, 100, 4096):
+        single = elimination_is_complete(generate_fixtures(SINGLE_ELIMINATION, count), count, 1)
+        double = elimination_is_complete(generate_fixtures(DOUBLE_ELIMINATION, count), count, 2)
+        print(f"  elimination {count:4}: single {single}, double {double}")
+
+    print("\nChat answers computed without the model (first call, then cached):")
+    for question in QUESTIONS:
+        first_ms = best_ms(lambda: answer_fixture_question(question), number=1)
+        cached_ms = best_ms(lambda: answer_fixture_question(question))
+        print(f"  {question!r:46} {first_ms:6.2f} ms  {cached_ms:6.3f} ms")
@@ -0,0 +1,119 @@
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formatting import format_response
+
+
+def legacy_format_response(response_text):
+    """The multi-pass implementation that format_response replaced"""
+    if not response_text:
+        return "I apologize, but I couldn't generate a response. Please try again."
+    clean_response = re.sub(r'^(as an ai assistant|as a tournament planning assistant|i am a tournament planning assistant|as your tournament assistant)', '', response_text, flags=re.IGNORECASE).strip()
+    clean_response = clean_response[0].upper() + clean_response[1:] if clean_response else clean_response
+    return legacy_format_text_with_html(clean_response)
+
+
+def legacy_format_text_with_html(text):
+    """The six regex/replace passes that render_text replaced"""
+    if not text:
+        return text
+    text = re.sub(r'\n\s*\n', '</p><p>', text)
+    text = text.replace('\n', '<br>')
+    text = re.sub(r'(\d+)\.\s+([^\n<]+)', r'<b>\1.</b> \2', text)
+    text = re.sub(r'[-•*]\s+([^\n<]+)', r'• \1', text)
+    if not text.startswith('<p>'):
+        text = '<p>' + text + '</p>'
+    text = re.sub(r'<br>\s*<br>', '</p><p>', text)
+    text = re.sub(r'<p>\s*</p>', '', text)
+    return text
+
+
+TYPICAL_ANSWER = """As a tournament planning assistant, here is how to run a 16 team bracket.
+
+Single elimination is the quickest format: 15 matches over 4 rounds.
+
+1. Seed teams by ranking so the strongest meet late
+2. Schedule round one with 8 matches across your courts
+3. Keep 15 minute buffers between rounds
+- Add a third place match if time allows
+- Double elimination needs 30 or 31 matches
+
+Tip: publish the bracket the night before so teams can plan."""
+
+# The prompt asks for HTML, so many answers arrive already tagged
+TAGGED_ANSWER = """<p>For 12 teams, a round robin in two groups of 6 works well.</p>
+
+<ul>
+<li><b>Group stage:</b> 15 matches per group, 30 in total</li>
+<li><b>Knockouts:</b> top 2 of each group play semi-finals</li>
+</ul>
+
+1. Book 3 courts for the first day
+2. Publish fixtures a week ahead
+- Keep a spare referee on call"""
+
+
+def large_answer(size=50_000):
+    """A long well-formed answer built from typical paragraphs and lists"""
+    rng = random.Random(3)
+    lines = []
+    while sum(len(line) + 1 for line in lines) < size:
+        kind = rng.random()
+        if kind < 0.3:
+            lines.append(f"{rng.randint(1, 40)}. Round {rng.randint(1, 9)} starts at {rng.randint(8, 18)}:00 on court {rng.randint(1, 6)}")
+        elif kind < 0.6:
+            lines.append(f"- Team {rng.randint(1, 64)} plays team {rng.randint(1, 64)} with a {rng.randint(5, 20)} minute break")
+        elif kind < 0.9:
+            lines.append("Seeding keeps the strongest teams apart until the final rounds of the event.")
+        else:
+            lines.append('')
+    return '\n'.join(lines)
+
+
+def pathological_answers(size=50_000):
+    """Outputs that stress the formatter: nesting, long runs and dense markers"""
+    return {
+        'deep bullet nesting': '\n'.join(' ' * (depth % 40) + '- ' * (depth % 40 + 1) + 'item'
+                                         for depth in range(size // 60)),
+        'one 50 KB line': ('word - 3. x * ' * (size // 14))[:size],
+        # The legacy numbered-list pattern is quadratic in the length of a digit run
+        'long digit run': '7' * (size // 2) + ' teams',
+        'whitespace runs': ('\n' + ' \t' * 200 + 'x') * (size // 402),
+        'markers only': '1. - * • ' * (size // 9),
+        'model HTML tags': ('<p>Intro</p>\n<ul><li>1. Seed</li><li>- Play</li></ul><br>\n<br>' * (size // 70)),
+    }
+
+
+def bench(func, text, number):
+    """Return milliseconds per call and MB/s for func on text"""
+    seconds = timeit.timeit(lambda: func(text), number=number) / number
+    return seconds * 1000, len(text) / seconds / 1e6
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("RESPONSE FORMATTER BENCHMARK")
+    print("=" * 50)
+
+    corpora = {'typical answer': TYPICAL_ANSWER, 'tagged answer': TAGGED_ANSWER, '50 KB answer': large_answer()}
+    corpora.update(pathological_answers())
+
+    print(f"\n  {'input':22} {'KB':>6} {'legacy ms':>10} {'single-pass ms':>15} {'MB/s':>6} {'speedup':>8}  identical")
+    for name, text in corpora.items():
+        number = 2000 if len(text) < 5000 else 20
+        if name == 'long digit run':
+            number = 1
+        legacy_ms, _ = bench(legacy_format_response, text, number)
+        new_ms, throughput = bench(format_response, text, number)
+        identical = legacy_format_response(text) == format_response(text)
+        print(f"  {name:22} {len(text) / 1000:6.1f} {legacy_ms:10.3f} {new_ms:15.3f} {throughput:6.1f} "
+              f"{legacy_ms / new_ms:7.1f}x  {identical}")
+
+    print("\nEscaping (legacy passed these through as markup):")
+    for text in ['<img src=x onerror=alert(1)> 1. Seed teams', 'Q&A <script>x</script>\n- <b>bold</b> stays']:
+        print(f"  {text!r}\n    -> {format_response(text)}")
@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import normalize_message
+from formatting import format_response
+from offline import get_offline_response
+from prompts import prompt_variant
+from scope import match_scope
+from stub_inference import DEFAULT_TEXT
+
+MESSAGES = [
+    "How do I organize a round-robin tournament?",
+    "What's the best format for 12 teams?",
+    "Help me create a schedule for a weekend tournament",
+    "How do I seed players in a bracket?",
+    "What equipment do I need for a chess tournament?",
+    "Explain double elimination format",
+    "hello",
+    "What's the weather tomorrow?",
+    "Our finals are on 14 oct, what should we prepare?",
+    "I want something for my league but not sure what",
+]
+ANSWER = ("As a tournament planning assistant, here is how to run it.\n\n" + DEFAULT_TEXT
+          + "\n\n1. Book the venue early\n2. Publish the bracket the night before\n- Keep spare equipment")
+
+# Microseconds per call allowed before a change counts as a regression.
+# Each is several times what these take on a laptop, so only a real
+# slowdown (an extra pass, an uncompiled regex, a linear scan) trips it.
+BUDGETS_US = {
+    'is_tournament_related': 30,
+    'get_offline_response': 150,
+    'format_response': 150,
+    'normalize_message': 40,
+    'prompt_variant': 30,
+}
+
+CASES = {
+    'is_tournament_related': lambda: [match_scope(message).related for message in MESSAGES],
+    'get_offline_response': lambda: [get_offline_response(message, 0) for message in MESSAGES],
+    'format_response': lambda: [format_response(ANSWER) for _ in MESSAGES],
+    'normalize_message': lambda: [normalize_message(message) for message in MESSAGES],
+    'prompt_variant': lambda: [prompt_variant(message) for message in MESSAGES],
+}
+
+
+def per_call_us(case, number):
+    """Best-of-five microseconds per call"""
+    return min(timeit.repeat(case, number=number, repeat=5)) / (number * len(MESSAGES)) * 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the per-request functions against their budgets')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every budget, for slow machines')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 50)
+    print("HOT PATH BENCHMARK")
+    print("=" * 50)
+    print(f"\n  {'function':24} {'us/call':>8} {'budget':>7}")
+    over = []
+    for name, case in CASES.items():
+        elapsed = per_call_us(case, 200)
+        budget = BUDGETS_US[name] * args.scale
+        if elapsed > budget:
+            over.append(name)
+        print(f"  {name:24} {elapsed:8.2f} {budget:7.0f}{'  OVER BUDGET' if elapsed > budget else ''}")
+    if over:
+        print(f"\nRegressions: {', '.join(over)}")
+        sys.exit(1)
+    print("\nAll within budget")
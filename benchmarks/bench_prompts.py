@@ -0,0 +1,89 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_inference import start_stub
+
+# A 7B model on the free tier streams roughly 25 tokens a second
+TOKEN_LATENCY = 0.002
+BASE_LATENCY = 0.05
+
+stub, stub_url = start_stub(latency=BASE_LATENCY, token_latency=TOKEN_LATENCY)
+os.environ.update(HUGGINGFACE_MODEL_URL=stub_url, LATENCY_BUDGET='0')
+
+import app
+from prompts import GUIDE, PROMPT_VARIANTS, build_prompt, prompt_variant
+
+QUESTIONS = [
+    "How many matches are in a round robin?",
+    "What is a bye in a tournament?",
+    "What's the difference between Swiss and round robin?",
+    "How long should a chess game last in a rapid event?",
+    "What's the best way to seed players in a knockout tournament?",
+    "Which format suits a casual pub quiz league?",
+    "How do I handle no-shows at a tournament?",
+    "What equipment do I need for a chess tournament?",
+    "How do I plan a weekend esports tournament?",
+    "Give me a step by step guide to running a badminton tournament",
+    "I want to organize a round-robin league for my office",
+]
+
+
+def estimated_tokens(text):
+    """Rough token count for English text and markup (about 4 characters a token)"""
+    return len(text) // 4
+
+
+def ask(client, message):
+    """POST one uncached question; return milliseconds"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.post('/api/chat', json={'message': message, 'fresh': True})
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("PROMPT VARIANT BENCHMARK")
+    print("=" * 50)
+    print(f"\nStub model: {BASE_LATENCY * 1000:.0f} ms + {TOKEN_LATENCY * 1000:.0f} ms per max_new_tokens.\n"
+          "Before, every question got the full guide prompt and an 800 token budget.")
+
+    runs = 20000
+    start = time.perf_counter()
+    for _ in range(runs // len(QUESTIONS)):
+        for question in QUESTIONS:
+            build_prompt(question, prompt_variant(question))
+    per_call = (time.perf_counter() - start) / (runs // len(QUESTIONS) * len(QUESTIONS)) * 1e6
+    print(f"\nClassify and build a prompt: {per_call:.1f} us per question")
+
+    client = app.app.test_client()
+    by_variant = {variant.name: [] for variant in PROMPT_VARIANTS}
+    print(f"\n  {'question':62} {'variant':7} {'tokens in':>11} {'ms':>11}")
+    for question in QUESTIONS:
+        variant = prompt_variant(question)
+        old_tokens = estimated_tokens(build_prompt(question, GUIDE))
+        new_tokens = estimated_tokens(build_prompt(question, variant))
+        elapsed = ask(client, question)
+        old_elapsed = (BASE_LATENCY + TOKEN_LATENCY * GUIDE.parameters['max_new_tokens']) * 1000
+        by_variant[variant.name].append((old_tokens, new_tokens, old_elapsed, elapsed))
+        print(f"  {question[:62]:62} {variant.name:7} {old_tokens:5}>{new_tokens:<5} "
+              f"{old_elapsed:5.0f}>{elapsed:<5.0f}")
+
+    print(f"\n  {'variant':7} {'questions':>9} {'max_new_tokens':>14} {'input tokens':>12} {'mean ms':>11} {'saved':>6}")
+    for variant in PROMPT_VARIANTS:
+        rows = by_variant[variant.name]
+        if not rows:
+            continue
+        old_in, new_in, old_ms, new_ms = (sum(column) / len(rows) for column in zip(*rows))
+        print(f"  {variant.name:7} {len(rows):9} {GUIDE.parameters['max_new_tokens']:>6}>"
+              f"{variant.parameters['max_new_tokens']:<7} {old_in:5.0f}>{new_in:<6.0f} "
+              f"{old_ms:5.0f}>{new_ms:<5.0f} {1 - new_ms / old_ms:6.0%}")
+
+    print(f"\nUpstream calls: {stub.requests}")
+    stub.shutdown()
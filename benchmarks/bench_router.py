@@ -0,0 +1,150 @@
+import contextlib
+import io
+import itertools
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from router import ModelRouter
+from stub_inference import cold_start_latency, lognormal_latency
+
+REQUESTS = 800
+CLIENTS = 16
+
+
+class SimulatedBackend:
+    """A model backend answering after a latency drawn from its profile, failing error_rate of calls
+
+    After REQUESTS / 2 calls the profile switches to degraded, if there is one,
+    like a model server that starts struggling halfway through.
+    """
+
+    def __init__(self, name, profile, degraded=None, error_rate=0.0):
+        self.name = name
+        self.url = f'sim://{name}'
+        self.breaker = None
+        self.profile = profile
+        self.degraded = degraded
+        self.error_rate = error_rate
+        self.degraded_after = REQUESTS // 2
+        self.served = itertools.count()
+        self.calls = 0
+
+    def call(self):
+        """Answer one generation"""
+        self.calls += 1
+        profile = self.profile
+        if self.degraded is not None and next(self.served) >= self.degraded_after:
+            profile = self.degraded
+        time.sleep(profile())
+        if random.random() < self.error_rate:
+            raise ConnectionError(f"{self.name} dropped the connection")
+        return self.name
+
+
+def make_backends():
+    """A large hosted model with cold starts, a steady smaller one, and a fast local one that later slows down"""
+    return [
+        SimulatedBackend('hf:large', lambda: cold_start_latency(lognormal_latency(0.06)), error_rate=0.02),
+        SimulatedBackend('hf:small', lambda: random.uniform(0.06, 0.1)),
+        SimulatedBackend('local', lambda: lognormal_latency(0.04), degraded=lambda: lognormal_latency(0.3)),
+    ]
+
+
+def call_backend(backend):
+    """The router's call: ask one simulated backend"""
+    return backend.call()
+
+
+def primary_only(backends):
+    """What the app did before: every question to the first backend"""
+    def generate(call):
+        return backends[0], call(backends[0])
+    return generate
+
+
+def round_robin(backends):
+    """Take turns, failing over to the next backend"""
+    turns = itertools.cycle(range(len(backends)))
+    lock = threading.Lock()
+
+    def generate(call):
+        with lock:
+            start = next(turns)
+        error = None
+        for offset in range(len(backends)):
+            backend = backends[(start + offset) % len(backends)]
+            try:
+                return backend, call(backend)
+            except ConnectionError as e:
+                error = e
+        raise error
+    return generate
+
+
+def routed(hedge_factor):
+    """ModelRouter over the backends, hedging when hedge_factor is above 0"""
+    def build(backends):
+        executor = ThreadPoolExecutor(max_workers=2 * CLIENTS) if hedge_factor else None
+        router = ModelRouter(backends, hedge_factor=hedge_factor, hedge_min=0.05, executor=executor)
+        return router.generate
+    return build
+
+
+def run(strategy):
+    """Send REQUESTS questions from CLIENTS threads; return (latencies in ms, failures, backends)"""
+    random.seed(7)
+    backends = make_backends()
+    generate = strategy(backends)
+    latencies = []
+    failures = []
+
+    def ask(_):
+        start = time.perf_counter()
+        try:
+            generate(call_backend)
+        except ConnectionError:
+            failures.append(1)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Keep the router's failover and hedging logs out of the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=CLIENTS) as clients:
+            list(clients.map(ask, range(REQUESTS)))
+        # Let losing hedges finish so every backend call is counted
+        time.sleep(1)
+    return latencies, len(failures), backends
+
+
+def percentile(values, fraction):
+    """The value at fraction of the way through the sorted values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("MODEL ROUTER BENCHMARK")
+    print("=" * 50)
+    print(f"{REQUESTS} questions from {CLIENTS} clients. hf:large ~60 ms with 1 in 20 cold starts (10x) and 2% "
+          f"errors, hf:small 60-100 ms, local ~40 ms until halfway, then ~300 ms\n")
+    print(f"  {'strategy':24} {'p50':>7} {'p95':>7} {'p99':>7} {'failed':>6} {'calls/q':>7}  calls per backend")
+
+    strategies = [
+        ('primary only', primary_only),
+        ('round robin', round_robin),
+        ('router, no hedging', routed(0)),
+        ('router, hedging', routed(2.0)),
+    ]
+    for label, strategy in strategies:
+        latencies, failed, backends = run(strategy)
+        calls = sum(backend.calls for backend in backends)
+        shares = ', '.join(f"{backend.name} {backend.calls}" for backend in backends)
+        print(f"  {label:24} {statistics.median(latencies):5.0f}ms {percentile(latencies, 0.95):5.0f}ms "
+              f"{percentile(latencies, 0.99):5.0f}ms {failed:6} {calls / REQUESTS:7.2f}  {shares}")
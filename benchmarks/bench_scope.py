@@ -0,0 +1,94 @@
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scope import match_scope, TOURNAMENT_KEYWORDS, LOCATION_TIME_KEYWORDS, TOURNAMENT_PHRASES
+
+
+def legacy_is_tournament_related(message):
+    """The keyword-loop implementation that match_scope replaced"""
+    if len(message.strip()) < 3:
+        return False
+    tournament_keywords = list(TOURNAMENT_KEYWORDS)
+    message_lower = message.lower()
+    if re.search(r'\b\d{1,2}[-/\s]?\w+\b', message_lower):
+        return True
+    for word in list(LOCATION_TIME_KEYWORDS):
+        if word in message_lower.split():
+            return True
+    if re.search(r'\b(?:my|our|their|your|the)\s+(?:tournament|competition|match|game|event)\b', message_lower):
+        return True
+    for keyword in tournament_keywords:
+        if keyword.lower() in message_lower:
+            return True
+    for phrase in list(TOURNAMENT_PHRASES):
+        if phrase.lower() in message_lower:
+            return True
+    return False
+
+
+REAL_MESSAGES = [
+    "How do I organize a round-robin tournament?",
+    "What's the best format for 12 teams?",
+    "Help me create a schedule for a weekend tournament",
+    "How do I seed players in a bracket?",
+    "What equipment do I need for a chess tournament?",
+    "Explain double elimination format",
+    "How many matches would I need for a round-robin tournament with 8 teams?",
+    "hello",
+    "What is the capital of France?",
+    "Write me a poem about cats",
+    "hi",
+    "Can you recommend a recipe for dinner?",
+]
+
+
+def adversarial_messages():
+    """Long messages that defeat early exits in the keyword loops"""
+    rng = random.Random(7)
+    letters = 'bcdfhjkqvwxyz'
+    return [
+        # Near misses of real keywords, so every substring scan runs to the end
+        'tournamen mat pla brack ' * 400,
+        # Random consonant soup with no digits or keywords
+        ''.join(rng.choice(letters + ' ') for _ in range(10000)),
+        # A keyword only at the very end of a long message
+        'x' * 20000 + ' chess',
+        # Lots of whitespace-separated words for the split()-per-word check
+        'zz ' * 5000,
+    ]
+
+
+def bench(func, messages, number):
+    """Return microseconds per call for func over the messages"""
+    total = timeit.timeit(lambda: [func(m) for m in messages], number=number)
+    return total / (number * len(messages)) * 1e6
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("SCOPE MATCHER BENCHMARK")
+    print("=" * 50)
+
+    corpora = [
+        ("real", REAL_MESSAGES, 5000),
+        ("adversarial", adversarial_messages(), 50),
+    ]
+
+    for name, messages, number in corpora:
+        mismatches = [m[:40] for m in messages if legacy_is_tournament_related(m) != match_scope(m).related]
+        legacy = bench(legacy_is_tournament_related, messages, number)
+        compiled = bench(match_scope, messages, number)
+        print(f"\n{name} corpus ({len(messages)} messages)")
+        print(f"  legacy loops:     {legacy:10.2f} us/message")
+        print(f"  compiled matcher: {compiled:10.2f} us/message")
+        print(f"  speedup:          {legacy / compiled:10.1f}x")
+        print(f"  decision mismatches: {len(mismatches)} {mismatches}")
+
+    print("\nSample classifications:")
+    for message in REAL_MESSAGES:
+        print(f"  {message[:45]!r:50} -> {match_scope(message)}")
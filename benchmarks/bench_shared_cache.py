@@ -0,0 +1,58 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import ResponseCache, SharedResponseCache
+
+ANSWER = "<p>Seed the strongest teams apart so they meet late.</p>" * 20
+KEYS = [f"how do i seed a {teams} team bracket" for teams in range(1000)]
+
+
+def per_call_us(func, keys):
+    """Microseconds per call of func(key) over keys"""
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def worker(path, index, workers, ready, results):
+    """Write this worker's share of the keys, wait for the others, then read every key"""
+    cache = SharedResponseCache(path, max_entries=len(KEYS))
+    for key in KEYS[index::workers]:
+        cache.set(key, ANSWER)
+    ready.wait()
+    results.put(sum(cache.get(key) is not None for key in KEYS))
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("SHARED RESPONSE CACHE BENCHMARK")
+    print("=" * 50)
+
+    directory = tempfile.mkdtemp()
+    memory = ResponseCache(max_entries=len(KEYS))
+    shared = SharedResponseCache(os.path.join(directory, 'single.sqlite3'), max_entries=len(KEYS))
+    print(f"\n  {'':12} {'set us':>8} {'hit us':>8} {'miss us':>8}")
+    for name, cache in (('in memory', memory), ('SQLite WAL', shared)):
+        set_us = per_call_us(lambda key: cache.set(key, ANSWER), KEYS)
+        hit_us = per_call_us(cache.get, KEYS)
+        miss_us = per_call_us(cache.get, [key + ' please' for key in KEYS])
+        print(f"  {name:12} {set_us:8.1f} {hit_us:8.1f} {miss_us:8.1f}")
+
+    workers = 4
+    path = os.path.join(directory, 'workers.sqlite3')
+    ready = multiprocessing.Barrier(workers)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker, args=(path, index, workers, ready, results))
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+    seen = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    print(f"\n{workers} processes each wrote a quarter of {len(KEYS)} answers; each then found {seen}")
@@ -0,0 +1,106 @@
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import SimilarQuestionIndex, normalize_message
+
+FORMATS = ['round robin', 'single elimination', 'double elimination', 'swiss', 'group stage', 'knockout', 'ladder']
+SPORTS = ['chess', 'football', 'volleyball', 'basketball', 'tennis', 'badminton', 'esports', 'darts', 'cricket']
+ASKS = [
+    'How do I organize a {format} {sport} tournament for {n} teams?',
+    'What is the best {format} schedule for {n} {sport} players?',
+    'How many matches in a {format} with {n} teams?',
+    'How should I seed {n} {sport} teams in a {format} bracket?',
+    'What equipment do I need for a {sport} {format} event with {n} entrants?',
+    'How long does a {format} {sport} tournament take with {n} teams and {courts} courts?',
+]
+EXTRAS = ['on a weekend', 'at a school', 'with prizes', 'for beginners', 'in one day', 'with a consolation round',
+          'for a charity event', 'with referees', 'indoors', 'at a club']
+
+PARAPHRASES = [
+    ('16 team bracket', 'bracket for sixteen teams'),
+    ('16 team bracket', 'how to draw 16 teams'),
+    ('How do I organize a round robin for 8 teams?', 'organize round-robin with eight teams'),
+    ('How should I score a round robin?', 'round robin scoring'),
+    ('How do I seed players in a bracket?', 'Seeding players in brackets'),
+]
+DIFFERENT = [
+    ('How do I organize a round robin for 8 teams?', 'round robin for 10 teams'),
+    ('Explain double elimination format', 'explain single elimination format'),
+    ('How many courts do I need for a volleyball tournament?', 'how many courts for a basketball tournament'),
+]
+
+
+def synthetic_questions(count, seed=5):
+    """Distinct tournament questions built from templates"""
+    rng = random.Random(seed)
+    questions = set()
+    while len(questions) < count:
+        question = rng.choice(ASKS).format(format=rng.choice(FORMATS), sport=rng.choice(SPORTS),
+                                           n=rng.randint(3, 128), courts=rng.randint(1, 12))
+        questions.add(f"{question} {rng.choice(EXTRAS)}")
+    return [normalize_message(question) for question in questions]
+
+
+def percentiles(samples):
+    """Format mean / p99 of microsecond samples"""
+    ordered = sorted(samples)
+    return f"mean {statistics.mean(ordered):6.1f} us   p99 {ordered[int(len(ordered) * 0.99)]:6.1f} us"
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("SIMILAR QUESTION INDEX BENCHMARK")
+    print("=" * 50)
+
+    count = 100_000
+    questions = synthetic_questions(count + 10_000)
+    index = SimilarQuestionIndex(max_entries=count)
+
+    inserts = []
+    for question in questions[:count]:
+        start = time.perf_counter()
+        index.add(question)
+        inserts.append((time.perf_counter() - start) * 1e6)
+    print(f"\nInsert {count} questions:   {percentiles(inserts)}")
+
+    lookups = []
+    for question in questions[:10_000]:
+        start = time.perf_counter()
+        index.lookup(question)
+        lookups.append((time.perf_counter() - start) * 1e6)
+    print(f"Lookup stored questions:   {percentiles(lookups)}   found {index.matches} of 10000")
+
+    misses = []
+    for question in questions[count:]:
+        start = time.perf_counter()
+        index.lookup(question)
+        misses.append((time.perf_counter() - start) * 1e6)
+    print(f"Lookup new questions:      {percentiles(misses)}")
+
+    for question in questions[count:]:
+        index.add(question)
+    print(f"After 10000 more inserts:  {len(index.entries)} entries, {index.evictions} evicted")
+
+    # Measured on a second build: tracing slows every allocation down
+    tracemalloc.start()
+    traced = SimilarQuestionIndex(max_entries=count)
+    for question in questions[:count]:
+        traced.add(question)
+    print(f"Index memory at {count}:   {tracemalloc.get_traced_memory()[0] / 1e6:.0f} MB")
+    tracemalloc.stop()
+
+    print("\nParaphrases (should match):")
+    small = SimilarQuestionIndex()
+    for stored, _ in PARAPHRASES + DIFFERENT:
+        small.add(normalize_message(stored))
+    for stored, asked in PARAPHRASES:
+        print(f"  {asked!r:42} -> {small.lookup(normalize_message(asked))!r}")
+    print("\nDifferent questions (should not match):")
+    for stored, asked in DIFFERENT:
+        print(f"  {asked!r:42} -> {small.lookup(normalize_message(asked))!r}")
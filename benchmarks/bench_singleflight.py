@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_inference import start_stub
+
+stub, stub_url = start_stub(latency=0.5)
+os.environ['HUGGINGFACE_MODEL_URL'] = stub_url
+os.environ['UPSTREAM_POOL_SIZE'] = '256'
+
+import app
+import async_app
+from singleflight import SingleFlight, TooManyWaiters
+
+QUESTION = 'How should I seed a 16 team bracket?'
+# Same question once normalized, so it shares the cache key
+VARIANT = 'how should i seed a sixteen team bracket'
+
+
+def burst_threads(count):
+    """Ask the same question from count threads at once; return (answers, seconds)"""
+    answers = [None] * count
+    barrier = threading.Barrier(count)
+
+    def ask(index):
+        client = app.app.test_client()
+        barrier.wait()
+        response = client.post('/api/chat', json={'message': QUESTION if index % 2 else VARIANT})
+        answers[index] = response.get_json()['response']
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return answers, time.perf_counter() - start
+
+
+async def burst_async(count):
+    """Ask the same question from count coroutines at once; return (answers, seconds)"""
+    client = async_app.AsyncInferenceClient('stub-key')
+    await client.start()
+    try:
+        start = time.perf_counter()
+        answers = await asyncio.gather(*(async_app.handle_chat_request_async(client, QUESTION)
+                                         for _ in range(count)))
+        return [answer.html for answer in answers], time.perf_counter() - start
+    finally:
+        await client.close()
+
+
+def report(label, answers, seconds, requests, stats):
+    """Print how many upstream calls a burst needed"""
+    print(f"  {label:10} {len(answers)} answers in {seconds:.2f} s, {len(set(answers))} distinct, "
+          f"{requests} upstream call(s), coalesced {stats['coalesced']}")
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("REQUEST COALESCING CHECK")
+    print("=" * 50)
+    count = 200
+
+    print(f"\n{count} simultaneous identical questions against a 0.5 s stub:")
+    answers, seconds = burst_threads(count)
+    report('threads', answers, seconds, stub.requests, app.inflight_requests.stats())
+
+    app.response_cache.clear()
+    stub.requests = 0
+    answers, seconds = asyncio.run(burst_async(count))
+    report('asyncio', answers, seconds, stub.requests, async_app.inflight_requests.stats())
+
+    print("\nLeader failure reaches every waiter:")
+    flight = SingleFlight()
+    errors = []
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError('upstream exploded')
+
+    def caller():
+        try:
+            flight.do('key', failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"  {len(errors)} of 20 callers saw the error, in flight afterwards: {flight.stats()['in_flight']}")
+
+    print("\nWaiter cap:")
+    flight = SingleFlight(max_waiters=2)
+    call, _ = flight.join('key')
+    flight.join('key')
+    flight.join('key')
+    try:
+        flight.join('key')
+    except TooManyWaiters as e:
+        print(f"  fourth caller rejected ({e}); stats {flight.stats()}")
+    flight.complete('key', call, result='done')
+
+    stub.shutdown()
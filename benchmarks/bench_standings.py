@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from standings import Leaderboard
+
+PARTICIPANTS = 10000
+UPDATES = 1000000
+RANK_LOOKUPS = 100000
+
+
+def full_sort(leaderboard):
+    """What the RankedList replaces: sorting every participant's key"""
+    return sorted(leaderboard.sort_key(index) for index in range(len(leaderboard.names)))
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("LIVE STANDINGS BENCHMARK")
+    print("=" * 50)
+
+    rng = random.Random(15)
+    leaderboard = Leaderboard(PARTICIPANTS)
+    matches = [(*rng.sample(range(1, PARTICIPANTS + 1), 2), rng.randint(0, 4), rng.randint(0, 4))
+               for _ in range(UPDATES)]
+
+    print(f"\n{PARTICIPANTS} participants, {UPDATES} reported results:")
+    start = time.perf_counter()
+    for home, away, home_score, away_score in matches:
+        leaderboard.record(home, away, home_score, away_score)
+    elapsed = time.perf_counter() - start
+    print(f"  Report a result:        {elapsed / UPDATES * 1e6:.1f} us ({elapsed:.1f} s in all)")
+
+    seeds = [rng.randint(1, PARTICIPANTS) for _ in range(RANK_LOOKUPS)]
+    start = time.perf_counter()
+    for seed in seeds:
+        leaderboard.rank(seed)
+    print(f"  Rank of a participant:  {(time.perf_counter() - start) / RANK_LOOKUPS * 1e6:.1f} us")
+
+    offsets = [rng.randrange(PARTICIPANTS - 50) for _ in range(1000)]
+    start = time.perf_counter()
+    for offset in offsets:
+        leaderboard.page(offset, 50)
+    print(f"  Page of 50 standings:   {(time.perf_counter() - start) / len(offsets) * 1e3:.2f} ms")
+
+    start = time.perf_counter()
+    expected = full_sort(leaderboard)
+    print(f"  Re-sorting instead:     {(time.perf_counter() - start) * 1e3:.1f} ms per result")
+    print(f"  Live order matches a full sort: {leaderboard.ranked.slice(0, PARTICIPANTS) == expected}")
+
+    start = time.perf_counter()
+    for home, away, home_score, away_score in matches[:100000]:
+        leaderboard.record(home, away, home_score, away_score, retract=True)
+    print(f"  Retract a result:       {(time.perf_counter() - start) / 100000 * 1e6:.1f} us")
+    print(f"  Still matches after retractions: {leaderboard.ranked.slice(0, PARTICIPANTS) == full_sort(leaderboard)}")
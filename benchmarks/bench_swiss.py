@@ -0,0 +1,75 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swiss import SwissTournament
+
+PLAYERS = 5000
+ROUNDS = 9
+
+
+def simulate_result(rng, white, black, strength):
+    """White's points from a noisy strength comparison, with draws between close players"""
+    margin = strength[white.seed] - strength[black.seed] + rng.gauss(0, 400)
+    return 1 if margin > 60 else 0 if margin < -60 else 0.5
+
+
+def recompute_tiebreaks(players):
+    """What the incremental update replaces: Buchholz and Sonneborn-Berger from scratch"""
+    return {player.seed: (sum(opponent.score for opponent, _ in player.games),
+                          sum(opponent.score * points for opponent, points in player.games))
+            for player in players}
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("SWISS PAIRING BENCHMARK")
+    print("=" * 50)
+
+    rng = random.Random(9)
+    tournament = SwissTournament(PLAYERS, ROUNDS)
+    strength = {player.seed: 2400 - player.seed * 0.2 + rng.gauss(0, 150) for player in tournament.players}
+
+    print(f"\n{PLAYERS} players, {ROUNDS} rounds:")
+    print(f"  {'round':>5} {'pair ms':>8} {'report us/result':>17} {'mixed-score boards':>19}")
+    report_times = []
+    start = time.perf_counter()
+    for number in range(1, ROUNDS + 1):
+        began = time.perf_counter()
+        pairings, bye = tournament.pair_round()
+        pair_ms = (time.perf_counter() - began) * 1000
+        mixed = sum(pairing.white.score != pairing.black.score for pairing in pairings)
+        round_times = []
+        for pairing in pairings:
+            result = simulate_result(rng, pairing.white, pairing.black, strength)
+            began = time.perf_counter()
+            tournament.report(pairing.board, result)
+            round_times.append((time.perf_counter() - began) * 1e6)
+        report_times += round_times
+        print(f"  {number:5} {pair_ms:8.1f} {statistics.mean(round_times):17.1f} {mixed:19}")
+    print(f"  all {ROUNDS} rounds paired and reported in {time.perf_counter() - start:.2f} s")
+
+    began = time.perf_counter()
+    tournament.standings()
+    standings_ms = (time.perf_counter() - began) * 1000
+    began = time.perf_counter()
+    expected = recompute_tiebreaks(tournament.players)
+    recompute_ms = (time.perf_counter() - began) * 1000
+    correct = all(abs(player.buchholz - expected[player.seed][0]) < 1e-9
+                  and abs(player.sonneborn_berger - expected[player.seed][1]) < 1e-9
+                  for player in tournament.players)
+
+    print(f"\nStandings sort:                 {standings_ms:.1f} ms")
+    print(f"Incremental tiebreak update:    {statistics.mean(report_times):.1f} us per result")
+    print(f"Recomputing tiebreaks instead:  {recompute_ms:.1f} ms per result")
+    print(f"Incremental values match:       {correct}")
+
+    opponents = [(player.seed, opponent.seed) for player in tournament.players for opponent, _ in player.games]
+    imbalance = [abs(sum(player.colours)) for player in tournament.players]
+    print(f"Rematches:                      {len(opponents) - len(set(opponents))}")
+    print(f"Colour imbalance > 1:           {sum(value > 1 for value in imbalance)} players "
+          f"(worst {max(imbalance)})")
@@ -0,0 +1,63 @@
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_inference import start_stub
+from upstream import InferenceClient
+
+PAYLOAD = {'inputs': 'How do I run a 16 team bracket?', 'parameters': {'max_new_tokens': 200}}
+
+
+def run(label, call, count):
+    """Time count sequential calls and print the latency summary"""
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"  {label:22} mean {statistics.mean(timings):6.2f} ms   p95 {sorted(timings)[int(count * 0.95)]:6.2f} ms")
+
+
+if __name__ == '__main__':
+    print("\n" + "=" * 50)
+    print("INFERENCE CLIENT BENCHMARK")
+    print("=" * 50)
+
+    server, url = start_stub(latency=0.005)
+    client = InferenceClient('stub-key', pool_size=4, backoff_base=0.05)
+
+    print("\nSequential calls against a 5 ms stub:")
+    server.connections.clear()
+    run('bare requests.post', lambda: requests.post(url, json=PAYLOAD, timeout=20), 200)
+    print(f"  {'':22} connections opened: {len(server.connections)}")
+    server.connections.clear()
+    run('pooled client', lambda: client.post(url, PAYLOAD), 200)
+    print(f"  {'':22} connections opened: {len(server.connections)}")
+
+    print("\nModel loading (two 503 responses, then success):")
+    server.loading_responses = 2
+    response, timing = client.post(url, PAYLOAD)
+    print(f"  status {response.status_code} after {timing.attempts} attempts, "
+          f"{timing.elapsed * 1000:.1f} ms total, {timing.backoff * 1000:.1f} ms in backoff")
+
+    print("\nModel loading past the retry limit:")
+    server.loading_responses = 5
+    response, timing = client.post(url, PAYLOAD)
+    print(f"  status {response.status_code} after {timing.attempts} attempts")
+    server.loading_responses = 0
+
+    print("\nRead timeout (not retried):")
+    server.latency = 0.5
+    slow = InferenceClient('stub-key', read_timeout=0.1)
+    start = time.perf_counter()
+    try:
+        slow.post(url, PAYLOAD)
+    except requests.exceptions.ReadTimeout:
+        print(f"  ReadTimeout after {(time.perf_counter() - start) * 1000:.0f} ms, requests sent: 1")
+
+    server.shutdown()
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_inference import start_stub
+
+SERVERS = {
+    'flask (threaded dev server)': "import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)",
+    'aiohttp (async_app)': "import async_app; async_app.web.run_app(async_app.create_app(), host='127.0.0.1', port={port}, print=None)",
+}
+
+
+def rss_mb(pid):
+    """Resident memory of a process in MB, read from /proc"""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def thread_count(pid):
+    """Number of OS threads in a process"""
+    return len(os.listdir(f'/proc/{pid}/task'))
+
+
+async def wait_until_up(url, timeout=15):
+    """Poll the server until it answers"""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(url + '/api/cache/stats') as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f'{url} did not start')
+
+
+async def burst(url, concurrency, pid):
+    """Fire concurrency simultaneous chat requests; return latencies and peak threads"""
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=120)
+    peak_threads = 0
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def one(index):
+            start = time.perf_counter()
+            payload = {'message': f'How should I seed a {index + 4} team bracket?', 'fresh': True}
+            async with session.post(url + '/api/chat', json=payload) as response:
+                await response.read()
+                return response.status, time.perf_counter() - start
+
+        async def sample_threads():
+            nonlocal peak_threads
+            while True:
+                peak_threads = max(peak_threads, thread_count(pid))
+                await asyncio.sleep(0.05)
+
+        sampler = asyncio.create_task(sample_threads())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(concurrency)), return_exceptions=True)
+        wall = time.perf_counter() - start
+        sampler.cancel()
+
+    latencies = [r[1] for r in results if not isinstance(r, BaseException) and r[0] == 200]
+    return latencies, wall, peak_threads
+
+
+async def run_server(name, code, port, stub_url, levels):
+    """Start one server in a subprocess and drive bursts at each concurrency level"""
+    env = dict(os.environ, HUGGINGFACE_MODEL_URL=stub_url, UPSTREAM_POOL_SIZE='1024',
+               ASYNC_UPSTREAM_CONCURRENCY='1024', PORT=str(port))
+    process = subprocess.Popen([sys.executable, '-c', code.format(port=port)], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    try:
+        await wait_until_up(url)
+        idle_rss = rss_mb(process.pid)
+        print(f"\n{name}: idle RSS {idle_rss:.1f} MB")
+        print(f"  {'concurrent':>10} {'ok':>5} {'wall s':>7} {'p50 s':>6} {'p95 s':>6} {'req/s':>7} {'threads':>8} {'RSS MB':>7}")
+        for concurrency in levels:
+            latencies, wall, peak_threads = await burst(url, concurrency, process.pid)
+            p50 = statistics.median(latencies) if latencies else float('nan')
+            p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1] if latencies else float('nan')
+            print(f"  {concurrency:>10} {len(latencies):>5} {wall:>7.2f} {p50:>6.2f} {p95:>6.2f} "
+                  f"{len(latencies) / wall:>7.1f} {peak_threads:>8} {rss_mb(process.pid):>7.1f}")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def main(levels, upstream_latency):
+    stub, stub_url = start_stub(latency=upstream_latency)
+    print(f"Stub upstream latency: {upstream_latency:.2f} s per generation")
+    for port, (name, code) in enumerate(SERVERS.items(), start=5301):
+        await run_server(name, code, port, stub_url, levels)
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Concurrent /api/chat load test against a stub upstream')
+    parser.add_argument('--levels', default='8,64,256,512', help='comma separated concurrency levels')
+    parser.add_argument('--latency', type=float, default=1.0, help='stub generation latency in seconds')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 50)
+    print("SYNC VS ASYNC LOAD TEST")
+    print("=" * 50)
+    asyncio.run(main([int(level) for level in args.levels.split(',')], args.latency))
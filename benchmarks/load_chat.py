@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_async import SERVERS, wait_until_up
+from stub_inference import LATENCY_DISTRIBUTIONS, start_stub
+
+# What users ask: mostly planning questions (several asked by many people,
+# so the cache and coalescing matter), some fixture questions answered
+# without the model, and the occasional off-topic message
+QUESTIONS = [
+    "How should I seed players in a knockout tournament?",
+    "What's the best format for a weekend esports event?",
+    "How do I handle no-shows at a tournament?",
+    "What equipment do I need for a chess tournament?",
+    "How do I pick prizes for a tournament?",
+    "How many referees does a football tournament need?",
+    "What tiebreakers should a round robin use?",
+    "How do I run a Swiss tournament?",
+]
+FIXTURE_QUESTIONS = ["16 team bracket", "round robin for 6 teams", "double elimination for 12 players"]
+OFF_TOPIC = ["What's the weather tomorrow?", "Write me a poem about cats"]
+
+# name: (stub settings, server environment)
+SCENARIOS = {
+    'steady': (dict(latency=0.5, distribution='lognormal'), {}),
+    'cold-starts': (dict(latency=0.5, distribution='cold', loading_responses=20, estimated_time=0.5), {}),
+    'slow-with-budget': (dict(latency=2.0, distribution='lognormal'), {'LATENCY_BUDGET': '1.5'}),
+}
+FALLBACK_SOURCES = ('offline', 'deadline')
+
+
+def pick_question(rng, turn):
+    """A session's next message: its own variation of a common question, a fixture question or off-topic"""
+    roll = rng.random()
+    if roll < 0.1:
+        return rng.choice(OFF_TOPIC)
+    if roll < 0.25:
+        return rng.choice(FIXTURE_QUESTIONS)
+    question = rng.choice(QUESTIONS)
+    # Half the planning questions are worded uniquely, so they miss the cache
+    return question if rng.random() < 0.5 else f"{question[:-1]} (turn {turn}, #{rng.randrange(10 ** 6)})?"
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+async def session(client, url, index, deadline, think_time, results):
+    """One user: ask, read the answer, think, ask again until the deadline"""
+    rng = random.Random(index)
+    cookies = {'session_id': f'load-{index}'}
+    turn = 0
+    while time.monotonic() < deadline:
+        message = pick_question(rng, turn)
+        start = time.perf_counter()
+        try:
+            async with client.post(url + '/api/chat', json={'message': message}, cookies=cookies) as response:
+                data = await response.json(content_type=None)
+                results.append((response.status, data.get('source', 'error'), time.perf_counter() - start))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            results.append((0, 'error', time.perf_counter() - start))
+        turn += 1
+        await asyncio.sleep(rng.expovariate(1 / think_time) if think_time > 0 else 0)
+
+
+async def fallback_reasons(client, url):
+    """Offline fallback counts by reason, read from the server's /metrics"""
+    reasons = {}
+    async with client.get(url + '/metrics') as response:
+        for line in (await response.text()).splitlines():
+            if line.startswith('tournamentgenius_offline_fallbacks_total{'):
+                labels, value = line.rsplit(' ', 1)
+                reasons[labels.split('"')[1]] = int(float(value))
+    return reasons
+
+
+async def drive(url, sessions, duration, think_time):
+    """Run concurrent sessions for duration seconds; return (results, wall seconds, fallback reasons)"""
+    results = []
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as client:
+        start = time.perf_counter()
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(session(client, url, index, deadline, think_time, results)
+                               for index in range(sessions)))
+        wall = time.perf_counter() - start
+        reasons = await fallback_reasons(client, url)
+    return results, wall, reasons
+
+
+def report(name, results, wall, reasons):
+    """Print throughput, latency percentiles and where answers came from"""
+    ok = sorted(elapsed for status, _, elapsed in results if status == 200)
+    sources = {}
+    for status, source, _ in results:
+        sources[source] = sources.get(source, 0) + 1
+    answered = sum(count for source, count in sources.items() if source != 'error')
+    fallbacks = sum(sources.get(source, 0) for source in FALLBACK_SOURCES)
+    print(f"  {name:18} {len(results):6} {len(results) - len(ok):6} {len(results) / wall:7.1f} "
+          f"{percentile(ok, 0.5) * 1000:7.0f} {percentile(ok, 0.95) * 1000:7.0f} {percentile(ok, 0.99) * 1000:7.0f} "
+          f"{fallbacks / answered if answered else 0:8.1%}")
+    print(f"  {'':18} sources: " + ', '.join(f"{source} {count}" for source, count in sorted(sources.items())))
+    if reasons:
+        print(f"  {'':18} fallback reasons: " + ', '.join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+
+
+async def run_scenario(name, server, port, sessions, duration, think_time):
+    """Start a stub and a fresh server for one scenario and drive load through it"""
+    stub_options, server_env = SCENARIOS[name]
+    stub, stub_url = start_stub(**stub_options)
+    env = dict(os.environ, HUGGINGFACE_MODEL_URL=stub_url, UPSTREAM_POOL_SIZE='256',
+               ASYNC_UPSTREAM_CONCURRENCY='256', PORT=str(port), **server_env)
+    process = subprocess.Popen([sys.executable, '-c', SERVERS[server].format(port=port)], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    try:
+        await wait_until_up(url)
+        results, wall, reasons = await drive(url, sessions, duration, think_time)
+        report(name, results, wall, reasons)
+    finally:
+        process.terminate()
+        process.wait()
+        stub.shutdown()
+
+
+async def main(args):
+    server = next(name for name in SERVERS if name.startswith(args.server))
+    print(f"\n{server}: {args.sessions} sessions for {args.duration:.0f} s each, "
+          f"{args.think:.1f} s mean think time")
+    print(f"\n  {'scenario':18} {'reqs':>6} {'errors':>6} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'p99 ms':>7} {'fallback':>8}")
+    for port, name in enumerate(args.scenarios.split(','), start=5401):
+        await run_scenario(name, server, port, args.sessions, args.duration, args.think)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Concurrent chat sessions against a stub inference upstream')
+    parser.add_argument('--server', choices=['flask', 'aiohttp'], default='aiohttp')
+    parser.add_argument('--sessions', type=int, default=64, help='concurrent users')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per scenario')
+    parser.add_argument('--think', type=float, default=1.0, help='mean seconds between a user\'s questions')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma separated, from {', '.join(SCENARIOS)}")
+    args = parser.parse_args()
+    for name in args.scenarios.split(','):
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+
+    print("\n" + "=" * 50)
+    print("CHAT LOAD TEST")
+    print("=" * 50)
+    print(f"Stub latency distributions available: {', '.join(sorted(LATENCY_DISTRIBUTIONS))}")
+    asyncio.run(main(args))
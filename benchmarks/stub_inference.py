@@ -0,0 +1,194 @@
+import argparse
+import contextlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TEXT = ("Single elimination is the quickest format for 16 teams.\n\n"
+                "1. Seed teams by ranking\n2. Play four rounds\n3. Crown the winner\n\n"
+                "- Add a third place match if time allows")
+
+
+def uniform_latency(latency):
+    """Anywhere from no delay to twice latency"""
+    return random.uniform(0, 2 * latency)
+
+
+def lognormal_latency(latency):
+    """Latency with the long right tail real generation times show; latency is the median"""
+    return random.lognormvariate(math.log(latency), 0.5) if latency > 0 else 0.0
+
+
+def cold_start_latency(latency):
+    """One request in 20 is ten times slower, like a replica that has to load the model first"""
+    return latency * 10 if random.random() < 0.05 else latency
+
+
+# How one request's generation time is drawn from the configured latency
+LATENCY_DISTRIBUTIONS = {
+    'fixed': float,
+    'uniform': uniform_latency,
+    'lognormal': lognormal_latency,
+    'cold': cold_start_latency,
+}
+
+
+class StubInferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open hundreds of connections at once
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients that time out and hang up are part of the scenarios
+        pass
+
+
+class StubInferenceHandler(BaseHTTPRequestHandler):
+    """Answer POSTs the way the Hugging Face text-generation endpoint does
+
+    server.mode switches the stub between 'healthy', 'slow' (answers only
+    after slow_latency seconds) and 'failing' (500 for every request).
+    server.token_latency adds that many seconds per requested max_new_tokens,
+    the way a real model's generation time grows with its output budget, and
+    server.sample_latency (one of LATENCY_DISTRIBUTIONS) draws each healthy
+    request's latency from server.latency. server.shape picks the response
+    body: 'list' ([{"generated_text": ...}], what the endpoint returns),
+    'dict' ({"generated_text": ...}) or 'openai' (an OpenAI-compatible chat
+    completion, streamed as delta chunks ending in [DONE]). server.slots, when set, is a semaphore
+    bounding how many generations run at once, like a replica with a fixed
+    number of batch slots; other requests wait for one.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        server = self.server
+
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            server.last_inputs = payload.get('inputs', '')
+            loading = server.loading_responses > 0
+            if loading:
+                server.loading_responses -= 1
+
+        if server.mode == 'failing':
+            self.send_json(500, {'error': 'Internal Server Error'})
+            return
+
+        if loading:
+            self.send_json(503, {'error': 'Model mistralai/Mistral-7B-Instruct-v0.2 is currently loading',
+                                 'estimated_time': server.estimated_time})
+            return
+
+        latency = server.slow_latency if server.mode == 'slow' else server.sample_latency(server.latency)
+        max_tokens = payload.get('max_tokens') or payload.get('parameters', {}).get('max_new_tokens', 0)
+        latency += server.token_latency * max_tokens
+        with server.slots or contextlib.nullcontext():
+            if payload.get('stream'):
+                self.send_stream(server.text, latency, server.shape == 'openai')
+                return
+
+            time.sleep(latency)
+        if server.shape == 'openai':
+            self.send_json(200, {'object': 'chat.completion',
+                                 'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': server.text},
+                                              'finish_reason': 'stop'}]})
+            return
+        body = {'generated_text': server.text}
+        self.send_json(200, [body] if server.shape == 'list' else body)
+
+    def send_stream(self, text, latency, openai=False):
+        """Send text as chunked server-sent token events spread over latency seconds"""
+        tokens = re.findall(r'\S+\s*|\s+', text)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for index, token in enumerate(tokens):
+            time.sleep(latency / len(tokens))
+            if openai:
+                event = {'object': 'chat.completion.chunk', 'choices': [{'index': 0, 'delta': {'content': token}}]}
+            else:
+                last = index == len(tokens) - 1
+                event = {'token': {'id': index, 'text': token, 'special': False},
+                         'generated_text': text if last else None}
+            self.send_chunk(f"data:{json.dumps(event)}\n\n".encode())
+        if openai:
+            self.send_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def send_chunk(self, data):
+        """Write one HTTP chunk"""
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+def start_stub(latency=0.05, loading_responses=0, estimated_time=0.05, text=DEFAULT_TEXT, port=0,
+               mode='healthy', slow_latency=30, token_latency=0.0, distribution='fixed', shape='list', slots=0):
+    """Start the stub on a background thread; returns (server, url)
+
+    slots > 0 limits concurrent generations to that many.
+    """
+    server = StubInferenceServer(('127.0.0.1', port), StubInferenceHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.connections = set()
+    server.last_inputs = ''
+    server.latency = latency
+    server.sample_latency = LATENCY_DISTRIBUTIONS[distribution]
+    server.shape = shape
+    server.loading_responses = loading_responses
+    server.estimated_time = estimated_time
+    server.text = text
+    server.mode = mode
+    server.slow_latency = slow_latency
+    server.token_latency = token_latency
+    server.slots = threading.BoundedSemaphore(slots) if slots > 0 else None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/models/stub'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-in for the Hugging Face inference API')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds per generation')
+    parser.add_argument('--loading', type=int, default=0, help='number of 503 "loading" responses to send first')
+    parser.add_argument('--mode', choices=['healthy', 'slow', 'failing'], default='healthy')
+    parser.add_argument('--token-latency', type=float, default=0.0,
+                        help='extra seconds per requested max_new_tokens')
+    parser.add_argument('--distribution', choices=sorted(LATENCY_DISTRIBUTIONS), default='fixed',
+                        help='how latency varies between requests (--latency is the median)')
+    parser.add_argument('--shape', choices=['list', 'dict', 'openai'], default='list', help='response body shape')
+    parser.add_argument('--slots', type=int, default=0, help='concurrent generations (0 for no limit)')
+    args = parser.parse_args()
+
+    server, url = start_stub(args.latency, args.loading, port=args.port, mode=args.mode,
+                             token_latency=args.token_latency, distribution=args.distribution, shape=args.shape,
+                             slots=args.slots)
+    print(f"Stub inference server at {url}")
+    print(f"Run the app with HUGGINGFACE_MODEL_URL={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an upstream the breaker considers down"""
+
+
+class CircuitBreaker:
+    """Stop calling a failing upstream until it has had time to recover
+
+    Closed: calls go through and failures (errors, timeouts, non-200
+    statuses) are counted over a sliding window. Once failure_threshold
+    failures fall inside window seconds the breaker opens, and calls are
+    refused immediately for recovery_time seconds. It then goes half-open
+    and lets up to half_open_probes calls through: a successful probe closes
+    it again, a failed one reopens it for another recovery_time.
+    """
+
+    def __init__(self, failure_threshold=5, window=30, recovery_time=15, half_open_probes=1,
+                 clock=time.monotonic, history=50):
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.recovery_time = recovery_time
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = deque()
+        self.opened_at = None
+        self.probes = 0
+        self.rejected = 0
+        self.transitions = deque(maxlen=history)
+
+    def allow(self):
+        """Return True if a call may go to the upstream now
+
+        A True from a half-open breaker reserves a probe slot, so every
+        allowed call must be followed by record_success(), record_failure()
+        or release().
+        """
+        with self.lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.recovery_time:
+                self.transition(HALF_OPEN, f"{self.recovery_time}s recovery time elapsed")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self.probes < self.half_open_probes:
+                self.probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """Count a call that got a usable answer"""
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.probes = max(0, self.probes - 1)
+                self.transition(CLOSED, 'probe succeeded')
+
+    def record_failure(self, reason):
+        """Count a call that errored, timed out or returned a bad status"""
+        with self.lock:
+            now = self.clock()
+            if self.state == HALF_OPEN:
+                self.probes = max(0, self.probes - 1)
+                self.open(now, f"probe failed: {reason}")
+                return
+            if self.state == OPEN:
+                return
+            self.failures.append(now)
+            while self.failures and now - self.failures[0] > self.window:
+                self.failures.popleft()
+            if len(self.failures) >= self.failure_threshold:
+                self.open(now, f"{len(self.failures)} failures in {self.window}s, last: {reason}")
+
+    def release(self):
+        """Give back a probe slot for a call that ended without an outcome"""
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.probes = max(0, self.probes - 1)
+
+    def open(self, now, reason):
+        """Refuse calls for the next recovery_time seconds (lock held)"""
+        self.opened_at = now
+        self.transition(OPEN, reason)
+
+    def transition(self, state, reason):
+        """Move to a new state and remember why (lock held)"""
+        print(f"Circuit breaker {self.state} -> {state}: {reason}")
+        self.transitions.append({'at': time.time(), 'from': self.state, 'to': state, 'reason': reason})
+        self.state = state
+        self.failures.clear()
+        self.probes = 0
+
+    def stats(self):
+        """Return the current state, counters and recent transitions"""
+        with self.lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.recovery_time - (self.clock() - self.opened_at)), 3)
+            return {
+                'state': self.state,
+                'recent_failures': len(self.failures),
+                'failure_threshold': self.failure_threshold,
+                'retry_in': retry_in,
+                'rejected': self.rejected,
+                'transitions': list(self.transitions)
+            }
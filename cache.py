@@ -0,0 +1,398 @@
+import math
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+NUMBER_WORDS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'thirteen': 13, 'fourteen': 14, 'fifteen': 15, 'sixteen': 16,
+    'seventeen': 17, 'eighteen': 18, 'nineteen': 19
+}
+TENS_WORDS = {
+    'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50,
+    'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90
+}
+
+DIGIT_GROUP_PATTERN = re.compile(r'(?<=\d),(?=\d{3}\b)')
+# Punctuation, except separators inside a number such as 2.5, 2:30 or 3/4
+PUNCTUATION_PATTERN = re.compile(r'(?!(?<=\d)[.,:/](?=\d))[^\w\s]|_')
+LEADING_ZEROS_PATTERN = re.compile(r'(?<!\S)0+(?=\d)')
+
+
+def normalize_message(message):
+    """Reduce a message to a cache key that ignores case, spacing, punctuation and number spelling
+
+    "What's the best format for Sixteen teams?" and
+    "whats the best format for 16 teams" normalize to the same key.
+    Separators inside numbers are kept, so "2.5 hours" stays apart
+    from "2 5 hours".
+    """
+    text = DIGIT_GROUP_PATTERN.sub('', message.lower())
+    text = PUNCTUATION_PATTERN.sub(lambda m: '' if m.group() == "'" else ' ', text)
+    text = LEADING_ZEROS_PATTERN.sub('', text)
+
+    words = []
+    for word in text.split():
+        if word in NUMBER_WORDS and words and words[-1] in TENS_WORDS.values() and NUMBER_WORDS[word] < 10:
+            # "twenty four" -> 24
+            words[-1] = words[-1] + NUMBER_WORDS[word]
+        elif word in NUMBER_WORDS:
+            words.append(NUMBER_WORDS[word])
+        elif word in TENS_WORDS:
+            words.append(TENS_WORDS[word])
+        else:
+            words.append(word)
+    return ' '.join(str(word) for word in words)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a per-entry time to live"""
+
+    def __init__(self, max_entries=1024, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, evicting the least recently used entries when full"""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class SQLiteConnections:
+    """One SQLite connection per thread and process for a database file
+
+    Connections are opened on first use and reopened in a forked child, so
+    none is ever shared across threads or carried over a fork.
+    """
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.local = threading.local()
+
+    def get(self):
+        """This thread's connection, in autocommit mode"""
+        db = getattr(self.local, 'db', None)
+        if db is None or self.local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                 check_same_thread=False)
+            db.execute('PRAGMA synchronous=NORMAL')
+            self.local.db = db
+            self.local.pid = os.getpid()
+        return db
+
+
+class SharedResponseCache:
+    """ResponseCache kept in a SQLite file, shared by every process that opens it
+
+    Worker processes of one server (see serve.py) open the same file, so an
+    answer one worker generated is a hit in all of them. The database runs
+    in WAL mode: lookups never wait for a writer, and a write waits at
+    most busy_timeout seconds for another. Values must be strings. When the cache is full
+    the oldest written entries are evicted; hits do not reorder entries,
+    since that would make every lookup a write. Hit and miss counters are
+    per process.
+    """
+
+    def __init__(self, path, max_entries=1024, ttl=3600, busy_timeout=5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.connections = SQLiteConnections(path, busy_timeout)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        db = self.connections.get()
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('CREATE TABLE IF NOT EXISTS answers '
+                   '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, written REAL NOT NULL)')
+        db.execute('CREATE INDEX IF NOT EXISTS answers_written ON answers (written)')
+
+    def record_lookup(self, hit):
+        """Count one lookup as a hit or a miss"""
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        row = self.connections.get().execute('SELECT value, expires FROM answers WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            self.record_lookup(False)
+            return None
+        self.record_lookup(True)
+        return row[0]
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, evicting expired and then the oldest entries when full"""
+        now = time.time()
+        db = self.connections.get()
+        db.execute('INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)',
+                   (key, value, now + (self.ttl if ttl is None else ttl), now))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            db.execute('DELETE FROM answers WHERE expires <= ?', (now,))
+            excess = len(self) - self.max_entries
+        if excess > 0:
+            db.execute('DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY written LIMIT ?)',
+                       (excess,))
+            with self.lock:
+                self.evictions += excess
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        self.connections.get().execute('DELETE FROM answers')
+
+    def __len__(self):
+        return self.connections.get().execute('SELECT COUNT(*) FROM answers').fetchone()[0]
+
+    def stats(self):
+        """Return a snapshot of the cache counters, with entries counted across every process"""
+        entries = len(self)
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'path': self.path
+            }
+
+
+# Words that carry no meaning for matching questions to each other
+STOP_WORDS = frozenset('''
+    a about am an and any are as at be best can could describe do does
+    explain for from get give good have help how i if in into is it its
+    me mean much my need of on or our please should so some that the their
+    them then there these this to tell up use us want way we what whats
+    when where which who why will with work would you your
+'''.split())
+# Different words people use for the same tournament concept
+SYNONYMS = {
+    'draw': 'bracket', 'knockout': 'elimination', 'ko': 'elimination',
+    'fixture': 'schedule', 'timetable': 'schedule', 'roundrobin': 'round robin'
+}
+
+
+def stem(word):
+    """Fold common English endings: "teams", "seeding" and "seeded" -> "team", "seed" """
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    if len(word) > 5 and word.endswith('ing'):
+        word = word[:-3]
+    elif len(word) > 4 and word.endswith('ed'):
+        word = word[:-2]
+    # "score" and "scoring" both become "scor"
+    return word[:-1] if len(word) > 3 and word.endswith('e') else word
+
+
+def question_features(key):
+    """Split a normalized question into (content words, numbers)
+
+    Endings are folded and synonyms mapped, so "how to draw 16 teams" and
+    "16 team bracket" share their words.
+    """
+    words = set()
+    numbers = []
+    for word in key.split():
+        if word.isdigit():
+            numbers.append(word)
+        elif word not in STOP_WORDS:
+            words.update(sys.intern(stem(part)) for part in SYNONYMS.get(word, word).split())
+    return frozenset(words), tuple(sorted(numbers))
+
+
+class SimilarQuestionIndex:
+    """Find a previously answered question that a new one is a paraphrase of
+
+    Works on normalized cache keys, so number spelling is already folded.
+    Candidates come from MinHash locality-sensitive hashing over the content
+    words, and are accepted when their IDF-weighted Jaccard similarity is at
+    least threshold. The numbers in two questions must match exactly: an
+    answer for 8 teams is never served for 10. Thread-safe; the least
+    recently used questions are evicted beyond max_entries.
+    """
+
+    def __init__(self, threshold=0.75, max_entries=100_000, bands=8, rows=2, max_candidates=32, seed=17):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = rows
+        self.max_candidates = max_candidates
+        rng = random.Random(seed)
+        # Multiply-shift hash functions standing in for random permutations
+        self.permutations = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(bands * rows)]
+        # key -> (words, numbers, bucket ids), oldest first
+        self.entries = OrderedDict()
+        self.buckets = {}
+        self.document_frequency = {}
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+        self.evictions = 0
+
+    def bucket_ids(self, words, numbers):
+        """Return the LSH bucket of each band for a question's features"""
+        hashes = [zlib.crc32(word.encode()) for word in words]
+        signature = [min(((a * h + b) & 0xFFFFFFFFFFFFFFFF) >> 32 for h in hashes) for a, b in self.permutations]
+        rows = self.rows
+        return tuple(hash((band, numbers, *signature[band * rows:(band + 1) * rows])) for band in range(self.bands))
+
+    def add(self, key):
+        """Index a question that now has a cached answer"""
+        words, numbers = question_features(key)
+        if not words:
+            return
+        buckets = self.bucket_ids(words, numbers)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = (tuple(words), numbers, buckets)
+            for bucket in buckets:
+                members = self.buckets.get(bucket)
+                if members is None:
+                    self.buckets[bucket] = [key]
+                else:
+                    members.append(key)
+            frequency = self.document_frequency
+            for word in words:
+                frequency[word] = frequency.get(word, 0) + 1
+            while len(self.entries) > self.max_entries:
+                self.remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def discard(self, key):
+        """Forget a question, for example because its answer left the cache"""
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+
+    def remove(self, key):
+        """Drop key from the entries, buckets and word counts (lock held)"""
+        words, _, buckets = self.entries.pop(key)
+        for bucket in buckets:
+            members = self.buckets[bucket]
+            members.remove(key)
+            if not members:
+                del self.buckets[bucket]
+        for word in words:
+            count = self.document_frequency[word] - 1
+            if count:
+                self.document_frequency[word] = count
+            else:
+                del self.document_frequency[word]
+
+    def weigh(self, words, weights):
+        """Add the IDF weight of any word missing from weights (lock held)"""
+        total = len(self.entries) + 1
+        frequency = self.document_frequency
+        for word in words:
+            if word not in weights:
+                weights[word] = math.log(total / (frequency.get(word, 0) + 1)) + 1
+
+    def lookup(self, key):
+        """Return the indexed key most similar to key, or None below the threshold"""
+        words, numbers = question_features(key)
+        if not words:
+            return None
+        buckets = self.bucket_ids(words, numbers)
+        with self.lock:
+            self.lookups += 1
+            candidates = set()
+            for bucket in buckets:
+                # The most recently indexed questions of a crowded bucket are enough
+                candidates.update(self.buckets.get(bucket, ())[-self.max_candidates:])
+
+            # IDF-weighted Jaccard: shared weight over the weight of the union
+            weights = {}
+            self.weigh(words, weights)
+            query_weight = sum(weights.values())
+            best, best_score = None, self.threshold
+            for candidate in candidates:
+                other, other_numbers, _ = self.entries[candidate]
+                if other_numbers != numbers:
+                    continue
+                self.weigh(other, weights)
+                shared = sum([weights[word] for word in other if word in words])
+                score = shared / (query_weight + sum([weights[word] for word in other]) - shared)
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is None:
+                return None
+            self.entries.move_to_end(best)
+            self.matches += 1
+            return best
+
+    def stats(self):
+        """Return a snapshot of the index counters"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'lookups': self.lookups,
+                'matches': self.matches,
+                'evictions': self.evictions,
+                'match_rate': self.matches / self.lookups if self.lookups else 0.0
+            }
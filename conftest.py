@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+# The stub inference server lives with the benchmarks that also use it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from stub_inference import start_stub
+from upstream import InferenceClient
+
+
+@pytest.fixture
+def stub():
+    """A stub inference server answering in 5 ms; its URL is stub.url"""
+    server, url = start_stub(latency=0.005, estimated_time=0)
+    server.url = url
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def payload():
+    """A text-generation request body"""
+    return {'inputs': 'How do I run a 16 team bracket?', 'parameters': {'max_new_tokens': 200}}
+
+
+@pytest.fixture
+def make_client():
+    """Build InferenceClients whose backoff is short enough for tests; settings as InferenceClient's"""
+    clients = []
+
+    def build(**settings):
+        settings.setdefault('backoff_base', 0.01)
+        settings.setdefault('backoff_max', 0.02)
+        client = InferenceClient('stub-key', **settings)
+        clients.append(client)
+        return client
+    yield build
+    for client in clients:
+        client.close()
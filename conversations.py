@@ -0,0 +1,244 @@
+import html
+import re
+import threading
+from collections import OrderedDict, deque, namedtuple
+
+from offline import COUNT_WORDS, DIGIT_WORDS, MONTHS, STATION_COUNT_PATTERN, parse_count
+from cache import TENS_WORDS
+
+# One exchange kept verbatim: the question and a plain-text, truncated copy
+# of the answer (the model only needs the gist of what it said)
+Turn = namedtuple('Turn', ['question', 'answer'])
+
+# What a prompt gets from a session: text to put before the question, the
+# facts as a cache key suffix ('' when nothing is known), how many recent
+# turns made it in and the text's estimated tokens
+ConversationContext = namedtuple('ConversationContext', ['text', 'key', 'turns', 'tokens'])
+EMPTY_CONTEXT = ConversationContext('', '', 0, 0)
+
+# Approximate bytes a session and a turn cost beyond their text, for the
+# global memory cap
+SESSION_OVERHEAD = 1000
+TURN_OVERHEAD = 250
+
+COUNT = (r'(\d{1,5}|(?:' + '|'.join(TENS_WORDS) + r')(?:[\s-](?:' + '|'.join(DIGIT_WORDS) + r'))?|'
+         + '|'.join(COUNT_WORDS) + r'|one)')
+ENTRANTS_PATTERN = re.compile(r'\b' + COUNT + r'[\s-]+(teams?|players?|participants?|entrants?|competitors?|'
+                              r'clubs?|squads?|pairs?|people|kids)\b')
+DAYS_PATTERN = re.compile(r'\b' + COUNT + r'[\s-]+days?\b|\b(weekend|single[\s-]day|afternoon|evening)\b')
+DATE_PATTERN = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s?(' + '|'.join(MONTHS) + r')[a-z]*\b')
+TAG_PATTERN = re.compile(r'<[^>]+>')
+SPACE_PATTERN = re.compile(r'\s+')
+
+# Checked in order, as offline.FIXTURE_FORMAT_WORDS, but only words that
+# name a format outright ("bracket" or "group" alone say too little)
+FORMAT_WORDS = [
+    ('Swiss', ['swiss']),
+    ('double elimination', ['double elim', 'double-elim', 'double knockout']),
+    ('group stage', ['group stage', 'groups of']),
+    ('round robin', ['round robin', 'round-robin', 'roundrobin', 'league']),
+    ('single elimination', ['single elim', 'single-elim', 'knockout']),
+]
+GAME_PATTERN = re.compile(r'\b(chess|football|soccer|basketball|volleyball|table tennis|tennis|badminton|squash|padel|'
+                          r'pickleball|cricket|rugby|hockey|darts|pool|snooker|poker|golf|esports|e-sports|'
+                          r'quiz|trivia|bowling|netball|handball|ultimate)\b')
+
+# Questions that lean on what was said before: they open by carrying on
+# ("and for 32 teams?", "what about a Swiss?"), point back at an earlier
+# answer ("can you shorten that?", "the same but over two days") or are
+# too short to stand alone. Only these are sent the earlier turns
+FOLLOW_UP_PATTERN = re.compile(r"^\s*(?:and|but|also|so|then|or|ok|okay|what about|how about|what if|why)\b|"
+                               r"\b(?:that|those|them|instead|the same|again|above|previous|earlier|"
+                               r"you (?:said|mentioned|suggested)|your (?:answer|plan|suggestion|schedule))\b")
+
+# The order facts are listed in, in prompts and in cache keys
+FACT_KINDS = ('game', 'entrants', 'format', 'days', 'date', 'stations')
+
+
+def estimate_tokens(text):
+    """Rough token count for English text (about 4 characters a token)"""
+    return (len(text) + 3) // 4
+
+
+def extract_facts(message):
+    """Pull the details of an event out of a message: {kind: short description}"""
+    message_lower = message.lower()
+    facts = {}
+    match = GAME_PATTERN.search(message_lower)
+    if match:
+        facts['game'] = match.group(1)
+    match = ENTRANTS_PATTERN.search(message_lower)
+    if match:
+        count, noun = parse_count(match.group(1)), match.group(2)
+        # "a 24-team event" -> "24 teams"
+        if count != 1 and not noun.endswith(('s', 'people')):
+            noun += 's'
+        facts['entrants'] = f"{count} {noun}"
+    for name, words in FORMAT_WORDS:
+        if any(word in message_lower for word in words):
+            facts['format'] = name
+            break
+    match = DAYS_PATTERN.search(message_lower)
+    if match:
+        if match.group(1):
+            days = parse_count(match.group(1))
+            facts['days'] = f"{days} day{'s' if days != 1 else ''}"
+        else:
+            facts['days'] = match.group(2).replace('-', ' ')
+    match = DATE_PATTERN.search(message_lower)
+    if match:
+        facts['date'] = f"{int(match.group(1))} {match.group(2)}"
+    match = STATION_COUNT_PATTERN.search(message_lower)
+    if match:
+        facts['stations'] = f"{parse_count(match.group(1))} {match.group(2)}"
+    return facts
+
+
+def is_follow_up(message):
+    """Whether a question depends on earlier turns rather than only on the event's details"""
+    return len(message.split()) < 3 or FOLLOW_UP_PATTERN.search(message.lower()) is not None
+
+
+def compact_text(text, limit):
+    """Plain text of an HTML fragment, whitespace collapsed, cut at a word boundary after limit characters"""
+    text = SPACE_PATTERN.sub(' ', html.unescape(TAG_PATTERN.sub(' ', text))).strip()
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(' ', 1)[0] + '...'
+
+
+def turn_size(turn):
+    """Approximate bytes a turn holds"""
+    return len(turn.question) + len(turn.answer) + TURN_OVERHEAD
+
+
+def facts_key(facts):
+    """A stable string for a set of facts, for cache keys"""
+    return '; '.join(f"{kind}={facts[kind]}" for kind in FACT_KINDS if kind in facts)
+
+
+def build_context(facts, turns, budget):
+    """Fit a session's facts and its most recent turns into budget tokens
+
+    Facts come first, since they stand for every turn that has been
+    dropped. Then as many of the newest turns as fit, shown oldest first.
+    """
+    parts = []
+    used = 0
+    if facts:
+        line = "Known details of the user's event: " + '; '.join(facts[kind] for kind in FACT_KINDS
+                                                                  if kind in facts) + ".\n"
+        if estimate_tokens(line) <= budget:
+            parts.append(line)
+            used += estimate_tokens(line)
+
+    recent = []
+    for turn in reversed(turns):
+        text = f"User: {turn.question}\nYou: {turn.answer}\n"
+        if used + estimate_tokens(text) > budget:
+            break
+        recent.append(text)
+        used += estimate_tokens(text)
+    if recent:
+        parts.append("Earlier in this conversation:\n" + ''.join(reversed(recent)))
+    if not parts:
+        return EMPTY_CONTEXT._replace(key=facts_key(facts))
+    return ConversationContext(''.join(parts) + "\n", facts_key(facts), len(recent), used)
+
+
+class Conversation:
+    """One session's recent turns, in a ring buffer, and the facts gathered from all of its questions"""
+
+    def __init__(self, max_turns):
+        self.turns = deque(maxlen=max_turns)
+        self.facts = {}
+        self.size = SESSION_OVERHEAD
+
+
+class ConversationStore:
+    """Thread-safe per-session conversation history under a global memory cap
+
+    Each session keeps its last max_turns exchanges (questions and answers
+    cut to question_chars and answer_chars) and the facts extracted from
+    every question it asked, newest value winning. Turns that fall out of
+    the ring survive only as those facts, so a session's size is bounded.
+    When there are more than max_sessions, or their estimated size passes
+    max_bytes, the least recently used sessions are dropped.
+    """
+
+    def __init__(self, max_sessions=10000, max_bytes=32 * 1024 * 1024, max_turns=6, question_chars=300,
+                 answer_chars=400):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.max_turns = max_turns
+        self.question_chars = question_chars
+        self.answer_chars = answer_chars
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.recorded = 0
+        self.evictions = 0
+
+    def context(self, session_id, budget, follow_up=True):
+        """Return the ConversationContext for a session's next question, within budget tokens
+
+        Without follow_up only the session's facts are included, not its
+        recent turns.
+        """
+        if session_id is None:
+            return EMPTY_CONTEXT
+        with self.lock:
+            conversation = self.sessions.get(session_id)
+            if conversation is None:
+                return EMPTY_CONTEXT
+            self.sessions.move_to_end(session_id)
+            facts, turns = dict(conversation.facts), list(conversation.turns) if follow_up else []
+        return build_context(facts, turns, budget)
+
+    def record(self, session_id, question, answer_html):
+        """Add one exchange to a session, creating it if needed"""
+        turn = Turn(compact_text(question, self.question_chars), compact_text(answer_html, self.answer_chars))
+        facts = extract_facts(question)
+        with self.lock:
+            conversation = self.sessions.get(session_id)
+            if conversation is None:
+                conversation = self.sessions[session_id] = Conversation(self.max_turns)
+                self.bytes += conversation.size
+            else:
+                self.sessions.move_to_end(session_id)
+            if len(conversation.turns) == conversation.turns.maxlen:
+                dropped = conversation.turns[0]
+                conversation.size -= turn_size(dropped)
+                self.bytes -= turn_size(dropped)
+            conversation.turns.append(turn)
+            conversation.facts.update(facts)
+            conversation.size += turn_size(turn)
+            self.bytes += turn_size(turn)
+            self.recorded += 1
+            while self.sessions and (len(self.sessions) > self.max_sessions or self.bytes > self.max_bytes):
+                _, evicted = self.sessions.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+
+    def forget(self, session_id):
+        """Drop a session's history"""
+        with self.lock:
+            conversation = self.sessions.pop(session_id, None)
+            if conversation is not None:
+                self.bytes -= conversation.size
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def stats(self):
+        """Return a snapshot of the store counters"""
+        with self.lock:
+            return {
+                'sessions': len(self.sessions),
+                'max_sessions': self.max_sessions,
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'max_turns': self.max_turns,
+                'turns_recorded': self.recorded,
+                'evictions': self.evictions
+            }
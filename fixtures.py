@@ -0,0 +1,483 @@
+import bisect
+import functools
+import html
+import itertools
+from collections import namedtuple
+
+ROUND_ROBIN = 'round_robin'
+SINGLE_ELIMINATION = 'single_elimination'
+DOUBLE_ELIMINATION = 'double_elimination'
+GROUPS = 'groups'
+FORMATS = (ROUND_ROBIN, SINGLE_ELIMINATION, DOUBLE_ELIMINATION, GROUPS)
+
+MAX_ENTRANTS = 8192
+# A round robin has n(n-1)/2 matches, so it gets a lower ceiling
+MAX_ROUND_ROBIN_ENTRANTS = 1024
+
+# A match between two slots. A slot is an entrant's seed (int, 1-based) or a
+# result decided by an earlier match or group: Winner(5), Loser(5) or
+# GroupPlace('A', 1).
+Match = namedtuple('Match', ['id', 'home', 'away'])
+Winner = namedtuple('Winner', ['match'])
+Loser = namedtuple('Loser', ['match'])
+GroupPlace = namedtuple('GroupPlace', ['group', 'place'])
+
+# Builds Matches from (id, home, away) tuples without a Python-level call per
+# match; a 500 team round robin has 124,750 of them
+make_match = functools.partial(tuple.__new__, Match)
+
+# A named block of rounds (each a list of Matches) with, per round, the seeds
+# that sit it out
+Stage = namedtuple('Stage', ['name', 'rounds', 'byes'])
+
+# Generated fixtures: entrant names indexed by seed - 1, the stages in play
+# order and, for group formats, the seeds in each group
+Fixtures = namedtuple('Fixtures', ['format', 'entrants', 'stages', 'groups'], defaults=(None,))
+
+
+def entrant_names(entrants, limit=MAX_ENTRANTS):
+    """Return entrant names from a count ("Team 1".."Team n") or a list of names"""
+    if isinstance(entrants, int) and not isinstance(entrants, bool):
+        if entrants < 2:
+            raise ValueError("A tournament needs at least 2 entrants")
+        if entrants > limit:
+            raise ValueError(f"At most {limit} entrants are supported")
+        return [f"Team {seed}" for seed in range(1, entrants + 1)]
+    if not isinstance(entrants, (list, tuple)):
+        raise ValueError("entrants must be a number or a list of names")
+    names = [str(name).strip() for name in entrants]
+    if len(names) < 2:
+        raise ValueError("A tournament needs at least 2 entrants")
+    if len(names) > limit:
+        raise ValueError(f"At most {limit} entrants are supported")
+    if not all(names):
+        raise ValueError("Entrant names must not be empty")
+    return names
+
+
+def circle_rounds(seeds, ids):
+    """Pair seeds with the circle method; return (rounds, byes)
+
+    The first seed stays fixed while the others rotate one place per round,
+    so every pair meets exactly once in len(seeds) - 1 rounds (len(seeds)
+    rounds when odd, each entrant sitting out one). The fixed seed
+    alternates home and away; ids supplies the match ids.
+    """
+    slots = list(seeds)
+    padded = len(slots) % 2 == 1
+    if padded:
+        slots.append(None)
+    count = len(slots)
+    half = count // 2
+    fixed, others = slots[0], slots[1:]
+    rounds, byes = [], []
+    for number in range(count - 1):
+        line = [fixed] + others
+        homes, aways = line[:half], line[:half - 1:-1]
+        if number % 2:
+            homes[0], aways[0] = aways[0], homes[0]
+        bye = []
+        if padded:
+            # Whoever is paired with the empty slot sits this round out
+            position = line.index(None)
+            pair = position if position < half else count - 1 - position
+            home, away = homes.pop(pair), aways.pop(pair)
+            bye.append(away if home is None else home)
+        rounds.append(list(map(make_match, zip(ids, homes, aways))))
+        byes.append(bye)
+        others = others[-1:] + others[:-1]
+    return rounds, byes
+
+
+def seed_order(size):
+    """Return bracket positions for seeds 1..size (a power of two), 1 v size, 2 v size-1 meeting last"""
+    order = [1]
+    while len(order) < size:
+        total = len(order) * 2 + 1
+        order = [seed for top in order for seed in (top, total - top)]
+    return order
+
+
+def bracket_size(count):
+    """Return the smallest power of two holding count entrants"""
+    return 1 << (count - 1).bit_length()
+
+
+class BracketBuilder:
+    """Build knockout rounds from slot lists, numbering matches as it goes
+
+    A slot of None is an empty position (a bye): its opponent advances
+    without a match and nobody drops out of that pairing.
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def play(self, slots, rounds, byes):
+        """Pair adjacent slots into one round; return (winner slots, loser slots)"""
+        winners, losers, matches, skipped = [], [], [], []
+        for index in range(0, len(slots), 2):
+            home, away = slots[index], slots[index + 1]
+            if home is None or away is None:
+                advancing = away if home is None else home
+                winners.append(advancing)
+                losers.append(None)
+                if isinstance(advancing, int):
+                    skipped.append(advancing)
+                continue
+            match = Match(next(self.ids), home, away)
+            matches.append(match)
+            winners.append(Winner(match.id))
+            losers.append(Loser(match.id))
+        # Rounds made up entirely of byes are not played
+        if matches:
+            rounds.append(matches)
+            byes.append(skipped)
+        return winners, losers
+
+    def knockout(self, slots, third_place=False):
+        """Play slots down to one winner; return the stages (knockout, then any third place match)"""
+        rounds, byes = [], []
+        semifinal_losers = []
+        while len(slots) > 1:
+            if len(slots) == 4:
+                slots, semifinal_losers = self.play(slots, rounds, byes)
+            else:
+                slots, _ = self.play(slots, rounds, byes)
+        stages = [Stage('Knockout', rounds, byes)]
+        # Both semifinals must be played for there to be two losers; brackets
+        # of fewer than four slots have no semifinals at all
+        if third_place and len(semifinal_losers) == 2 and all(semifinal_losers):
+            stages.append(Stage('Third place', [[Match(next(self.ids), *semifinal_losers)]], [[]]))
+        return stages
+
+
+def round_robin(entrants, legs=1):
+    """Every entrant plays every other legs times (home and away swap each leg)"""
+    names = entrant_names(entrants)
+    if len(names) > MAX_ROUND_ROBIN_ENTRANTS:
+        raise ValueError(f"A round robin supports at most {MAX_ROUND_ROBIN_ENTRANTS} entrants")
+    if legs not in (1, 2):
+        raise ValueError("legs must be 1 or 2")
+    ids = itertools.count(1)
+    rounds, byes = circle_rounds(range(1, len(names) + 1), ids)
+    if legs == 2:
+        rounds += [[Match(next(ids), match.away, match.home) for match in matches] for matches in rounds]
+        byes += byes
+    return Fixtures(ROUND_ROBIN, names, [Stage('League', rounds, byes)])
+
+
+def single_elimination(entrants, third_place=False):
+    """Seeded knockout; top seeds get the byes when the field is not a power of two"""
+    names = entrant_names(entrants)
+    count = len(names)
+    slots = [seed if seed <= count else None for seed in seed_order(bracket_size(count))]
+    return Fixtures(SINGLE_ELIMINATION, names, BracketBuilder(itertools.count(1)).knockout(slots, third_place))
+
+
+def double_elimination(entrants):
+    """Seeded double elimination: winners bracket, losers bracket and grand final
+
+    Losers of each winners round drop into the losers bracket, alternately
+    reversed so early opponents do not meet again straight away. The grand
+    final reset is only played if the losers bracket champion wins the
+    first grand final.
+    """
+    names = entrant_names(entrants)
+    count = len(names)
+    builder = BracketBuilder(itertools.count(1))
+    winner_rounds, winner_byes, loser_rounds, loser_byes = [], [], [], []
+
+    slots = [seed if seed <= count else None for seed in seed_order(bracket_size(count))]
+    slots, dropped = builder.play(slots, winner_rounds, winner_byes)
+    survivors = dropped
+    if len(survivors) > 1:
+        survivors, _ = builder.play(survivors, loser_rounds, loser_byes)
+    number = 1
+    while len(slots) > 1:
+        number += 1
+        slots, dropped = builder.play(slots, winner_rounds, winner_byes)
+        if number % 2 == 0:
+            dropped = dropped[::-1]
+        # Losers bracket survivors meet the players just dropped from the winners bracket
+        survivors, _ = builder.play([slot for pair in zip(survivors, dropped) for slot in pair], loser_rounds, loser_byes)
+        if len(survivors) > 1:
+            survivors, _ = builder.play(survivors, loser_rounds, loser_byes)
+
+    final = Match(next(builder.ids), slots[0], survivors[0])
+    reset = Match(next(builder.ids), Winner(final.id), Loser(final.id))
+    return Fixtures(DOUBLE_ELIMINATION, names, [
+        Stage('Winners bracket', winner_rounds, winner_byes),
+        Stage('Losers bracket', loser_rounds, loser_byes),
+        Stage('Grand final', [[final], [reset]], [[], []]),
+    ])
+
+
+def group_label(index):
+    """Return the spreadsheet-style label for a group: A..Z, AA, AB..."""
+    label = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(ord('A') + remainder) + label
+    return label
+
+
+def group_knockout(entrants, group_size=4, advance=2, third_place=False):
+    """Round robin groups feeding a seeded knockout
+
+    Seeds are snaked across the groups so each gets a fair share of strong
+    entrants. The first knockout round is built by knockout_slots, so a
+    group winner meets a runner-up from another group for any number of
+    groups, not only powers of two.
+    """
+    names = entrant_names(entrants)
+    count = len(names)
+    if group_size < 2:
+        raise ValueError("group_size must be at least 2")
+    group_count = max(1, count // group_size)
+    if advance < 1 or advance > count // group_count:
+        raise ValueError(f"advance must be between 1 and {count // group_count} for {group_count} groups")
+
+    members = [[] for _ in range(group_count)]
+    for index in range(count):
+        row, column = divmod(index, group_count)
+        members[column if row % 2 == 0 else group_count - 1 - column].append(index + 1)
+
+    ids = itertools.count(1)
+    stages, groups = [], {}
+    for index, seeds in enumerate(members):
+        label = group_label(index)
+        groups[label] = seeds
+        rounds, byes = circle_rounds(seeds, ids)
+        stages.append(Stage(f"Group {label}", rounds, byes))
+
+    if group_count * advance > 1:
+        stages += BracketBuilder(ids).knockout(knockout_slots(group_count, advance), third_place)
+    return Fixtures(GROUPS, names, stages, groups)
+
+
+def knockout_slots(group_count, advance):
+    """First knockout round slots for the top advance places of each group
+
+    Byes go to the best qualifiers, group winners first. Each remaining
+    winner then meets the lowest place left from another group, from the
+    next group along first, and only once every winner is paired do lower
+    places meet each other. Pairs are laid out in seed order, so the best
+    qualifiers meet last.
+    """
+    # (place, group index), best first
+    qualifiers = [(place, index) for place in range(1, advance + 1) for index in range(group_count)]
+    size = bracket_size(len(qualifiers))
+    byes = size - len(qualifiers)
+    pairs = [(qualifier, None) for qualifier in qualifiers[:byes]]
+    # Group indices still to be paired by place, each list in group order
+    waiting = {}
+    for place, index in qualifiers[byes:]:
+        waiting.setdefault(place, []).append(index)
+
+    winners = waiting.pop(1, [])
+    while winners and waiting:
+        group = winners.pop(0)
+        pairs.append(((1, group), take_opponent(waiting, group)))
+    if winners:
+        waiting[1] = winners
+    while waiting:
+        place = min(waiting)
+        group = waiting[place].pop(0)
+        if not waiting[place]:
+            del waiting[place]
+        pairs.append(((place, group), take_opponent(waiting, group)))
+
+    slots = []
+    for seed in seed_order(size // 2):
+        slots.extend(None if qualifier is None else GroupPlace(group_label(qualifier[1]), qualifier[0])
+                     for qualifier in pairs[seed - 1])
+    return slots
+
+
+def take_opponent(waiting, group):
+    """Remove and return (place, group index) of the lowest place waiting from another group, the next group along first
+
+    Only when every qualifier left is from group itself is one of them returned.
+    """
+    places = sorted(waiting, reverse=True)
+    for place in places:
+        groups = waiting[place]
+        position = bisect.bisect_right(groups, group) % len(groups)
+        if groups[position] != group:
+            break
+    else:
+        place, position = places[0], 0
+    opponent = waiting[place].pop(position)
+    if not waiting[place]:
+        del waiting[place]
+    return place, opponent
+
+
+def generate_fixtures(format, entrants, legs=1, third_place=False, group_size=4, advance=2):
+    """Generate fixtures in the named format"""
+    if format == ROUND_ROBIN:
+        return round_robin(entrants, legs)
+    if format == SINGLE_ELIMINATION:
+        return single_elimination(entrants, third_place)
+    if format == DOUBLE_ELIMINATION:
+        return double_elimination(entrants)
+    if format == GROUPS:
+        return group_knockout(entrants, group_size, advance, third_place)
+    raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+
+
+def request_flag(data, name):
+    """Read a boolean parameter sent as JSON true/false or a query string value like "1" or "true"""
+    value = data.get(name, False)
+    return value.lower() in ('1', 'true', 'yes') if isinstance(value, str) else bool(value)
+
+
+def request_number(data, name, default=None):
+    """Read a whole-number parameter sent as JSON or a query string"""
+    value = data.get(name, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a whole number")
+
+
+def request_entrants(data):
+    """Read entrants from an API request: a list of names, or a count as teams/entrants"""
+    for name in ('entrants', 'teams', 'players'):
+        if name in data:
+            value = data[name]
+            return value if isinstance(value, (list, tuple)) else request_number(data, name)
+    raise ValueError("Send teams (a number) or entrants (a list of names)")
+
+
+def parse_fixture_request(data):
+    """Turn API parameters (JSON body or query string) into generate_fixtures() keyword arguments"""
+    return {
+        'format': data.get('format', ROUND_ROBIN),
+        'entrants': request_entrants(data),
+        'legs': request_number(data, 'legs', 1),
+        'third_place': request_flag(data, 'third_place'),
+        'group_size': request_number(data, 'group_size', 4),
+        'advance': request_number(data, 'advance', 2),
+    }
+
+
+def build_fixtures_response(data):
+    """Generate fixtures for an API request; the HTML rendering is included when html is set"""
+    fixtures = generate_fixtures(**parse_fixture_request(data))
+    result = fixtures_json(fixtures)
+    if request_flag(data, 'html'):
+        result['html'] = render_fixtures_html(fixtures)
+    return result
+
+
+def match_count(fixtures):
+    """Return the number of matches scheduled (counting a grand final reset)"""
+    return sum(len(matches) for stage in fixtures.stages for matches in stage.rounds)
+
+
+def slot_json(slot):
+    """Seeds stay plain ints; results of earlier matches and groups become small objects"""
+    if isinstance(slot, int):
+        return slot
+    if isinstance(slot, Winner):
+        return {'winner_of': slot.match}
+    if isinstance(slot, Loser):
+        return {'loser_of': slot.match}
+    return {'group': slot.group, 'place': slot.place}
+
+
+def fixtures_json(fixtures):
+    """Return a JSON-ready dict; match slots refer to entrants by seed"""
+    stages = []
+    for stage in fixtures.stages:
+        rounds = []
+        for number, (matches, byes) in enumerate(zip(stage.rounds, stage.byes), 1):
+            rounds.append({
+                'round': number,
+                'matches': [{'id': match.id, 'home': slot_json(match.home), 'away': slot_json(match.away)}
+                            for match in matches],
+                'byes': byes
+            })
+        stages.append({'name': stage.name, 'rounds': rounds})
+    result = {
+        'format': fixtures.format,
+        'entrants': [{'seed': seed, 'name': name} for seed, name in enumerate(fixtures.entrants, 1)],
+        'match_count': match_count(fixtures),
+        'stages': stages
+    }
+    if fixtures.groups is not None:
+        result['groups'] = fixtures.groups
+    return result
+
+
+PLACE_NAMES = {1: 'winner', 2: 'runner-up'}
+
+
+def slot_label(slot, entrants):
+    """Return the escaped display text for a slot"""
+    if isinstance(slot, int):
+        return html.escape(entrants[slot - 1])
+    if isinstance(slot, Winner):
+        return f"Winner M{slot.match}"
+    if isinstance(slot, Loser):
+        return f"Loser M{slot.match}"
+    return f"Group {slot.group} {PLACE_NAMES.get(slot.place, f'#{slot.place}')}"
+
+
+def round_title(stage, number, total):
+    """Name knockout rounds from the end (Final, Semifinals...) and the rest by number"""
+    if stage.name == 'Knockout':
+        from_end = total - number
+        if from_end == 0:
+            return 'Final'
+        if from_end == 1:
+            return 'Semifinals'
+        if from_end == 2:
+            return 'Quarterfinals'
+    if stage.name == 'Grand final':
+        return 'Grand final' if number == 1 else 'Reset (only if the losers bracket champion wins)'
+    if stage.name == 'Third place':
+        return 'Third place match'
+    return f"Round {number}"
+
+
+def render_fixtures_html(fixtures, max_rounds=None, max_matches=None, numbered=None):
+    """Render fixtures as HTML lists, showing at most max_rounds rounds per stage and max_matches per round
+
+    Bracket matches are numbered (M5) so later rounds can refer to them;
+    round robin pairings are listed without numbers unless numbered is set.
+    """
+    if numbered is None:
+        numbered = fixtures.format != ROUND_ROBIN
+    entrants = fixtures.entrants
+    parts = []
+    for stage in fixtures.stages:
+        title = stage.name
+        if fixtures.groups is not None and stage.name.startswith('Group '):
+            seeds = fixtures.groups[stage.name[len('Group '):]]
+            title += ': ' + ', '.join(html.escape(entrants[seed - 1]) for seed in seeds)
+        parts.append(f"<p><b>{title}</b></p>\n<ul>")
+        total = len(stage.rounds)
+        shown = total if max_rounds is None else min(total, max_rounds)
+        for number in range(1, shown + 1):
+            matches = stage.rounds[number - 1]
+            pairings = ', '.join(
+                (f"M{match.id}: " if numbered else '')
+                + f"{slot_label(match.home, entrants)} v {slot_label(match.away, entrants)}"
+                for match in matches[:max_matches])
+            if max_matches is not None and len(matches) > max_matches:
+                pairings += f" and {len(matches) - max_matches} more"
+            byes = stage.byes[number - 1]
+            if byes:
+                named = ', '.join(html.escape(entrants[seed - 1]) for seed in byes[:max_matches])
+                if max_matches is not None and len(byes) > max_matches:
+                    named += f" and {len(byes) - max_matches} more"
+                pairings += f" (bye: {named})"
+            parts.append(f"<li><b>{round_title(stage, number, total)}:</b> {pairings}</li>")
+        if shown < total:
+            parts.append(f"<li>... and {total - shown} more rounds</li>")
+        parts.append("</ul>")
+    return '\n'.join(parts)
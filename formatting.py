@@ -0,0 +1,213 @@
+import html
+import re
+
+# Self-introductions the model likes to open with
+PREFIX_PATTERN = re.compile(r'^(as an ai assistant|as a tournament planning assistant|i am a tournament planning assistant|as your tournament assistant)', re.IGNORECASE)
+PREFIX_MAX_LENGTH = 40
+
+EMPTY_RESPONSE = "I apologize, but I couldn't generate a response. Please try again."
+
+# A single scan of the model output finds everything the formatter acts on:
+# paragraph and line breaks, numbered and bulleted list markers, runs of the
+# plain tags the prompt asks the model to use, and characters to escape.
+# Every token starts with one of a few characters, so the scan skips plain
+# text in C; lookbehinds then tell the token kinds apart. Markers a line
+# has already used up are left out of the scan for the rest of the line.
+ALLOWED_TAG = r'(?i:/?(?:p|ul|ol|li|b|strong|em|i|br|h[1-6]) ?/?)>'
+
+
+def compile_token_pattern(numbers, bullets):
+    """Compile the token scan, optionally without numbered or bullet markers"""
+    return re.compile(
+        '[\n<&>' + ('\\d' if numbers else '') + ('*•-' if bullets else '') + ']'
+        r'(?:(?<=\n)(?P<paragraph>\s*\n)?'
+        + (r'|(?<=\d)(?<!\d\d)\d*\.(?P<number>[^\S\n]+)' if numbers else '')
+        + (r'|(?<=[-•*])(?P<bullet>[^\S\n]+)' if bullets else '')
+        + r'|(?<=<)' + ALLOWED_TAG + r'(?P<tag>(?:<' + ALLOWED_TAG + r')*)'
+        r'|(?<=[&<>]))'
+    )
+
+
+# Indexed by (line has a numbered item, line has a bullet item)
+TOKEN_PATTERNS = {(numbered, bulleted): compile_token_pattern(not numbered, not bulleted)
+                  for numbered in (False, True) for bulleted in (False, True)}
+NUMBER_PATTERN = re.compile(r'\d+\.([^\S\n]+)')
+ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;'}
+
+# Cleanups that only apply when the model wrote tags of its own
+BREAK_RUN_PATTERN = re.compile(r'<br>\s*<br>')
+EMPTY_PARAGRAPH_PATTERN = re.compile(r'<p>\s*</p>')
+
+TAG_PATTERN = re.compile(r'<[^>]*>')
+
+
+def at_break(text, index):
+    """Check whether a list item's text would end at index (line end or tag)"""
+    return index == len(text) or text[index] in '\n<'
+
+
+def starts_number(text, index):
+    """Check whether a numbered list marker that gets marked up starts at index"""
+    match = NUMBER_PATTERN.match(text, index)
+    return match is not None and (len(match.group(1)) > 1 or not at_break(text, match.end()))
+
+
+def render_text(text):
+    """Convert text to HTML in one pass; return (html, whether it kept model tags)
+
+    Numbered markers ("1. ") become <b>1.</b> and bullets ("- ", "* ", "• ")
+    become •. As with the regex passes this replaces, markers are found
+    anywhere in a line, only the first numbered marker of a line is marked
+    up, and a bullet's text runs to the next line break or tag. Text is
+    escaped apart from the plain tags ALLOWED_TAG matches.
+    """
+    pieces = []
+    append = pieces.append
+    position = 0
+    # Whether the rest of the line already belongs to a numbered / bulleted item
+    numbered = bulleted = has_tags = False
+    while True:
+        token = TOKEN_PATTERNS[numbered, bulleted].search(text, position)
+        if token is None:
+            break
+        start = token.start()
+        end = token.end()
+        character = text[start]
+        append(text[position:start])
+        position = end
+
+        if character == '\n':
+            append('<br>' if end - start == 1 else '</p><p>')
+            numbered = bulleted = False
+
+        elif character in ESCAPES:
+            if token.group('tag') is not None:
+                append(text[start:end])
+                has_tags = True
+            else:
+                append(ESCAPES[character])
+                if character != '<':
+                    continue
+            numbered = bulleted = False
+
+        elif character in '-•*':
+            space = token.group('bullet')
+            # A numbered marker right after the bullet cuts its text short too
+            ends = at_break(text, end) or (not numbered and starts_number(text, end))
+            if ends and len(space) == 1:
+                append(text[start:end])
+                continue
+            append('• ')
+            bulleted = True
+            if ends:
+                # The item text is the last space of the marker
+                position = end - 1
+
+        else:
+            space = token.group('number')
+            if at_break(text, end):
+                if len(space) == 1:
+                    append(text[start:end])
+                    continue
+                position = end - 1
+            append(f"<b>{text[start:end - len(space)]}</b> ")
+            numbered, bulleted = True, False
+
+    append(text[position:])
+    return ''.join(pieces), has_tags
+
+
+def format_text_with_html(text):
+    """Convert plain text formatting to HTML for better display"""
+    if not text:
+        return text
+
+    body, has_tags = render_text(text)
+    if not text.startswith('<p>'):
+        body = '<p>' + body + '</p>'
+    if has_tags:
+        body = BREAK_RUN_PATTERN.sub('</p><p>', body)
+        body = EMPTY_PARAGRAPH_PATTERN.sub('', body)
+    return body
+
+
+def format_response(response_text):
+    """Format the raw LLM response for better presentation"""
+    if not response_text:
+        return EMPTY_RESPONSE
+
+    # Remove any unnecessary prefixes
+    clean_response = PREFIX_PATTERN.sub('', response_text).strip()
+
+    # Ensure first letter is capitalized
+    clean_response = clean_response[0].upper() + clean_response[1:] if clean_response else clean_response
+
+    return format_text_with_html(clean_response)
+
+
+def format_line(line):
+    """Apply the list formatting and escaping of format_text_with_html to one line"""
+    return render_text(line)[0]
+
+
+class StreamingFormatter:
+    """Turn model output into HTML incrementally as tokens arrive
+
+    Only complete lines are converted, so markup the model emits is never
+    split across fragments; the text of the unfinished line is available
+    separately through preview(). The fragments are for display while the
+    answer streams, not a replacement for format_response() on the full text.
+    """
+
+    def __init__(self):
+        self.pending = ''
+        self.head_done = False
+        self.paragraph_open = False
+        self.line_open = False
+
+    def feed(self, text):
+        """Add generated text and return the HTML for any lines it completed"""
+        self.pending += text
+        if not self.head_done:
+            if '\n' not in self.pending and len(self.pending) < PREFIX_MAX_LENGTH:
+                return ''
+            self.strip_head()
+
+        if '\n' not in self.pending:
+            return ''
+        complete, self.pending = self.pending.rsplit('\n', 1)
+        return ''.join(self.emit_line(line) for line in complete.split('\n'))
+
+    def strip_head(self):
+        """Drop a self-introduction prefix and capitalize the first letter"""
+        self.head_done = True
+        self.pending = PREFIX_PATTERN.sub('', self.pending).lstrip()
+        if self.pending:
+            self.pending = self.pending[0].upper() + self.pending[1:]
+
+    def emit_line(self, line):
+        """Return the HTML for one complete line"""
+        if not line.strip():
+            # A blank line closes the current paragraph
+            self.line_open = False
+            if self.paragraph_open:
+                self.paragraph_open = False
+                return '</p>'
+            return ''
+
+        parts = []
+        if not self.paragraph_open:
+            parts.append('<p>')
+            self.paragraph_open = True
+        elif self.line_open:
+            parts.append('<br>')
+        parts.append(format_line(line))
+        self.line_open = True
+        return ''.join(parts)
+
+    def preview(self):
+        """Return the unfinished line as escaped plain text"""
+        text = TAG_PATTERN.sub('', self.pending)
+        if '<' in text:
+            text = text[:text.index('<')]
+        return html.escape(text)
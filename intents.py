@@ -0,0 +1,76 @@
+import re
+from collections import namedtuple
+
+from scope import build_trie_pattern
+
+# A declarative intent rule. Each clause is a list of substrings, at least one
+# of which must appear in the message; every clause must hold for the rule to
+# fire. pattern (a regex searched in the lowercased message) and max_length
+# are optional extra conditions. Lower priority values are checked first.
+IntentRule = namedtuple('IntentRule', ['name', 'priority', 'clauses', 'response', 'pattern', 'max_length'],
+                        defaults=(None, None))
+
+IntentMatch = namedtuple('IntentMatch', ['rule', 'match'])
+
+
+class IntentRouter:
+    """Route messages to intent rules with a single scan of the message
+
+    All substrings used by any rule are compiled into one trie-shaped regex.
+    Routing scans the message once to collect the terms it contains, looks up
+    only the rules those terms can trigger and checks them in priority order,
+    so the cost tracks the terms present rather than the size of the table.
+    """
+
+    def __init__(self, rules):
+        self.rules = sorted(rules, key=lambda rule: rule.priority)
+        self.patterns = [re.compile(rule.pattern) if rule.pattern else None for rule in self.rules]
+        self.clause_sets = [[frozenset(clause) for clause in rule.clauses] for rule in self.rules]
+
+        terms = sorted({term for rule in self.rules for clause in rule.clauses for term in clause})
+        # The scan reports the longest term starting at each position, so
+        # expand it to every shorter term that starts at the same place
+        self.prefix_terms = {term: frozenset(t for t in terms if term.startswith(t)) for term in terms}
+        self.scanner = re.compile('(?=(' + build_trie_pattern(terms, longest=True) + '))') if terms else None
+
+        # Index each rule under the terms of its first clause; rules without
+        # clauses are candidates for every message
+        self.rules_by_term = {}
+        self.always = []
+        for index, clauses in enumerate(self.clause_sets):
+            if not clauses:
+                self.always.append(index)
+                continue
+            for term in clauses[0]:
+                self.rules_by_term.setdefault(term, []).append(index)
+
+    def scan(self, message_lower):
+        """Return the set of rule terms that occur in the lowercased message"""
+        found = set()
+        if self.scanner is not None:
+            for match in self.scanner.finditer(message_lower):
+                found |= self.prefix_terms[match.group(1)]
+        return found
+
+    def route(self, message):
+        """Return the IntentMatch for the highest priority rule the message satisfies"""
+        message_lower = message.lower()
+        found = self.scan(message_lower)
+
+        candidates = set(self.always)
+        for term in found:
+            candidates.update(self.rules_by_term.get(term, ()))
+
+        for index in sorted(candidates):
+            rule = self.rules[index]
+            if rule.max_length is not None and len(message_lower) > rule.max_length:
+                continue
+            if any(found.isdisjoint(clause) for clause in self.clause_sets[index]):
+                continue
+            match = None
+            if self.patterns[index] is not None:
+                match = self.patterns[index].search(message_lower)
+                if match is None:
+                    continue
+            return IntentMatch(rule, match)
+        return None
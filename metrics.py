@@ -0,0 +1,227 @@
+import functools
+import math
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from sub-millisecond routing up to the upstream read timeout
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10, 20, 30)
+
+
+def format_value(value):
+    """Format a sample value the way Prometheus expects"""
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def escape_label(value):
+    """Escape a label value for the text exposition format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def label_text(labels):
+    """Render (name, value) pairs as {name="value",...}, or '' for an unlabelled sample"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+class CounterValue:
+    """One counter time series; only goes up"""
+
+    __slots__ = ('value', 'lock')
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Add amount to the counter"""
+        with self.lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        return [(name, labels, self.value)]
+
+
+class GaugeValue:
+    """One gauge time series: a value that goes up and down
+
+    Also a context manager, so `with gauge:` counts work in progress.
+    """
+
+    __slots__ = ('value', 'lock')
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Add amount to the gauge"""
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        """Subtract amount from the gauge"""
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        """Set the gauge to value"""
+        self.value = value
+
+    def __enter__(self):
+        self.inc()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.dec()
+
+    def samples(self, name, labels):
+        return [(name, labels, self.value)]
+
+
+class HistogramValue:
+    """One histogram time series with fixed bucket bounds
+
+    Each observation lands in a single bucket; the cumulative counts the
+    format needs are added up when the metrics are rendered, not on the hot
+    path.
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        """Record one observation"""
+        bucket = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[bucket] += 1
+            self.sum += value
+
+    def timed_call(self, func, *args):
+        """Call func(*args) and observe how many seconds it took, even if it raised"""
+        start = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.observe(perf_counter() - start)
+
+    def samples(self, name, labels):
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        rows = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), counts):
+            cumulative += count
+            rows.append((f'{name}_bucket', labels + (('le', format_value(float(bound))),), cumulative))
+        rows.append((f'{name}_sum', labels, total))
+        rows.append((f'{name}_count', labels, cumulative))
+        return rows
+
+
+class FunctionValue:
+    """A series whose value is read from a function when metrics are rendered"""
+
+    __slots__ = ('function',)
+
+    def __init__(self, function):
+        self.function = function
+
+    def samples(self, name, labels):
+        return [(name, labels, self.function())]
+
+
+class MetricFamily:
+    """A named metric and its time series, one per combination of label values
+
+    labels(*values) returns the series for those values, creating it on
+    first use; callers on a hot path can keep the returned series.
+    """
+
+    def __init__(self, name, help, kind, labelnames, factory):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.factory = factory
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *values):
+        """Return the series for these label values (strings)"""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with self.lock:
+                child = self.children.setdefault(values, self.factory())
+        return child
+
+    def render(self):
+        """Text exposition lines for this family"""
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for values, child in sorted(self.children.items()):
+            for name, labels, value in child.samples(self.name, tuple(zip(self.labelnames, values))):
+                lines.append(f'{name}{label_text(labels)} {format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics one process exposes, rendered in the Prometheus text format
+
+    Each series updates its values under its own lock, as ResponseCache
+    and AdmissionControl do: an in-place add is a read and a write, which
+    can lose updates between threads without one (an uncontended lock adds
+    a few tens of nanoseconds). Series never share a lock, so updates to
+    different metrics do not contend. A histogram is rendered from one
+    consistent copy of its buckets and sum.
+
+    counter(), gauge() and histogram() return a family when given label
+    names, or the single series of an unlabelled metric. Passing a function
+    to counter() or gauge() reads the value from it at render time, for
+    numbers something else already keeps, such as cache statistics.
+    """
+
+    def __init__(self):
+        self.families = {}
+
+    def register(self, name, help, kind, labelnames, factory):
+        """Add a metric family; return it, or its only series when it has no labels"""
+        if name in self.families:
+            raise ValueError(f"Metric {name} is already registered")
+        family = self.families[name] = MetricFamily(name, help, kind, labelnames, factory)
+        return family if labelnames else family.labels()
+
+    def counter(self, name, help, labelnames=(), function=None):
+        """Register a counter; name should end in _total"""
+        factory = CounterValue if function is None else functools.partial(FunctionValue, function)
+        return self.register(name, help, 'counter', labelnames, factory)
+
+    def gauge(self, name, help, labelnames=(), function=None):
+        """Register a gauge"""
+        factory = GaugeValue if function is None else functools.partial(FunctionValue, function)
+        return self.register(name, help, 'gauge', labelnames, factory)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Register a histogram with the given upper bucket bounds"""
+        return self.register(name, help, 'histogram', labelnames,
+                             functools.partial(HistogramValue, tuple(sorted(buckets))))
+
+    def render(self):
+        """Every registered metric in the text exposition format"""
+        lines = []
+        for family in self.families.values():
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,509 @@
+import functools
+import re
+import time
+
+from cache import NUMBER_WORDS, TENS_WORDS
+from fixtures import (DOUBLE_ELIMINATION, GROUPS, MAX_ENTRANTS, MAX_ROUND_ROBIN_ENTRANTS, ROUND_ROBIN,
+                      SINGLE_ELIMINATION, generate_fixtures, match_count, render_fixtures_html)
+from intents import IntentRule, IntentRouter
+from scheduler import MAX_STATIONS, format_clock, render_schedule_html, schedule_fixtures
+from swiss import SwissTournament
+from scope import TOURNAMENT_KEYWORDS
+
+TEAM_CREATION_RESPONSE = """<p>Creating a successful tournament team involves several key steps:</p>
+        
+        <p><b>Team Formation Essentials:</b></p>
+        <ul>
+            <li><b>Roster size:</b> Determine optimal team size (core players + substitutes)</li>
+            <li><b>Skill balance:</b> Mix experienced players with promising newcomers</li>
+            <li><b>Role definition:</b> Clearly establish each player's responsibilities</li>
+            <li><b>Team captain:</b> Select a leader for communication and decision-making</li>
+            <li><b>Team name/identity:</b> Create a memorable brand for your team</li>
+        </ul>
+        
+        <p><b>Administrative Requirements:</b></p>
+        <ul>
+            <li><b>Registration forms:</b> Complete all required tournament paperwork</li>
+            <li><b>Contact information:</b> Maintain updated contact details for all members</li>
+            <li><b>Equipment/uniforms:</b> Ensure consistent appearance if required</li>
+            <li><b>Tournament rules:</b> Familiarize all members with competition rules</li>
+            <li><b>Practice schedule:</b> Establish regular training sessions before the event</li>
+        </ul>
+        
+        <p><b>Team Management Tips:</b></p>
+        <ul>
+            <li><b>Communication channel:</b> Create a group chat or email list</li>
+            <li><b>Availability tracking:</b> Confirm player availability for all tournament dates</li>
+            <li><b>Strategy development:</b> Prepare and practice competitive approaches</li>
+            <li><b>Conflict resolution:</b> Establish a process for handling disagreements</li>
+            <li><b>Feedback mechanism:</b> Create opportunities for constructive criticism</li>
+        </ul>
+        
+        <p>Would you like more specific advice on any aspect of team creation?</p>"""
+
+CHESS_EQUIPMENT_RESPONSE = """<p>For organizing a chess tournament, you'll need the following equipment:</p>
+        
+        <p><b>Essential Chess Equipment:</b></p>
+        <ul>
+            <li><b>Chess sets:</b> Standard Staunton design, with 3.75" king height for tournament play</li>
+            <li><b>Chess boards:</b> Standard 2.25" squares, vinyl rollup mats are cost-effective</li>
+            <li><b>Chess clocks:</b> Digital preferred (DGT, Chronos) with delay/increment capability</li>
+            <li><b>Score sheets:</b> Standard algebraic notation sheets for players to record moves</li>
+            <li><b>Pens:</b> Provide for players to fill in score sheets</li>
+        </ul>
+        
+        <p><b>Tournament Organization Materials:</b></p>
+        <ul>
+            <li><b>Pairing software:</b> Swiss-Manager, Vega, or lichess.org's free tournament manager</li>
+            <li><b>Results slips:</b> For players to record and submit game outcomes</li>
+            <li><b>Wall charts/projector:</b> To display standings and pairings</li>
+            <li><b>Table numbers:</b> To help players find their boards</li>
+            <li><b>Rule books:</b> FIDE/National Chess Federation rules as appropriate</li>
+        </ul>
+        
+        <p><b>Venue Requirements:</b></p>
+        <ul>
+            <li><b>Tables:</b> At least 2.5' x 2.5' per board</li>
+            <li><b>Chairs:</b> Comfortable enough for long games</li>
+            <li><b>Good lighting:</b> Critical for players to see the board clearly</li>
+            <li><b>Quiet environment:</b> Minimize external noise</li>
+            <li><b>Tournament director's table:</b> Central location for administration</li>
+        </ul>
+        
+        <p><b>Optional/Additional Items:</b></p>
+        <ul>
+            <li><b>Spare pieces and boards:</b> In case of damage or loss</li>
+            <li><b>Demonstration board:</b> For game analysis or featured matches</li>
+            <li><b>Certificates/trophies:</b> For winners and participants</li>
+            <li><b>Name tags:</b> For officials and staff</li>
+            <li><b>First aid kit:</b> For any minor emergencies</li>
+        </ul>
+        
+        <p>For large tournaments, consider renting equipment from local chess clubs or federations to reduce costs.</p>"""
+
+ROUND_ROBIN_RESPONSE = """<p>Organizing a round-robin tournament requires careful planning. Here's a comprehensive guide:</p>
+
+            <p><b>1. Planning Your Round-Robin Tournament</b></p>
+            <ul>
+                <li><b>Determine participant count:</b> Ideal for 6-12 teams (more teams require more rounds)</li>
+                <li><b>Calculate total matches:</b> n(n-1)/2 where n = number of teams</li>
+                <li><b>Assess time constraints:</b> Each team plays (n-1) matches</li>
+                <li><b>Venue requirements:</b> Ensure adequate space and time allocation</li>
+            </ul>
+
+            <p><b>2. Creating the Schedule (Circle Method)</b></p>
+            <ol>
+                <li>Assign numbers to each team (1 through n)</li>
+                <li>If you have an odd number of teams, add a "bye" (making it even)</li>
+                <li>Place team #1 at the top and arrange remaining teams in a circle</li>
+                <li>Record the matchups for round 1 (each team paired with the one opposite)</li>
+                <li>Rotate all teams except #1 clockwise for the next round</li>
+                <li>Repeat until all rounds are scheduled</li>
+            </ol>
+
+            <p><b>3. Schedule Example for 8 Teams</b></p>
+            <p>Round 1: 1v8, 2v7, 3v6, 4v5<br>
+            Round 2: 1v7, 8v6, 2v5, 3v4<br>
+            Round 3: 1v6, 7v5, 8v4, 2v3<br>
+            Round 4: 1v5, 6v4, 7v3, 8v2<br>
+            Round 5: 1v4, 5v3, 6v2, 7v8<br>
+            Round 6: 1v3, 4v2, 5v8, 6v7<br>
+            Round 7: 1v2, 3v8, 4v7, 5v6</p>
+
+            <p><b>4. Logistical Considerations</b></p>
+            <ul>
+                <li><b>Home/away balance:</b> Alternate if applicable</li>
+                <li><b>Rest periods:</b> Avoid scheduling teams for consecutive matches</li>
+                <li><b>Field/court rotation:</b> Distribute premium playing areas fairly</li>
+                <li><b>Time slots:</b> Account for match duration, setup, and breakdown time</li>
+            </ul>
+
+            <p><b>5. Tournament Management</b></p>
+            <ul>
+                <li><b>Scoring system:</b> Define points for wins, draws, losses (e.g., 3-1-0)</li>
+                <li><b>Tiebreakers:</b> Establish clear criteria (head-to-head, point differential, etc.)</li>
+                <li><b>Results tracking:</b> Update standings after each match</li>
+                <li><b>Software tools:</b> Consider using Tournament.io, Challonge, or Excel templates</li>
+            </ul>
+
+            <p><b>6. Communication</b></p>
+            <ul>
+                <li>Distribute complete schedule to all teams before the tournament</li>
+                <li>Provide regular standings updates throughout the event</li>
+                <li>Clearly communicate tiebreaker rules in advance</li>
+            </ul>
+
+            <p>Would you like me to elaborate on any specific aspect of round-robin tournament organization?</p>"""
+
+FIXTURES_RESPONSE = """<p>Creating fixtures (match schedules) depends on your tournament format and number of teams. Here are the main approaches:</p>
+            
+            <p><b>1. Round Robin Format</b></p>
+            <ul>
+                <li>Each team plays against all other teams once (or twice for double round robin)</li>
+                <li>For n teams, each team plays (n-1) matches</li>
+                <li>Total matches = n × (n-1) ÷ 2</li>
+                <li>Use the "circle method" where one team stays fixed while others rotate</li>
+            </ul>
+            
+            <p><b>2. Elimination Brackets</b></p>
+            <ul>
+                <li><b>Single elimination:</b> Losers are immediately eliminated</li>
+                <li><b>Double elimination:</b> Losers move to a losers bracket</li>
+                <li>For n teams, you'll have (n-1) matches in single elimination</li>
+                <li>Seed teams appropriately to balance the bracket</li>
+            </ul>
+            
+            <p><b>3. Groups + Knockout</b></p>
+            <ul>
+                <li>Divide teams into equal groups for round robin play</li>
+                <li>Top teams from each group advance to elimination rounds</li>
+                <li>Example: 4 groups of 4, top 2 from each advance to quarterfinals</li>
+            </ul>
+            
+            <p><b>4. Swiss System</b></p>
+            <ul>
+                <li>Teams with similar records play each other in each round</li>
+                <li>No eliminations until the final standings</li>
+                <li>Good for large fields where full round robin isn't feasible</li>
+            </ul>
+            
+            <p>To create actual fixtures, you can use software like:</p>
+            <ul>
+                <li><b>Challonge:</b> Free online bracket generator</li>
+                <li><b>Toornament:</b> Robust tournament management platform</li>
+                <li><b>Battlefy:</b> Popular for esports tournaments</li>
+            </ul>
+            
+            <p>How many teams are in your tournament? I can provide more specific guidance based on your number of participants.</p>"""
+
+SIZE_RESPONSE = """<p>The ideal number of participants depends on your format:</p>
+        
+        <p>• For single elimination: Powers of 2 (8, 16, 32, 64) work best</p>
+        <p>• For double elimination: Same as single, but plan for about 1.5x more matches</p>
+        <p>• For round robin: Usually best with 6-10 participants (otherwise too many matches)</p>
+        <p>• For Swiss: Works with any number, but 8+ is better</p>
+        
+        <p>With more participants, consider using qualifying rounds or group stages.</p>"""
+
+SCHEDULING_RESPONSE = """<p>For tournament scheduling, consider:</p>
+        
+        <p><b>1.</b> Match duration: Estimate realistic times including setup/teardown</p>
+        <p><b>2.</b> Breaks: Allow 10-15 minutes between matches and longer breaks for meals</p>
+        <p><b>3.</b> Concurrent matches: If possible, run multiple matches simultaneously</p>
+        <p><b>4.</b> Buffer time: Add 15-20% extra time for delays</p>
+        <p><b>5.</b> Player fatigue: Avoid scheduling too many consecutive matches for same team</p>
+        
+        <p>Create a detailed schedule and share it with all participants in advance.</p>"""
+
+PARTICIPANTS_RESPONSE = """<p>For managing tournament participants:</p>
+        
+        <p><b>1.</b> Registration: Use a form with team name, captain contact, roster, and skill level</p>
+        <p><b>2.</b> Seeding: Rank teams based on previous performance if available</p>
+        <p><b>3.</b> Check-in: Require teams to check in 30-60 minutes before their first match</p>
+        <p><b>4.</b> Rules briefing: Hold a captains' meeting to review rules</p>
+        <p><b>5.</b> Communication: Create a centralized way to announce updates (app, website, etc.)</p>
+        
+        <p>Clear organization of participants is key to a smooth tournament.</p>"""
+
+RULES_RESPONSE = """<p>When establishing tournament rules:</p>
+        
+        <p><b>1.</b> Game-specific rules: Clearly define any modifications to standard game rules</p>
+        <p><b>2.</b> Match format: Specify number of games/sets/rounds per match</p>
+        <p><b>3.</b> Scoring system: Define how winners are determined and points awarded</p>
+        <p><b>4.</b> Tiebreakers: Establish criteria for resolving ties in standings</p>
+        <p><b>5.</b> Conduct rules: Set expectations for sportsmanship and penalties for violations</p>
+        
+        <p>Document all rules and distribute to participants before the tournament begins.</p>"""
+
+BRACKETS_RESPONSE = """<p>For tournament advancement and brackets:</p>
+        
+        <p><b>1.</b> Single elimination: Winners advance, losers are eliminated</p>
+        <p><b>2.</b> Double elimination: Players move to losers bracket after first loss, eliminated after second</p>
+        <p><b>3.</b> Group stage: Top 1-2 teams from each group advance to playoffs</p>
+        <p><b>4.</b> Swiss system: Players with similar records are paired, final rankings determine winners</p>
+        
+        <p>Use tournament software or websites like Challonge or Toornament to create and manage your brackets.</p>"""
+
+VENUE_RESPONSE = """<p>When selecting a tournament venue:</p>
+        
+        <p><b>1.</b> Size: Ensure adequate space for all matches, participants, and spectators</p>
+        <p><b>2.</b> Equipment: Confirm all necessary game equipment, tables, chairs, etc.</p>
+        <p><b>3.</b> Technical needs: Check power outlets, internet connectivity, A/V systems</p>
+        <p><b>4.</b> Amenities: Consider restrooms, food/drink options, parking availability</p>
+        <p><b>5.</b> Cost: Factor in rental fees, insurance, and security deposits</p>
+        
+        <p>Visit potential venues in person before booking to verify suitability.</p>"""
+
+PRIZES_RESPONSE = """<p>For tournament prizes and rewards:</p>
+        
+        <p><b>1.</b> Budget appropriately: Typically 50-70% of entry fees go to prize pool</p>
+        <p><b>2.</b> Distribution: Common splits are 60/30/10 for 1st/2nd/3rd places</p>
+        <p><b>3.</b> Trophy options: Physical trophies, medals, certificates, or digital badges</p>
+        <p><b>4.</b> Sponsor prizes: Consider product donations from relevant sponsors</p>
+        <p><b>5.</b> Recognition: Plan for awards ceremony and winner announcements</p>
+        
+        <p>Clearly communicate prize structure to participants before registration.</p>"""
+
+PROMOTION_RESPONSE = """<p>To promote your tournament effectively:</p>
+        
+        <p><b>1.</b> Create event pages on social media and gaming platforms</p>
+        <p><b>2.</b> Design eye-catching graphics with key details (date, location, prizes)</p>
+        <p><b>3.</b> Contact relevant communities, clubs, and organizations</p>
+        <p><b>4.</b> Consider early-bird registration discounts to build momentum</p>
+        <p><b>5.</b> Partner with sponsors for cross-promotion opportunities</p>
+        
+        <p>Start promotion at least 1-2 months before registration deadline.</p>"""
+
+GENERAL_RESPONSE = """<p>For successful tournament planning, focus on these key areas:</p>
+    
+    <p><b>1.</b> Format: Choose the right tournament structure for your number of participants and time constraints</p>
+    <p><b>2.</b> Scheduling: Create a realistic timeline with buffer for delays</p>
+    <p><b>3.</b> Participants: Organize registration, seeding, and check-in processes</p>
+    <p><b>4.</b> Venue: Secure an appropriate location with necessary facilities</p>
+    <p><b>5.</b> Rules: Clearly define and communicate all tournament regulations</p>
+    <p><b>6.</b> Communication: Keep participants informed before and during the event</p>
+    
+    <p>What specific aspect of tournament planning can I help you with today?</p>"""
+
+GREETING_RESPONSES = [
+    "<p>Hello! I'm your tournament planning assistant. How can I help you organize a tournament today?</p>",
+    "<p>Hi there! Ready to help with your tournament planning needs. What would you like assistance with?</p>",
+    "<p>Hey! I'm here to help with your tournament organization. What aspect are you working on?</p>"
+]
+
+CLARIFY_RESPONSES = [
+    """<p>To help you with this tournament planning question, I need a bit more information. Could you specify what aspect you're looking for help with? For example:</p>
+            <ul>
+                <li>Tournament format selection</li>
+                <li>Schedule creation</li>
+                <li>Participant management</li>
+                <li>Rules and scoring</li>
+                <li>Venue requirements</li>
+            </ul>""",
+
+    """<p>I'd be happy to assist with your tournament planning question. To provide the most relevant advice, could you elaborate on:</p>
+            <ul>
+                <li>What type of game/sport is the tournament for?</li>
+                <li>How many participants do you expect?</li>
+                <li>What's your timeline for the event?</li>
+            </ul>""",
+
+    """<p>For this tournament planning question, I can provide more specific guidance if you let me know:</p>
+            <ul>
+                <li>Your tournament goals (competitive, casual, charity, etc.)</li>
+                <li>Any specific challenges you're facing</li>
+                <li>Your experience level with organizing tournaments</li>
+            </ul>"""
+]
+
+def date_response(match):
+    """Acknowledge the date the user mentioned"""
+    return f"<p>I see your tournament is planned for {match.group(0)}. Make sure to send out invitations at least 3-4 weeks in advance, confirm your venue, and prepare your schedule and bracket templates.</p>"
+
+FIXTURE_WORDS = ['fixture', 'schedule', 'pairing', 'matchup']
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+# A number of entrants: digits or words ("sixteen", "twenty-four"), not
+# followed by a unit that makes it something else ("3 courts", "9:00", "12 may")
+COUNT_WORDS = sorted((word for word, value in NUMBER_WORDS.items() if value > 1), key=len, reverse=True)
+DIGIT_WORDS = [word for word, value in NUMBER_WORDS.items() if 1 <= value <= 9]
+UNIT_WORDS = ['courts?', 'fields?', 'pitches', 'pitch', 'tables?', 'boards?', 'stations?', 'venues?', 'days?',
+              'hours?', 'hrs?', 'minutes?', 'mins?', 'weeks?', 'months?', 'years?', 'rounds?', 'groups?',
+              'matches', 'games?', 'legs?', 'times', 'am', 'pm'] + MONTHS
+FIXTURE_COUNT_PATTERN = (
+    r'\b(\d{1,5}|(?:' + '|'.join(TENS_WORDS) + r')(?:[\s-](?:' + '|'.join(DIGIT_WORDS) + r'))?|'
+    + '|'.join(COUNT_WORDS) + r')\b'
+    r'(?![\s-]*(?:(?:' + '|'.join(UNIT_WORDS) + r')\b|[:./]\d|%))'
+)
+
+# How many courts the event has ("on 4 courts", "six pitches"), to schedule
+# the fixtures onto
+STATION_COUNT_PATTERN = re.compile(
+    r'\b(\d{1,4}|' + '|'.join(COUNT_WORDS) + r'|one)[\s-]+(courts?|fields?|pitch(?:es)?|tables?|boards?|stations?)\b'
+)
+# Assumed when a question gives courts but no timings; the largest fixture
+# list worth scheduling inside a chat answer
+SCHEDULE_MATCH_MINUTES = 30
+SCHEDULE_REST_MINUTES = 10
+MAX_SCHEDULED_MATCHES = 5000
+
+# Checked in order: the first format whose words appear in the question wins
+SWISS = 'swiss'
+FIXTURE_FORMAT_WORDS = [
+    (SWISS, ['swiss']),
+    (DOUBLE_ELIMINATION, ['double elim', 'double-elim', 'double knockout']),
+    (GROUPS, ['group']),
+    (ROUND_ROBIN, ['round robin', 'round-robin', 'roundrobin', 'league']),
+    (SINGLE_ELIMINATION, ['elimination', 'knockout', 'bracket', 'draw']),
+]
+
+def parse_count(text):
+    """Turn "16", "sixteen" or "twenty-four" into an int"""
+    if text.isdigit():
+        return int(text)
+    return sum(NUMBER_WORDS.get(word) or TENS_WORDS[word] for word in re.split(r'[\s-]+', text))
+
+def fixture_format(message_lower):
+    """Return the format a fixture question asks about, or None for an overview"""
+    for format, words in FIXTURE_FORMAT_WORDS:
+        if any(word in message_lower for word in words):
+            return format
+    return None
+
+def schedule_answer_html(fixtures, stations, station_word):
+    """Describe when fixtures finish on stations courts from 09:00, with the first start times"""
+    if match_count(fixtures) > MAX_SCHEDULED_MATCHES or stations > MAX_STATIONS:
+        return ""
+    singular = station_word[:-2] if station_word.endswith('ches') else station_word.rstrip('s')
+    names = [f"{singular.capitalize()} {number}" for number in range(1, stations + 1)]
+    schedule = schedule_fixtures(fixtures, names, SCHEDULE_MATCH_MINUTES, SCHEDULE_REST_MINUTES)
+    hours, minutes = divmod(int(schedule.end - schedule.start), 60)
+    day, finish = format_clock(schedule.end)
+    finish += f" on day {day}" if day > 1 else ""
+    return (f"\n<p>On {stations} {station_word} from 09:00, with {SCHEDULE_MATCH_MINUTES}-minute matches and at least "
+            f"{SCHEDULE_REST_MINUTES} minutes' rest between a team's matches, the last match ends at {finish} "
+            f"({hours} h {minutes:02d} min). Allow 15-20% extra for delays. The first start times:</p>\n"
+            + render_schedule_html(schedule, fixtures, max_slots=4))
+
+@functools.lru_cache(maxsize=256)
+def fixture_answer_html(format, count, stations=None, station_word=None):
+    """Compute and describe fixtures for count teams (an overview of every format when format is None)
+
+    When the question says how many courts there are, the fixtures shown
+    are also scheduled onto them.
+    """
+    if format is None:
+        rounds = count - 1 if count % 2 == 0 else count
+        lines = [
+            f"<li><b>Single elimination:</b> {count - 1} matches over {(count - 1).bit_length()} rounds</li>",
+            f"<li><b>Double elimination:</b> {2 * count - 2} matches, plus a grand final reset if needed</li>",
+            f"<li><b>Round robin:</b> {count * (count - 1) // 2} matches over {rounds} rounds, "
+            f"{count - 1} per team</li>",
+            f"<li><b>Swiss:</b> {max(1, (count - 1).bit_length())} rounds of {count // 2} matches, nobody eliminated</li>",
+        ]
+        if count >= 8:
+            groups = generate_fixtures(GROUPS, count)
+            group_matches = sum(len(matches) for stage in groups.stages[:-1] for matches in stage.rounds)
+            lines.append(f"<li><b>Groups + knockout:</b> {len(groups.groups)} groups, {group_matches} group matches, "
+                         f"then {match_count(groups) - group_matches} knockout matches for the top 2 of each group</li>")
+        bracket = generate_fixtures(SINGLE_ELIMINATION, count)
+        return (f"<p>For {count} teams, here is what each format takes:</p>\n<ul>\n" + '\n'.join(lines) + "\n</ul>\n"
+                "<p>A seeded single elimination draw starts like this:</p>\n"
+                + render_fixtures_html(bracket, max_rounds=1, max_matches=16)
+                + (schedule_answer_html(bracket, stations, station_word) if stations else "")
+                + "\n<p>Ask for a specific format (for example \"double elimination for "
+                f"{count} teams\") to get its full fixture list.</p>")
+
+    if format == ROUND_ROBIN and count > MAX_ROUND_ROBIN_ENTRANTS:
+        return None
+    if format == SWISS:
+        rounds = max(1, (count - 1).bit_length())
+        pairings, bye = SwissTournament(count).pair_round()
+        boards = ', '.join(f"{pairing.white.name} v {pairing.black.name}" for pairing in pairings[:16])
+        if len(pairings) > 16:
+            boards += f" and {len(pairings) - 16} more"
+        if bye is not None:
+            boards += f" (bye: {bye.name})"
+        return (f"<p>A Swiss tournament for {count} players needs about {rounds} rounds to find a clear winner, "
+                f"with {count // 2} games per round. Nobody is eliminated: each round pairs players on the same "
+                "score who have not met yet, and ties are split by Buchholz then Sonneborn-Berger.</p>\n"
+                f"<p><b>Round 1 (top half v bottom half by seed)</b></p>\n<ul>\n<li>{boards}</li>\n</ul>")
+    fixtures = generate_fixtures(format, count)
+    total = match_count(fixtures)
+    if format == ROUND_ROBIN:
+        rounds = len(fixtures.stages[0].rounds)
+        summary = f"A round robin for {count} teams has {total} matches over {rounds} rounds; each team plays {count - 1}."
+        if count % 2:
+            summary += " With an odd number of teams, one team rests each round."
+        details = render_fixtures_html(fixtures, max_rounds=None if rounds <= 15 else 5, max_matches=16)
+    elif format == SINGLE_ELIMINATION:
+        summary = f"A single elimination bracket for {count} teams has {total} matches over {len(fixtures.stages[0].rounds)} rounds."
+        byes = len(fixtures.stages[0].byes[0])
+        if byes:
+            summary += f" The top {byes} seeds get a first-round bye."
+        details = render_fixtures_html(fixtures, max_matches=16)
+    elif format == DOUBLE_ELIMINATION:
+        summary = (f"A double elimination bracket for {count} teams has {total - 1} matches, plus a grand final "
+                   "reset if the losers bracket champion wins the first final. Everyone is out after two losses.")
+        details = render_fixtures_html(fixtures, max_rounds=4, max_matches=8)
+    else:
+        knockout = fixtures.stages[-1]
+        summary = (f"{count} teams in {len(fixtures.groups)} groups play {total - sum(map(len, knockout.rounds))} "
+                   f"group matches; the top 2 of each group go into a knockout of {sum(map(len, knockout.rounds))} matches.")
+        details = render_fixtures_html(fixtures, max_rounds=8, max_matches=8)
+    if stations:
+        details += schedule_answer_html(fixtures, stations, station_word)
+    return f"<p>{summary}</p>\n{details}"
+
+def fixture_count_answer(match):
+    """Answer a fixture question that names how many teams, or None if the count is out of range"""
+    count = parse_count(match.group(1))
+    if count < 2 or count > MAX_ENTRANTS:
+        return None
+    courts = STATION_COUNT_PATTERN.search(match.string)
+    if courts is None:
+        return fixture_answer_html(fixture_format(match.string), count)
+    stations = parse_count(courts.group(1))
+    return fixture_answer_html(fixture_format(match.string), count, stations, courts.group(2))
+
+def fixtures_for_count(match):
+    """Offline response for fixture questions with a team count"""
+    return fixture_count_answer(match) or FIXTURES_RESPONSE
+
+# Fixture questions that say how many teams are answered by the fixtures
+# engine, online or offline
+FIXTURE_COUNT_RULE = IntentRule('fixture_count', 20, [FIXTURE_WORDS + ['bracket', 'draw', 'robin', 'elimination', 'knockout', 'league', 'group stage']],
+                                fixtures_for_count, pattern=FIXTURE_COUNT_PATTERN)
+FIXTURE_ROUTER = IntentRouter([FIXTURE_COUNT_RULE])
+
+# Offline intents, checked in priority order. Each clause lists substrings of
+# which at least one must appear in the message; all clauses must hold.
+OFFLINE_INTENTS = [
+    IntentRule('team_creation', 10, [['make', 'create', 'form'], ['team', 'squad', 'roster']], TEAM_CREATION_RESPONSE),
+    FIXTURE_COUNT_RULE,
+    IntentRule('chess_equipment', 30, [['chess', 'equipment', 'supplies', 'need'], ['tournament', 'competition', 'event']], CHESS_EQUIPMENT_RESPONSE),
+    IntentRule('round_robin', 40, [['round'], ['robin'], ['organize', 'create', 'start', 'setup', 'schedule', 'plan']], ROUND_ROBIN_RESPONSE),
+    # A fixture word, or "how" together with a creation verb
+    IntentRule('fixtures', 51, [FIXTURE_WORDS + ['how'], FIXTURE_WORDS + ['create', 'make', 'generate', 'set up']], FIXTURES_RESPONSE),
+    IntentRule('greeting', 60, [['hi', 'hello', 'hey', 'greetings', 'howdy']], GREETING_RESPONSES,
+               pattern=r'\b(?:hi|hello|hey|greetings|howdy)\b', max_length=9),
+    IntentRule('date', 70, [MONTHS], date_response,
+               pattern=r'\b(\d{1,2})\s?(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\b'),
+    IntentRule('size', 80, [['how many', 'number of']], SIZE_RESPONSE,
+               pattern=r'\b(?:how many|number of)\s+(?:teams|players|participants|people)\b'),
+    IntentRule('scheduling', 90, [['schedule', 'when', 'time', 'date', 'how long']], SCHEDULING_RESPONSE),
+    IntentRule('participants', 100, [['teams', 'players', 'participants', 'registration', 'sign up', 'join']], PARTICIPANTS_RESPONSE),
+    IntentRule('rules', 110, [['rules', 'scoring', 'points', 'win', 'lose', 'regulations']], RULES_RESPONSE),
+    IntentRule('brackets', 120, [['bracket', 'elimination', 'knockout', 'advance', 'progress', 'move on']], BRACKETS_RESPONSE),
+    IntentRule('venue', 130, [['venue', 'location', 'place', 'equipment', 'setup', 'space']], VENUE_RESPONSE),
+    IntentRule('prizes', 140, [['prize', 'reward', 'winning', 'trophy', 'money']], PRIZES_RESPONSE),
+    IntentRule('promotion', 150, [['promote', 'marketing', 'advertise', 'announcement', 'invite']], PROMOTION_RESPONSE),
+    # Tournament-related but too vague to answer: ask for more detail
+    IntentRule('clarify', 900, [TOURNAMENT_KEYWORDS], CLARIFY_RESPONSES),
+    IntentRule('general', 1000, [], GENERAL_RESPONSE),
+]
+
+OFFLINE_ROUTER = IntentRouter(OFFLINE_INTENTS)
+
+def get_offline_response(message, timestamp=None):
+    """Generate an offline response based on message keywords"""
+    # Add some randomness to responses
+    if timestamp is None:
+        timestamp = int(time.time())
+
+    intent = OFFLINE_ROUTER.route(message)
+    response = intent.rule.response
+
+    if callable(response):
+        return response(intent.match)
+    if isinstance(response, list):
+        # Make the response subtly different based on timestamp
+        return response[timestamp % len(response)]
+    return response
+
+def answer_fixture_question(message):
+    """Return computed fixtures HTML if the message asks for fixtures for a number of teams, else None"""
+    intent = FIXTURE_ROUTER.route(message)
+    if intent is None:
+        return None
+    return fixture_count_answer(intent.match)
@@ -0,0 +1,101 @@
+import zlib
+from collections import namedtuple
+
+from intents import IntentRule, IntentRouter
+
+GENERATION_PARAMETERS = {
+    'max_new_tokens': 800,
+    'temperature': 0.7,
+    'top_p': 0.9,
+    'return_full_text': False
+}
+
+# A kind of question and how to ask the model about it: the instruction text
+# before and after the question, and generation parameters whose
+# max_new_tokens fits the answer that kind of question needs. Generation time
+# grows with output tokens, so short questions get short budgets.
+PromptVariant = namedtuple('PromptVariant', ['name', 'head', 'tail', 'parameters'])
+
+SYSTEM_PROMPT = "You are TournamentGenius, a specialized tournament planning assistant."
+PERSONA = "<s>[INST] " + SYSTEM_PROMPT + "\n\n"
+CLOSE = " [/INST]</s>"
+
+SHORT = PromptVariant(
+    'short',
+    "Answer this tournament question briefly and precisely: ",
+    "\n\nGive the exact fact or figure first, in 2-4 sentences (under 80 words), using <p> and <b> HTML tags.",
+    dict(GENERATION_PARAMETERS, max_new_tokens=160)
+)
+
+HOW_TO = PromptVariant(
+    'how_to',
+    "Answer this tournament planning question: ",
+    "\n\nGive practical steps for an organizer as an HTML list (<p>, <ul>, <li>, <b>), about 120-200 words, "
+    "with a concrete example where it helps.",
+    dict(GENERATION_PARAMETERS, max_new_tokens=400)
+)
+
+GUIDE = PromptVariant(
+    'guide',
+    "Answer this tournament planning question in comprehensive detail: ",
+    """
+
+Your response should:
+1. Include specific examples and clear steps
+2. Use HTML formatting (<p>, <ul>, <li>, <b>) for readability
+3. Be thorough and informative, at least 150-200 words
+4. Include practical advice for tournament organizers
+5. Avoid saying "undefined" or giving very short responses
+6. Be direct and focused on the tournament planning question
+
+If asked about:
+- Tournament formats (explain structures like round robin, single/double elimination)
+- Team creation (roster size, roles, management tips)
+- Fixtures (provide concrete examples of match schedules)
+- Rules and scoring (clear explanation of tournament regulations)
+- Venue requirements (equipment, space needs, logistics)""",
+    GENERATION_PARAMETERS
+)
+
+PROMPT_VARIANTS = (SHORT, HOW_TO, GUIDE)
+
+# Changes whenever a prompt or its generation parameters change, so answers
+# stored for an older prompt are not served again (see AnswerStore)
+PROMPT_VERSION = format(zlib.crc32(repr((PERSONA, PROMPT_VARIANTS, CLOSE)).encode()), '08x')
+
+# Which variant a question gets, checked in priority order. Asking for a
+# guide outright wins; then short factual questions (a count, a duration, a
+# definition); then general planning requests. Everything else is a how-to.
+PROMPT_RULES = [
+    IntentRule('guide', 10, [['step by step', 'step-by-step', 'checklist', 'guide', 'from scratch', 'everything',
+                              'in detail', 'detailed', 'complete plan', 'full plan']], GUIDE),
+    IntentRule('short', 20, [['how many', 'number of', 'how long', 'how much', 'what is a', "what's a", 'what does',
+                              'define', 'meaning of', 'difference between', 'stand for', 'is it ', 'can a ',
+                              'does a ']], SHORT, max_length=100),
+    IntentRule('guide', 30, [['plan ', 'planning', 'organize', 'organise', 'organizing', 'organising', 'run a ',
+                              'host a', 'set up a', 'setting up']], GUIDE),
+    IntentRule('how_to', 1000, [], HOW_TO),
+]
+PROMPT_ROUTER = IntentRouter(PROMPT_RULES)
+
+
+def prompt_variant(message):
+    """Return the PromptVariant for a question"""
+    return PROMPT_ROUTER.route(message).rule.response
+
+
+def build_prompt(message, variant=GUIDE, context=''):
+    """Build the instruction prompt sent to the model from the variant's prebuilt text
+
+    context is what the conversation so far contributes (see
+    conversations.ConversationStore.context), placed before the question.
+    """
+    return PERSONA + context + variant.head + message + variant.tail + CLOSE
+
+
+def build_messages(message, variant=GUIDE, context=''):
+    """The same prompt as chat messages, for servers that apply the model's own chat template"""
+    return [
+        {'role': 'system', 'content': SYSTEM_PROMPT},
+        {'role': 'user', 'content': context + variant.head + message + variant.tail}
+    ]
@@ -26,34 +26,16 @@ document.addEventListener('DOMContentLoaded', () => {
     // Show loading indicator
     const loadingMessage = addLoadingMessage();
     
-    // Add a unique timestamp to prevent caching
-    const timestamp = new Date().getTime();
-    
-    // Send to backend with cache prevention
-    fetch(`/api/chat?t=${timestamp}`, {
+    // Stream the answer from the backend, rendering lines as they arrive.
+    // POST responses are never cached, so no cache-busting is needed
+    fetch('/api/chat/stream', {
       method: 'POST',
       headers: {
-        'Content-Type': 'application/json',
-        'Cache-Control': 'no-cache, no-store, must-revalidate',
-        'Pragma': 'no-cache',
-        'Expires': '0'
+        'Content-Type': 'application/json'
       },
-      body: JSON.stringify({ 
-        message: message,
-        timestamp: timestamp 
-      })
-    })
-    .then(response => response.json())
-    .then(data => {
-      // Remove loading message
-      loadingMessage.remove();
-      
-      // Force redraw before adding new content (helps with rendering issues)
-      setTimeout(() => {
-        // Add bot response
-        addMessageToChat('bot', data.response, true);
-      }, 50);
+      body: JSON.stringify({ message: message })
     })
+    .then(response => readChatStream(response, loadingMessage))
     .catch(error => {
       console.error('Error:', error);
       // Remove loading message
@@ -64,6 +46,77 @@ document.addEventListener('DOMContentLoaded', () => {
     });
   }
 
+  // Read server-sent events from a streaming chat response
+  async function readChatStream(response, loadingMessage) {
+    if (!response.ok) {
+      throw new Error(`Chat request failed with status ${response.status}`);
+    }
+
+    let botMessage = null;
+    let contentDiv = null;
+    let html = '';
+
+    // Swap the loading indicator for a real message on the first event
+    const render = (body) => {
+      if (!botMessage) {
+        loadingMessage.remove();
+        botMessage = addMessageToChat('bot', '', true);
+        contentDiv = botMessage.querySelector('.message-content');
+      }
+      contentDiv.innerHTML = body;
+      scrollToBottom();
+    };
+
+    const handleEvent = (rawEvent) => {
+      let type = 'message';
+      let data = '';
+      rawEvent.split('\n').forEach(line => {
+        if (line.startsWith('event:')) type = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      });
+      if (!data) return;
+
+      const payload = JSON.parse(data);
+      if (type === 'chunk') {
+        html += payload.html;
+        // The preview is escaped plain text of the line still being generated
+        render(payload.preview ? `${html}<p>${payload.preview}</p>` : html);
+      } else if (type === 'done') {
+        // The final answer replaces everything rendered from chunks
+        render(payload.html);
+      }
+    };
+
+    let buffer = '';
+    const processBuffer = () => {
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        handleEvent(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+      }
+    };
+
+    if (response.body && response.body.getReader) {
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        processBuffer();
+      }
+    } else {
+      // Browsers without streaming fetch get all events at once
+      buffer = await response.text();
+    }
+    buffer += '\n\n';
+    processBuffer();
+
+    if (!botMessage) {
+      throw new Error('Chat stream ended without a response');
+    }
+  }
+
   // Add a loading message
   function addLoadingMessage() {
     const messageDiv = document.createElement('div');
@@ -0,0 +1,328 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from breaker import OPEN, CircuitOpen
+
+
+class BackendStats:
+    """Moving averages of one backend's latency and error rate, and its call counts"""
+
+    __slots__ = ('latency', 'errors', 'calls', 'failures', 'hedge_wins', 'last_sent')
+
+    def __init__(self):
+        self.latency = None
+        self.errors = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.hedge_wins = 0
+        self.last_sent = None
+
+
+def is_available(backend):
+    """False while the backend's circuit breaker is open and still refusing calls"""
+    breaker = backend.breaker
+    if breaker is None or breaker.state != OPEN:
+        return True
+    return breaker.clock() - breaker.opened_at >= breaker.recovery_time
+
+
+def when_done(futures, callback):
+    """Call callback once every future has finished, at once if there are none"""
+    left = [len(futures)]
+    lock = threading.Lock()
+
+    def finished(_):
+        with lock:
+            left[0] -= 1
+            last = left[0] == 0
+        if last:
+            callback()
+    if not futures:
+        callback()
+    for future in futures:
+        future.add_done_callback(finished)
+
+
+def retrieve_exception(task):
+    """Mark a background task's exception as seen"""
+    if not task.cancelled():
+        task.exception()
+
+
+class ModelRouter:
+    """Pick a model backend for each call from recent latency, errors and health (thread version)
+
+    Each backend's latency and error rate are moving averages weighting the
+    newest call by alpha. Backends whose circuit breaker is open are
+    skipped; the rest are ranked by average latency times
+    (1 + error_penalty * error rate). A backend not sent a call for
+    refresh_after seconds goes first once, so no backend's numbers go stale.
+
+    A call that fails goes on to the next backend. When hedging is on
+    (hedge_factor above 0 and an executor to run calls on), a call still
+    running after hedge_factor times its backend's average latency, and at
+    least hedge_min seconds, is also sent to the next backend and the first
+    answer wins. At most max_hedge_ratio of calls are hedged. A losing call
+    finishes in the background and still counts toward its backend's
+    averages; generate() calls settled only once it has, so a caller
+    holding an admission slot can keep it until no call is left running.
+    """
+
+    def __init__(self, backends, alpha=0.2, error_penalty=4.0, refresh_after=60.0, hedge_factor=2.0,
+                 hedge_min=1.0, max_hedge_ratio=0.1, executor=None, clock=time.monotonic):
+        self.backends = list(backends)
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.refresh_after = refresh_after
+        self.hedge_factor = hedge_factor
+        self.hedge_min = hedge_min
+        self.max_hedge_ratio = max_hedge_ratio
+        self.executor = executor
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.backend_stats = {backend.name: BackendStats() for backend in self.backends}
+        self.positions = {backend.name: position for position, backend in enumerate(self.backends)}
+        self.calls = 0
+        self.hedges = 0
+
+    def rank_key(self, now, backend):
+        """Sort key: stale backends first, then by latency scaled by errors, then configured order"""
+        stats = self.backend_stats[backend.name]
+        stale = stats.last_sent is None or now - stats.last_sent > self.refresh_after
+        score = float('inf') if stats.latency is None else stats.latency * (1 + self.error_penalty * stats.errors)
+        return not stale, score, self.positions[backend.name]
+
+    def ranked(self):
+        """Available backends, best first; raise CircuitOpen if there are none"""
+        now = self.clock()
+        with self.lock:
+            candidates = sorted(filter(is_available, self.backends), key=functools.partial(self.rank_key, now))
+        if not candidates:
+            raise CircuitOpen("every model backend's circuit is open")
+        return candidates
+
+    def choose(self):
+        """The best backend for a call that cannot be retried or hedged, such as a stream"""
+        backend = self.ranked()[0]
+        self.sent(backend)
+        return backend
+
+    def sent(self, backend):
+        """Note that a call went to backend"""
+        with self.lock:
+            self.backend_stats[backend.name].last_sent = self.clock()
+
+    def record(self, backend, seconds, ok):
+        """Fold one finished call into backend's averages; only successes update its latency"""
+        with self.lock:
+            stats = self.backend_stats[backend.name]
+            stats.calls += 1
+            stats.errors += self.alpha * ((0.0 if ok else 1.0) - stats.errors)
+            if not ok:
+                stats.failures += 1
+            elif stats.latency is None:
+                stats.latency = seconds
+            else:
+                stats.latency += self.alpha * (seconds - stats.latency)
+
+    def hedge_delay(self, backend):
+        """Seconds to wait on backend before hedging"""
+        latency = self.backend_stats[backend.name].latency
+        return max(self.hedge_min, self.hedge_factor * (latency or 0.0))
+
+    def take_hedge(self):
+        """Reserve a hedge if fewer than max_hedge_ratio of calls have been hedged"""
+        with self.lock:
+            if self.hedges >= self.max_hedge_ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def can_hedge(self, remaining):
+        """Whether a call may be hedged to the first of the remaining backends"""
+        return bool(remaining) and self.hedge_factor > 0 and self.executor is not None
+
+    def attempt(self, backend, call):
+        """Run call(backend), recording its latency or failure"""
+        self.sent(backend)
+        started = time.perf_counter()
+        try:
+            result = call(backend)
+        except CircuitOpen:
+            raise
+        except Exception:
+            self.record(backend, time.perf_counter() - started, False)
+            raise
+        self.record(backend, time.perf_counter() - started, True)
+        return result
+
+    def generate(self, call, settled=None):
+        """Return (backend, call(backend)) from the best backend that answers
+
+        Raises the last backend's error when every backend failed, or
+        CircuitOpen when none is available. settled, if given, is called
+        once every call this started has finished, whether generate
+        returned or raised; after a hedge that may be later than generate
+        returns.
+        """
+        losers = []
+        try:
+            remaining = self.ranked()
+            with self.lock:
+                self.calls += 1
+            error = None
+            while remaining:
+                backend = remaining.pop(0)
+                try:
+                    if self.can_hedge(remaining):
+                        return self.hedged(backend, remaining, call, losers)
+                    return backend, self.attempt(backend, call)
+                except Exception as e:
+                    print(f"Model backend {backend.name} failed: {e}")
+                    error = e
+            raise error
+        finally:
+            if settled is not None:
+                when_done(losers, settled)
+
+    def hedged(self, primary, remaining, call, losers):
+        """Run call on primary, and on the next backend too if primary is slow; return the first answer
+
+        A call still running when the other wins is added to losers.
+        """
+        delay = self.hedge_delay(primary)
+        first = self.executor.submit(self.attempt, primary, call)
+        done, _ = wait([first], timeout=delay)
+        if done or not self.take_hedge():
+            return primary, first.result()
+
+        secondary = remaining.pop(0)
+        print(f"Model backend {primary.name} slower than {delay:.2f}s, hedging to {secondary.name}")
+        pending = {first: primary, self.executor.submit(self.attempt, secondary, call): secondary}
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = pending.pop(future)
+                if future.exception() is None:
+                    self.won(backend, secondary)
+                    losers.extend(pending)
+                    return backend, future.result()
+                error = future.exception()
+        raise error
+
+    def won(self, backend, secondary):
+        """Count a hedged call the hedge answered first"""
+        if backend is secondary:
+            with self.lock:
+                self.backend_stats[backend.name].hedge_wins += 1
+
+    def stats(self):
+        """Return each backend's averages, counts and breaker state, best first"""
+        now = self.clock()
+        with self.lock:
+            ranked = sorted(self.backends, key=functools.partial(self.rank_key, now))
+            backends = []
+            for backend in ranked:
+                stats = self.backend_stats[backend.name]
+                backends.append({
+                    'name': backend.name,
+                    'url': backend.url,
+                    'available': is_available(backend),
+                    'breaker': backend.breaker.state if backend.breaker is not None else None,
+                    'latency': None if stats.latency is None else round(stats.latency, 4),
+                    'error_rate': round(stats.errors, 4),
+                    'calls': stats.calls,
+                    'failures': stats.failures,
+                    'hedge_wins': stats.hedge_wins
+                })
+            return {'calls': self.calls, 'hedges': self.hedges, 'backends': backends}
+
+
+class AsyncModelRouter(ModelRouter):
+    """ModelRouter for coroutines: calls are awaited, and hedges run as tasks on the event loop
+
+    A losing hedge is cancelled rather than left running, as is every call
+    when generate() itself is cancelled, so nothing outlives the caller's
+    admission slot.
+    """
+
+    def __init__(self, backends, **settings):
+        settings.pop('executor', None)
+        super().__init__(backends, **settings)
+        self.background = set()
+
+    def can_hedge(self, remaining):
+        """Whether a call may be hedged to the first of the remaining backends"""
+        return bool(remaining) and self.hedge_factor > 0
+
+    def start(self, backend, call):
+        """Run attempt() as a task that is kept alive until it finishes"""
+        task = asyncio.ensure_future(self.attempt(backend, call))
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+        task.add_done_callback(retrieve_exception)
+        return task
+
+    async def attempt(self, backend, call):
+        """Await call(backend), recording its latency or failure"""
+        self.sent(backend)
+        started = time.perf_counter()
+        try:
+            result = await call(backend)
+        except CircuitOpen:
+            raise
+        except Exception:
+            self.record(backend, time.perf_counter() - started, False)
+            raise
+        self.record(backend, time.perf_counter() - started, True)
+        return result
+
+    async def generate(self, call):
+        """Return (backend, await call(backend)) from the best backend that answers, as ModelRouter.generate"""
+        remaining = self.ranked()
+        with self.lock:
+            self.calls += 1
+        error = None
+        while remaining:
+            backend = remaining.pop(0)
+            try:
+                if self.can_hedge(remaining):
+                    return await self.hedged(backend, remaining, call)
+                return backend, await self.attempt(backend, call)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Model backend {backend.name} failed: {e}")
+                error = e
+        raise error
+
+    async def hedged(self, primary, remaining, call):
+        """Run call on primary, and on the next backend too if primary is slow; return the first answer"""
+        delay = self.hedge_delay(primary)
+        first = self.start(primary, call)
+        pending = {first: primary}
+        try:
+            done, _ = await asyncio.wait([first], timeout=delay)
+            if done or not self.take_hedge():
+                return primary, await first
+
+            secondary = remaining.pop(0)
+            print(f"Model backend {primary.name} slower than {delay:.2f}s, hedging to {secondary.name}")
+            pending[self.start(secondary, call)] = secondary
+            error = None
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is None:
+                        self.won(backend, secondary)
+                        return backend, task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,366 @@
+import heapq
+import html
+import math
+import random
+import time
+from collections import namedtuple
+
+from fixtures import (GroupPlace, Loser, Winner, generate_fixtures, parse_fixture_request, request_flag, request_number,
+                      slot_json, slot_label)
+
+DAY_MINUTES = 24 * 60
+DEFAULT_START = 9 * 60
+MAX_STATIONS = 1024
+# Time the optional improvement phase may spend re-running the scheduler
+IMPROVE_SECONDS = 0.3
+
+# A match placed on a station; start and end are minutes from midnight of day 1
+ScheduledMatch = namedtuple('ScheduledMatch', ['match', 'stage', 'round', 'station', 'start', 'end'])
+
+# A finished schedule: entries by start time, station names, the event's
+# first start and last end, and a lower bound on the last end
+Schedule = namedtuple('Schedule', ['entries', 'stations', 'start', 'end', 'lower_bound'])
+
+
+def parse_clock(value):
+    """Turn minutes, "HH:MM" or "day 2 HH:MM" into minutes from midnight of day 1"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"Unknown time {value!r}; use HH:MM or day N HH:MM")
+    text = value.strip().lower()
+    day = 1
+    if text.startswith('day'):
+        day_text, _, text = text[3:].strip().partition(' ')
+        if not day_text.isdigit():
+            raise ValueError(f"Unknown time {value!r}; use HH:MM or day N HH:MM")
+        day = int(day_text)
+    hours, _, minutes = text.strip().partition(':')
+    if not hours.isdigit() or not minutes.isdigit() or int(hours) > 24 or int(minutes) > 59:
+        raise ValueError(f"Unknown time {value!r}; use HH:MM or day N HH:MM")
+    return (day - 1) * DAY_MINUTES + int(hours) * 60 + int(minutes)
+
+
+def parse_windows(windows):
+    """Return sorted (start, end) minute pairs; None means from 09:00 with no end"""
+    if not windows:
+        return [(DEFAULT_START, math.inf)]
+    if not isinstance(windows, (list, tuple)):
+        raise ValueError("windows must be a list of [start, end] or {day, start, end}")
+    parsed = []
+    for window in windows:
+        if isinstance(window, dict):
+            day = window.get('day', 1)
+            start, end = parse_clock(f"day {day} {window.get('start')}"), parse_clock(f"day {day} {window.get('end')}")
+        elif isinstance(window, (list, tuple)) and len(window) == 2:
+            start, end = parse_clock(window[0]), parse_clock(window[1])
+        else:
+            raise ValueError("Each window is [start, end] or {day, start, end}")
+        if end <= start:
+            raise ValueError(f"Window {window!r} ends before it starts")
+        parsed.append((start, end))
+    parsed.sort()
+    for (_, previous_end), (start, _) in zip(parsed, parsed[1:]):
+        if start < previous_end:
+            raise ValueError("Time windows must not overlap")
+    return parsed
+
+
+def format_clock(minutes):
+    """Return (day, "HH:MM") for minutes from midnight of day 1"""
+    day, minute = divmod(int(round(minutes)), DAY_MINUTES)
+    return day + 1, f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def station_names(stations):
+    """Return station names from a count ("Station 1".."Station n") or a list of names"""
+    if isinstance(stations, (list, tuple)):
+        names = [str(name).strip() for name in stations]
+        if not names or not all(names):
+            raise ValueError("Station names must not be empty")
+    elif isinstance(stations, int) and not isinstance(stations, bool) and stations >= 1:
+        names = [f"Station {number}" for number in range(1, stations + 1)]
+    else:
+        raise ValueError("stations must be a positive number or a list of names")
+    if len(names) > MAX_STATIONS:
+        raise ValueError(f"At most {MAX_STATIONS} stations are supported")
+    return names
+
+
+class MatchGraph:
+    """Matches of a Fixtures flattened into arrays the scheduler indexes by position
+
+    A match depends on the matches whose winner or loser it needs, and on
+    every match of a group it takes a qualifier from. teams holds the
+    entrants known up front (seeds); everyone else is reached through a
+    dependency, which is where their rest time is enforced.
+    """
+
+    def __init__(self, fixtures, match_minutes, stage_minutes=None):
+        stage_minutes = stage_minutes or {}
+        self.matches, self.stages, self.rounds, self.durations = [], [], [], []
+        position = {}
+        group_matches = {}
+        for stage in fixtures.stages:
+            duration = float(stage_minutes.get(stage.name, match_minutes))
+            if duration <= 0:
+                raise ValueError("Match durations must be positive")
+            for number, matches in enumerate(stage.rounds, 1):
+                for match in matches:
+                    position[match.id] = len(self.matches)
+                    self.matches.append(match)
+                    self.stages.append(stage.name)
+                    self.rounds.append(number)
+                    self.durations.append(duration)
+                    if stage.name.startswith('Group '):
+                        group_matches.setdefault(stage.name[len('Group '):], []).append(len(self.matches) - 1)
+
+        count = len(self.matches)
+        self.teams = [[slot for slot in (match.home, match.away) if isinstance(slot, int)] for match in self.matches]
+        self.team_matches = {}
+        for index, teams in enumerate(self.teams):
+            for team in teams:
+                self.team_matches.setdefault(team, []).append(index)
+        self.predecessors = [[] for _ in range(count)]
+        self.successors = [[] for _ in range(count)]
+        for index, match in enumerate(self.matches):
+            for slot in (match.home, match.away):
+                if isinstance(slot, (Winner, Loser)):
+                    sources = [position[slot.match]]
+                elif isinstance(slot, GroupPlace):
+                    sources = group_matches[slot.group]
+                else:
+                    continue
+                for source in sources:
+                    if source not in self.predecessors[index]:
+                        self.predecessors[index].append(source)
+                        self.successors[source].append(index)
+
+    def critical_paths(self, rest_minutes):
+        """Longest chain of match and rest time from each match to the end of the event"""
+        # Match ids are assigned in play order, so successors always come later
+        remaining = [0.0] * len(self.matches)
+        for index in range(len(self.matches) - 1, -1, -1):
+            after = max((rest_minutes + remaining[successor] for successor in self.successors[index]), default=0.0)
+            remaining[index] = self.durations[index] + after
+        return remaining
+
+
+def place_matches(graph, rank, station_count, rest_minutes, windows):
+    """Place matches in time order, highest priority first (lowest rank); return (starts, stations)
+
+    Each team plays its known matches in rank order, so a team's next
+    match simply depends on its previous one (plus rest) like any
+    bracket dependency. At each moment every idle station takes the best
+    ranked ready match that fits in the current time window; then time
+    advances to the next station becoming free or match becoming ready.
+    """
+    count = len(graph.matches)
+    durations = graph.durations
+    dependencies = [len(predecessors) for predecessors in graph.predecessors]
+    next_matches = [[] for _ in range(count)]
+    for matches in graph.team_matches.values():
+        matches = sorted(matches, key=rank.__getitem__)
+        for previous, index in zip(matches, matches[1:]):
+            next_matches[previous].append(index)
+            dependencies[index] += 1
+    ready_at = [windows[0][0]] * count
+    station_free = [windows[0][0]] * station_count
+    starts, stations = [None] * count, [None] * count
+
+    waiting = [(ready_at[index], rank[index], index) for index in range(count) if not dependencies[index]]
+    heapq.heapify(waiting)
+    available = []
+    window = 0
+    now = windows[0][0]
+    placed = 0
+    while placed < count:
+        while now >= windows[window][1]:
+            window += 1
+            if window == len(windows):
+                raise ValueError(f"Only {placed} of {count} matches fit in the time windows")
+        now = max(now, windows[window][0])
+        window_end = windows[window][1]
+
+        while waiting and waiting[0][0] <= now:
+            _, order, index = heapq.heappop(waiting)
+            heapq.heappush(available, (order, index))
+
+        idle = [station for station in range(station_count - 1, -1, -1) if station_free[station] <= now]
+        too_long = []
+        while idle and available:
+            order, index = heapq.heappop(available)
+            end = now + durations[index]
+            if end > window_end:
+                too_long.append((order, index))
+                continue
+            station = idle.pop()
+            starts[index], stations[index] = now, station
+            station_free[station] = end
+            for successor in graph.successors[index] + next_matches[index]:
+                ready_at[successor] = max(ready_at[successor], end + rest_minutes)
+                dependencies[successor] -= 1
+                if not dependencies[successor]:
+                    heapq.heappush(waiting, (ready_at[successor], rank[successor], successor))
+            placed += 1
+        for item in too_long:
+            heapq.heappush(available, item)
+
+        later = [free for free in station_free if free > now]
+        if waiting:
+            later.append(waiting[0][0])
+        if too_long or not later:
+            later.append(window_end)
+        now = min(later)
+    return starts, stations
+
+
+def working_to_clock(windows, minutes):
+    """Return the clock time reached after minutes of working time inside the windows"""
+    for start, end in windows:
+        if minutes <= end - start:
+            return start + minutes
+        minutes -= end - start
+    return math.inf
+
+
+def lower_bound(graph, critical, station_count, rest_minutes, windows):
+    """A finish time no schedule can beat: longest chain, station capacity or busiest team"""
+    load = {}
+    for index, teams in enumerate(graph.teams):
+        for team in teams:
+            matches, minutes = load.get(team, (0, 0.0))
+            load[team] = (matches + 1, minutes + graph.durations[index])
+    busiest = max((minutes + rest_minutes * (matches - 1) for matches, minutes in load.values()), default=0.0)
+    work = max(max(critical, default=0.0), sum(graph.durations) / station_count, busiest)
+    return working_to_clock(windows, work)
+
+
+def schedule_cost(starts, durations, first_start):
+    """What the local search minimises: the last finish, then the sum of finishes"""
+    ends = [start + duration for start, duration in zip(starts, durations)]
+    return max(ends, default=first_start), sum(ends)
+
+
+def schedule_fixtures(fixtures, stations=4, match_minutes=30, rest_minutes=10, windows=None, stage_minutes=None,
+                      improve_seconds=0.0, seed=0):
+    """Assign every match of fixtures a station and start time, finishing as early as possible
+
+    A greedy pass places matches by critical path (then round, then
+    match number). With improve_seconds, a local search then swaps the
+    priorities of nearby matches and keeps any order that finishes no
+    later; among equally long schedules it prefers the one whose matches
+    finish earliest overall, so teams are done sooner.
+    """
+    names = station_names(stations)
+    windows = parse_windows(windows)
+    if rest_minutes < 0:
+        raise ValueError("rest_minutes must not be negative")
+    graph = MatchGraph(fixtures, match_minutes, stage_minutes)
+    longest = max(graph.durations, default=0.0)
+    if longest > max(end - start for start, end in windows):
+        raise ValueError("A match is longer than every time window")
+    critical = graph.critical_paths(rest_minutes)
+    bound = lower_bound(graph, critical, len(names), rest_minutes, windows)
+
+    order = sorted(range(len(graph.matches)), key=lambda index: (-critical[index], graph.rounds[index], index))
+    rank = [0] * len(order)
+    for position, index in enumerate(order):
+        rank[index] = position
+    starts, placed = place_matches(graph, rank, len(names), rest_minutes, windows)
+    best = schedule_cost(starts, graph.durations, windows[0][0])
+
+    deadline = time.perf_counter() + improve_seconds
+    rng = random.Random(seed)
+    while order and time.perf_counter() < deadline:
+        trial = order[:]
+        for _ in range(rng.randint(1, 4)):
+            position = rng.randrange(len(trial))
+            other = min(len(trial) - 1, max(0, position + rng.randint(-32, 32)))
+            trial[position], trial[other] = trial[other], trial[position]
+        trial_rank = rank[:]
+        for position, index in enumerate(trial):
+            trial_rank[index] = position
+        try:
+            trial_starts, trial_placed = place_matches(graph, trial_rank, len(names), rest_minutes, windows)
+        except ValueError:
+            continue
+        cost = schedule_cost(trial_starts, graph.durations, windows[0][0])
+        # Equal costs are accepted too, so the search can drift across plateaus
+        if cost <= best:
+            order, rank, starts, placed, best = trial, trial_rank, trial_starts, trial_placed, cost
+
+    entries = sorted((ScheduledMatch(match, graph.stages[index], graph.rounds[index], placed[index],
+                                     starts[index], starts[index] + graph.durations[index])
+                      for index, match in enumerate(graph.matches)), key=lambda entry: (entry.start, entry.station))
+    return Schedule(entries, names, windows[0][0], best[0], bound)
+
+
+def parse_schedule_request(data):
+    """Turn API parameters into schedule_fixtures() keyword arguments (fixtures excluded)"""
+    stations = data.get('stations', 4)
+    if not isinstance(stations, (list, tuple)):
+        stations = request_number(data, 'stations', 4)
+    stage_minutes = data.get('stage_minutes') or {}
+    if not isinstance(stage_minutes, dict):
+        raise ValueError("stage_minutes maps stage names to minutes")
+    try:
+        stage_minutes = {name: float(minutes) for name, minutes in stage_minutes.items()}
+    except (TypeError, ValueError):
+        raise ValueError("stage_minutes maps stage names to minutes")
+    return {
+        'stations': stations,
+        'match_minutes': request_number(data, 'match_minutes', 30),
+        'rest_minutes': request_number(data, 'rest_minutes', 10),
+        'windows': data.get('windows'),
+        'stage_minutes': stage_minutes,
+        'improve_seconds': IMPROVE_SECONDS if request_flag(data, 'improve') else 0.0,
+    }
+
+
+def schedule_json(schedule, fixtures):
+    """Return a JSON-ready dict of the schedule; slots are as in fixtures_json, times are day and HH:MM"""
+    def clock(minutes):
+        day, text = format_clock(minutes)
+        return {'day': day, 'time': text}
+
+    return {
+        'stations': schedule.stations,
+        'start': clock(schedule.start),
+        'end': clock(schedule.end),
+        'length_minutes': schedule.end - schedule.start,
+        'lower_bound_minutes': schedule.lower_bound - schedule.start,
+        'matches': [{'id': entry.match.id, 'stage': entry.stage, 'round': entry.round,
+                     'home': slot_json(entry.match.home), 'away': slot_json(entry.match.away),
+                     'station': schedule.stations[entry.station],
+                     'start': clock(entry.start), 'end': clock(entry.end)} for entry in schedule.entries],
+    }
+
+
+def render_schedule_html(schedule, fixtures, max_slots=None):
+    """Render the schedule as one list item per start time, showing at most max_slots start times"""
+    slots = {}
+    for entry in schedule.entries:
+        slots.setdefault(entry.start, []).append(entry)
+    parts = ["<ul>"]
+    for number, (start, entries) in enumerate(slots.items()):
+        if max_slots is not None and number == max_slots:
+            parts.append(f"<li>... and {len(slots) - max_slots} more start times</li>")
+            break
+        day, clock = format_clock(start)
+        games = ', '.join(f"{html.escape(schedule.stations[entry.station])}: "
+                          f"{slot_label(entry.match.home, fixtures.entrants)} v "
+                          f"{slot_label(entry.match.away, fixtures.entrants)}" for entry in entries)
+        parts.append(f"<li><b>Day {day} {clock}:</b> {games}</li>")
+    parts.append("</ul>")
+    return '\n'.join(parts)
+
+
+def build_schedule_response(data):
+    """Generate fixtures and schedule them for an API request; HTML is included when html is set"""
+    fixtures = generate_fixtures(**parse_fixture_request(data))
+    schedule = schedule_fixtures(fixtures, **parse_schedule_request(data))
+    result = schedule_json(schedule, fixtures)
+    if request_flag(data, 'html'):
+        result['html'] = render_schedule_html(schedule, fixtures)
+    return result
@@ -0,0 +1,143 @@
+import re
+from collections import namedtuple
+
+# Keywords that mark a message as tournament-related (matched as substrings)
+TOURNAMENT_KEYWORDS = [
+    'tournament', 'competition', 'match', 'game', 'player', 'team',
+    'bracket', 'schedule', 'round', 'scoring', 'rules', 'format',
+    'elimination', 'seed', 'ranking', 'leaderboard', 'prize',
+    'registration', 'participant', 'venue', 'organize', 'plan',
+    'esports', 'sports', 'gaming', 'event', 'championship',
+    'knockout', 'finals', 'semifinals', 'quarterfinals',
+    'swiss', 'robin', 'league', 'cup', 'trophy', 'contest',
+    'sep', 'oct', 'nov', 'dec', 'jan', 'feb', 'mar', 'apr',
+    'may', 'jun', 'jul', 'aug', 'date',
+    # Additional gaming/tournament keywords
+    'fixture', 'matchup', 'pairing', 'draw', 'seeding', 'group stage',
+    'playoffs', 'ladder', 'qualifier', 'wildcard', 'bye', 'advancement',
+    'lan', 'online', 'hybrid', 'host', 'streaming', 'spectator',
+    'commentator', 'caster', 'referee', 'admin', 'marshal', 'judge',
+    'gamer', 'competitive', 'casual', 'amateur', 'professional',
+    'sponsorship', 'entry fee', 'registration fee', 'check-in',
+    'best of', 'bo3', 'bo5', 'bo7', 'double elim', 'single elim',
+    'map pool', 'map pick', 'veto', 'draft', 'ban', 'pick',
+    'lobby', 'server', 'ping', 'discord', 'matchmaking', 'scrims',
+    'practice', 'warm-up', 'cooldown', 'timeout', 'disqualification',
+    'forfeit', 'walkover', 'results', 'standings', 'stats', 'mvp',
+    'gaming', 'esport', 'fps', 'moba', 'rts', 'battle royale', 'card game',
+    'board game', 'tabletop', 'rpg', 'fighting game', 'racing', 'simulation',
+    'lol', 'dota', 'cs:go', 'valorant', 'overwatch', 'fortnite', 'pubg',
+    'starcraft', 'hearthstone', 'mtg', 'yugioh', 'pokemon', 'smash bros',
+    'fifa', 'madden', 'nba', 'nfl', 'mlb', 'nhl', 'chess', 'checkers',
+    'go', 'backgammon', 'scrabble', 'catan', 'monopoly', 'risk',
+    'livestream', 'twitch', 'youtube', 'facebook gaming', 'obs',
+    'bracket generator', 'challonge', 'toornament', 'battlefy', 'smash.gg',
+    'faceit', 'esl', 'dreamhack', 'major', 'minor', 'invitational',
+    'season', 'offseason', 'preseason', 'regular season', 'exhibition',
+    'showmatch', 'all-star', 'charity', 'fundraiser', 'community',
+    'meta', 'strategy', 'tactics', 'patch', 'update', 'balance',
+    'region', 'international', 'global', 'national', 'local', 'venue'
+]
+
+# Whole words (whitespace separated) that point at a location or time
+LOCATION_TIME_KEYWORDS = ['where', 'when', 'location', 'place', 'venue', 'time', 'date', 'day', 'schedule', 'on', 'at']
+
+# Phrases commonly used in tournament planning (matched as substrings)
+TOURNAMENT_PHRASES = [
+    'how to organize', 'best format for', 'rules for', 'how many teams',
+    'manage participants', 'schedule matches', 'track scores', 'set up',
+    'create a', 'start a', 'run a', 'hosting a', 'how many', 'best way'
+]
+
+# Dates like "12 oct" or "3/5" hint at scheduling; the (?<!\w\d) lookbehind
+# stands in for a leading \b so the pattern can start with the digit itself
+DATE_PATTERN = r'\d(?<!\w\d)\d?[-/\s]?\w+\b'
+
+ScopeMatch = namedtuple('ScopeMatch', ['related', 'rule', 'matched'])
+
+NO_MATCH = ScopeMatch(False, None, None)
+
+_KEYWORD_SET = frozenset(TOURNAMENT_KEYWORDS)
+_LOCATION_TIME_SET = frozenset(LOCATION_TIME_KEYWORDS)
+
+
+def build_trie_pattern(words, whole_words=(), longest=False):
+    """Build a prefix-factored regex alternation that matches any of the words
+
+    Entries in whole_words only match when surrounded by whitespace or the
+    ends of the text, the same way `word in text.split()` does. With longest
+    set, the pattern matches the longest word at a position instead of
+    stopping at the first one.
+    """
+    trie = {}
+    for word, whole in [(w, False) for w in words] + [(w, True) for w in whole_words]:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[None if whole else ''] = word
+
+    def emit(node):
+        # A substring keyword ending here already satisfies the search, so
+        # longer words sharing this prefix never need to be tried
+        if '' in node and not longest:
+            return ''
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items(), key=lambda item: item[0] or '') if char]
+        if None in node:
+            branches.insert(0, r'(?<!\S' + re.escape(node[None]) + r')(?!\S)')
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if '' in node else '')
+
+    return emit(trie)
+
+
+def _compile_scope_pattern(digits):
+    """Compile every scope rule into a single alternation keyed on the first character
+
+    Each top-level branch starts with a literal character so the regex engine
+    can skip straight past text that cannot start any rule.
+    """
+    literals = build_trie_pattern(TOURNAMENT_KEYWORDS + TOURNAMENT_PHRASES, whole_words=LOCATION_TIME_KEYWORDS)
+    date_branches = [digit + DATE_PATTERN[2:].replace(r'\w\d', r'\w' + digit, 1) for digit in digits]
+    return re.compile('|'.join(date_branches) + '|' + literals[3:-1])
+
+
+# ASCII text gets the literal-digit dispatch; anything else keeps the Unicode \d
+SCOPE_PATTERN = _compile_scope_pattern('0123456789')
+UNICODE_SCOPE_PATTERN = re.compile(DATE_PATTERN + '|' + build_trie_pattern(
+    TOURNAMENT_KEYWORDS + TOURNAMENT_PHRASES, whole_words=LOCATION_TIME_KEYWORDS)[3:-1])
+
+
+def _rule_for(message_lower, match):
+    """Name the rule responsible for a match, honouring the original rule order"""
+    matched = match.group()
+    if matched[0].isdigit():
+        return 'date'
+    start, end = match.span()
+    if (matched in _LOCATION_TIME_SET
+            and (start == 0 or message_lower[start - 1].isspace())
+            and (end == len(message_lower) or message_lower[end].isspace())):
+        return 'location'
+    if matched in _KEYWORD_SET:
+        return 'keyword'
+    return 'phrase'
+
+
+def match_scope(message):
+    """Classify a message in one pass and report the rule that put it in scope
+
+    Possessive references ("my tournament", "our event") need no rule of
+    their own: every noun they accept is also a keyword.
+    """
+    # If message is too short, likely not tournament-related
+    if len(message.strip()) < 3:
+        return NO_MATCH
+
+    message_lower = message.lower()
+    pattern = SCOPE_PATTERN if message_lower.isascii() else UNICODE_SCOPE_PATTERN
+    match = pattern.search(message_lower)
+    if match is None:
+        return NO_MATCH
+    return ScopeMatch(True, _rule_for(message_lower, match), match.group())
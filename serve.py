@@ -0,0 +1,134 @@
+import argparse
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+from dotenv import load_dotenv
+
+# Seconds to wait before replacing a worker that exited, so a worker that
+# crashes on startup does not spin the master
+RESPAWN_DELAY = 1.0
+
+
+def default_workers():
+    """One worker per CPU the process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def exit_worker(signum, frame):
+    """Leave the worker's serve loop so spawn() can flush before exiting"""
+    raise SystemExit(0)
+
+
+def flush_answers():
+    """Write the answers this worker's answer store still has queued; os._exit skips atexit"""
+    app = sys.modules.get('app')
+    if app is not None and app.answer_store is not None:
+        app.answer_store.flush()
+
+
+def run_worker(server, sock):
+    """Serve requests from the shared listening socket until terminated"""
+    signal.signal(signal.SIGINT, exit_worker)
+    signal.signal(signal.SIGTERM, exit_worker)
+    if server == 'aiohttp':
+        import async_app
+        async_app.web.run_app(async_app.create_app(), sock=sock, print=None)
+    else:
+        from werkzeug.serving import make_server
+        import app
+        host, port = sock.getsockname()[:2]
+        make_server(host, port, app.app, threaded=True, fd=sock.fileno()).serve_forever()
+
+
+def spawn(server, sock):
+    """Fork one worker; return its pid"""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(server, sock)
+        finally:
+            try:
+                flush_answers()
+            finally:
+                os._exit(0)
+    return pid
+
+
+def serve(server, host, port, workers):
+    """Bind once, fork workers that share the socket, and replace any that exit
+
+    The app module is imported here, before forking, so .env is read and
+    module state (compiled matchers, clients, caches) is built once and
+    shared copy-on-write by the workers. SIGINT or SIGTERM stops every
+    worker.
+    """
+    # Import before forking; the workers inherit the loaded modules
+    import app
+    if server == 'aiohttp':
+        import async_app
+
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.set_inheritable(True)
+    children = {spawn(server, sock) for _ in range(workers)}
+    print(f"Tournament Planner Bot serving on {host}:{port} with {workers} {server} worker(s), "
+          f"response cache: {app.RESPONSE_CACHE_PATH or 'per process'}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}, starting a replacement")
+            time.sleep(RESPAWN_DELAY)
+            children.add(spawn(server, sock))
+    sock.close()
+
+
+if __name__ == '__main__':
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Serve the chat app from several worker processes')
+    parser.add_argument('--server', choices=['flask', 'aiohttp'], default='flask')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', 3000)))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WORKERS', 0)) or default_workers(),
+                        help='worker processes (default: WORKERS, else one per CPU)')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit("serve.py needs os.fork; run app.py or async_app.py instead")
+    # Workers share model answers through one SQLite file unless told
+    # otherwise. It goes in a directory only this user can open (mkdtemp
+    # makes it 0700), not at a guessable name in the shared temp directory,
+    # and is removed when the server stops
+    cache_dir = None
+    if args.workers > 1 and not os.getenv('RESPONSE_CACHE_PATH'):
+        cache_dir = tempfile.mkdtemp(prefix=f'tournamentgenius-{args.port}-')
+        os.environ['RESPONSE_CACHE_PATH'] = os.path.join(cache_dir, 'responses.sqlite3')
+    try:
+        serve(args.server, args.host, args.port, args.workers)
+    finally:
+        if cache_dir is not None:
+            shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+
+
+class TooManyWaiters(Exception):
+    """Raised when an in-flight call already has its maximum number of waiters"""
+
+
+class CallAbandoned(Exception):
+    """Raised to waiters when the leader stopped before producing a result"""
+
+
+class InFlightCall:
+    """One in-progress call that several callers are waiting on"""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one (thread version)
+
+    The first caller for a key becomes the leader and does the work; callers
+    that arrive while it is running wait for the leader's result, or its
+    exception. At most max_waiters callers can wait on one call; beyond
+    that join() raises TooManyWaiters so the caller can fall back instead of
+    queueing without bound.
+    """
+
+    def __init__(self, max_waiters=1000):
+        self.max_waiters = max_waiters
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def join(self, key):
+        """Return (call, is_leader) for key; the leader must later call complete()"""
+        with self.lock:
+            call = self.calls.get(key)
+            if call is None:
+                call = self.calls[key] = InFlightCall()
+                self.leaders += 1
+                return call, True
+            if call.waiters >= self.max_waiters:
+                self.rejected += 1
+                raise TooManyWaiters(f"{call.waiters} callers already waiting")
+            call.waiters += 1
+            self.coalesced += 1
+            return call, False
+
+    def complete(self, key, call, result=None, error=None):
+        """Publish the leader's result (or error) to every waiter"""
+        with self.lock:
+            if self.calls.get(key) is call:
+                del self.calls[key]
+        call.result = result
+        call.error = error
+        call.done.set()
+
+    def wait(self, call, timeout=None):
+        """Block until the leader completes; return its result or raise its error"""
+        if not call.done.wait(timeout):
+            raise TimeoutError("in-flight call did not finish in time")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, func, timeout=None, executor=None):
+        """Run func() once for all concurrent callers with the same key
+
+        Without an executor the leader runs func() itself. With one, func()
+        runs there and every caller, leader included, waits at most timeout
+        seconds; the work carries on after a TimeoutError.
+        """
+        call, leader = self.join(key)
+        if not leader:
+            return self.wait(call, timeout)
+        if executor is not None:
+            executor.submit(self.run, key, call, func)
+            return self.wait(call, timeout)
+        return self.run(key, call, func)
+
+    def run(self, key, call, func):
+        """Run func() as the leader of call and publish the outcome"""
+        try:
+            result = func()
+        except BaseException as e:
+            self.complete(key, call, error=e)
+            raise
+        self.complete(key, call, result=result)
+        return result
+
+    def stats(self):
+        """Return counters; coalesced is the number of upstream calls saved"""
+        with self.lock:
+            return {
+                'in_flight': len(self.calls),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'rejected': self.rejected
+            }
+
+
+class AsyncInFlightCall:
+    """One in-progress coroutine call and the number of callers awaiting it"""
+
+    __slots__ = ('future', 'awaiting', 'detached')
+
+    def __init__(self, future):
+        self.future = future
+        self.awaiting = 0
+        self.detached = False
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent coroutine calls with the same key (asyncio version)
+
+    With do(), the shared work runs as its own task, so cancelling one caller
+    (for example a client disconnecting) does not cancel the work for the
+    others; the task is cancelled only when every caller has gone. Leaders
+    that produce the result themselves, such as a streaming response, use
+    join() and complete() instead.
+    """
+
+    def __init__(self, max_waiters=1000):
+        self.max_waiters = max_waiters
+        self.calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def join(self, key, start=None):
+        """Return (call, is_leader); start() creates the shared future for a new call"""
+        call = self.calls.get(key)
+        if call is None:
+            future = start() if start is not None else asyncio.get_running_loop().create_future()
+            call = self.calls[key] = AsyncInFlightCall(future)
+            future.add_done_callback(lambda _, key=key, call=call: self.forget(key, call))
+            self.leaders += 1
+            return call, True
+        if call.awaiting >= self.max_waiters:
+            self.rejected += 1
+            raise TooManyWaiters(f"{call.awaiting} callers already waiting")
+        self.coalesced += 1
+        return call, False
+
+    async def wait(self, call, timeout=None):
+        """Await the shared result without letting this caller's cancellation spread
+
+        A caller that runs out of time raises asyncio.TimeoutError and leaves
+        the work to finish in the background.
+        """
+        call.awaiting += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(call.future), timeout)
+        except asyncio.TimeoutError:
+            call.detached = True
+            raise
+        finally:
+            call.awaiting -= 1
+            if (call.awaiting == 0 and not call.detached and isinstance(call.future, asyncio.Task)
+                    and not call.future.done()):
+                # Everyone waiting on a do() task was cancelled
+                call.future.cancel()
+
+    def complete(self, key, call, result=None, error=None):
+        """Publish a join() leader's result (or error) to every waiter"""
+        self.forget(key, call)
+        if not call.future.done():
+            if error is not None:
+                call.future.set_exception(error)
+            else:
+                call.future.set_result(result)
+
+    async def do(self, key, coroutine_function, timeout=None):
+        """Await coroutine_function() once for all concurrent callers with the same key"""
+        call, _ = self.join(key, start=lambda: asyncio.ensure_future(coroutine_function()))
+        return await self.wait(call, timeout)
+
+    def forget(self, key, call):
+        """Drop a finished call so the next caller starts a new one"""
+        if self.calls.get(key) is call:
+            del self.calls[key]
+
+    def stats(self):
+        """Return counters; coalesced is the number of upstream calls saved"""
+        return {
+            'in_flight': len(self.calls),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected
+        }
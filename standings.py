@@ -0,0 +1,372 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+from fixtures import entrant_names, request_entrants, request_number
+
+MAX_PARTICIPANTS = 100000
+MAX_STANDINGS_PAGE = 1000
+
+# Points for a win, a draw and a loss unless the leaderboard says otherwise
+DEFAULT_POINTS = {'win': 3, 'draw': 1, 'loss': 0}
+
+# Tiebreakers applied after points, in the order configured: the column
+# compared and whether more is better
+TIEBREAKERS = {
+    'wins': ('wins', True),
+    'score_difference': ('difference', True),
+    'score_for': ('score_for', True),
+    'score_against': ('score_against', False),
+    'losses': ('losses', False),
+    'fewest_played': ('played', False),
+}
+DEFAULT_TIEBREAKERS = ('score_difference', 'score_for', 'wins')
+
+COLUMNS = ('points', 'played', 'wins', 'draws', 'losses', 'score_for', 'score_against', 'difference')
+
+WINNERS = {'home': 1, 'away': -1, 'draw': 0}
+
+# The column each outcome counts in, and the points setting it scores
+OUTCOMES = {'wins': 'win', 'draws': 'draw', 'losses': 'loss'}
+
+
+class RankedList:
+    """A sorted multiset that can say how many keys come before a key, and which key is at a position
+
+    Keys are kept in sorted sublists of up to 2 * load keys, with the last
+    key of each in maxes. A Fenwick tree over the sublist lengths turns
+    "keys before this sublist" into a prefix sum, so add, remove, index
+    and select are a bisect over maxes, a bisect or insort within one
+    sublist and O(log n) tree steps. Splitting or dropping a sublist
+    invalidates the tree, which is rebuilt in linear time on next use.
+    """
+
+    def __init__(self, keys=(), load=256):
+        keys = sorted(keys)
+        self.load = load
+        self.lists = [keys[start:start + load] for start in range(0, len(keys), load)]
+        self.maxes = [sublist[-1] for sublist in self.lists]
+        self.tree = None
+        self.size = len(keys)
+
+    def __len__(self):
+        return self.size
+
+    def build_tree(self):
+        """Fenwick tree of sublist lengths (0-based: tree[i] covers i & (i + 1) .. i)"""
+        tree = [len(sublist) for sublist in self.lists]
+        for index in range(len(tree)):
+            parent = index | (index + 1)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self.tree = tree
+        return tree
+
+    def update(self, position, change):
+        """Add change to the length of sublist position in the tree"""
+        tree = self.tree
+        while position < len(tree):
+            tree[position] += change
+            position |= position + 1
+
+    def before(self, position):
+        """Number of keys in the sublists before position"""
+        tree = self.tree or self.build_tree()
+        total = 0
+        while position > 0:
+            total += tree[position - 1]
+            position &= position - 1
+        return total
+
+    def locate(self, index):
+        """Return (sublist, offset) of the key at index"""
+        tree = self.tree or self.build_tree()
+        position = 0
+        step = 1 << (len(tree).bit_length() - 1)
+        while step:
+            following = position + step
+            if following <= len(tree) and tree[following - 1] <= index:
+                position = following
+                index -= tree[following - 1]
+            step >>= 1
+        return position, index
+
+    def add(self, key):
+        """Insert key"""
+        lists, maxes = self.lists, self.maxes
+        self.size += 1
+        if not maxes:
+            lists.append([key])
+            maxes.append(key)
+            self.tree = None
+            return
+        position = bisect_right(maxes, key)
+        if position == len(maxes):
+            position -= 1
+            lists[position].append(key)
+            maxes[position] = key
+        else:
+            insort(lists[position], key)
+        sublist = lists[position]
+        if len(sublist) > 2 * self.load:
+            lists.insert(position + 1, sublist[self.load:])
+            del sublist[self.load:]
+            maxes.insert(position, sublist[-1])
+            self.tree = None
+        elif self.tree is not None:
+            self.update(position, 1)
+
+    def remove(self, key):
+        """Remove one copy of key; ValueError if it is not present"""
+        lists, maxes = self.lists, self.maxes
+        position = bisect_left(maxes, key)
+        sublist = lists[position] if position < len(maxes) else ()
+        offset = bisect_left(sublist, key)
+        if offset == len(sublist) or sublist[offset] != key:
+            raise ValueError(f"{key!r} is not in the list")
+        del sublist[offset]
+        self.size -= 1
+        if len(sublist) * 4 < self.load and len(lists) > 1:
+            # Fold a nearly empty sublist into its neighbour so sublists stay few
+            if position == len(lists) - 1:
+                position -= 1
+            lists[position].extend(lists.pop(position + 1))
+            maxes[position] = maxes.pop(position + 1)
+            sublist = lists[position]
+            if len(sublist) > 2 * self.load:
+                lists.insert(position + 1, sublist[self.load:])
+                del sublist[self.load:]
+                maxes.insert(position, sublist[-1])
+            self.tree = None
+        elif not sublist:
+            del lists[position], maxes[position]
+            self.tree = None
+        else:
+            if offset == len(sublist):
+                maxes[position] = sublist[-1]
+            if self.tree is not None:
+                self.update(position, -1)
+
+    def index(self, key):
+        """Number of keys smaller than key"""
+        position = bisect_left(self.maxes, key)
+        if position == len(self.maxes):
+            return self.size
+        return self.before(position) + bisect_left(self.lists[position], key)
+
+    def slice(self, start, stop):
+        """Keys at positions start .. stop - 1"""
+        stop = min(stop, self.size)
+        if start >= stop:
+            return []
+        position, offset = self.locate(start)
+        keys = []
+        while len(keys) < stop - start:
+            keys.extend(self.lists[position][offset:offset + stop - start - len(keys)])
+            position, offset = position + 1, 0
+        return keys
+
+
+def result_outcomes(home, away, home_score, away_score, winner):
+    """The home and away outcome columns ('wins', 'draws' or 'losses') for one result; ValueError if invalid"""
+    if home == away:
+        raise ValueError("A participant cannot play itself")
+    if winner is not None and (not isinstance(winner, str) or winner not in WINNERS):
+        raise ValueError("winner must be home, away or draw")
+    margin = WINNERS[winner] if winner is not None else home_score - away_score
+    home_outcome = 'wins' if margin > 0 else 'losses' if margin < 0 else 'draws'
+    return home_outcome, {'wins': 'losses', 'losses': 'wins', 'draws': 'draws'}[home_outcome]
+
+
+def result_key(home, away, home_score, away_score, home_outcome):
+    """The same key for a result whichever side is named home"""
+    if home < away:
+        return home, away, home_score, away_score, home_outcome
+    away_outcome = {'wins': 'losses', 'losses': 'wins', 'draws': 'draws'}[home_outcome]
+    return away, home, away_score, home_score, away_outcome
+
+
+class Leaderboard:
+    """Live standings ranked by points, then the configured tiebreakers, then seed
+
+    Statistics are kept in one array per column, indexed by seed - 1,
+    rather than an object per participant. Each participant's current sort
+    key is held in a RankedList, so a reported result moves two keys and a
+    rank lookup is a bisect plus a Fenwick prefix sum; nothing is
+    re-sorted.
+    """
+
+    def __init__(self, entrants, tiebreakers=DEFAULT_TIEBREAKERS, points=None):
+        self.names = entrant_names(entrants, MAX_PARTICIPANTS)
+        unknown = [name for name in tiebreakers if not isinstance(name, str) or name not in TIEBREAKERS]
+        if unknown:
+            raise ValueError(f"Unknown tiebreaker {unknown[0]!r}; choose from {', '.join(TIEBREAKERS)}")
+        self.tiebreakers = list(tiebreakers)
+        self.points = dict(DEFAULT_POINTS, **(points or {}))
+        if set(self.points) != set(DEFAULT_POINTS):
+            raise ValueError("points gives win, draw and loss points")
+        self.outcome_points = {outcome: self.points[name] for outcome, name in OUTCOMES.items()}
+        count = len(self.names)
+        self.columns = {name: array('d', bytes(8 * count)) for name in COLUMNS}
+        # Keys sort ascending, so columns where more is better are negated
+        self.sort_columns = [(self.columns['points'], -1)] + [
+            (self.columns[TIEBREAKERS[name][0]], -1 if TIEBREAKERS[name][1] else 1) for name in self.tiebreakers]
+        self.keys = [self.sort_key(index) for index in range(count)]
+        self.ranked = RankedList(self.keys)
+        self.seeds = {}
+        for seed, name in enumerate(self.names, 1):
+            # Names used twice can only be looked up by seed
+            self.seeds[name] = None if name in self.seeds else seed
+        self.results = 0
+        # How many times each distinct result has been reported and not
+        # retracted, keyed by result_key(), so a retraction must name one
+        self.reported = {}
+        self.lock = threading.Lock()
+
+    def sort_key(self, index):
+        """Current sort key: the ranking columns, then the index to keep equal records in seed order"""
+        return tuple([sign * column[index] for column, sign in self.sort_columns] + [index])
+
+    def seed(self, participant):
+        """Resolve a participant given by name or seed number to its seed"""
+        if isinstance(participant, str) and self.seeds.get(participant.strip()):
+            return self.seeds[participant.strip()]
+        if isinstance(participant, str) and participant.strip() in self.seeds:
+            raise ValueError(f"More than one participant is called {participant!r}; use the seed")
+        try:
+            seed = int(participant)
+        except (TypeError, ValueError):
+            raise ValueError(f"Unknown participant {participant!r}")
+        if isinstance(participant, bool) or not 1 <= seed <= len(self.names):
+            raise ValueError(f"Unknown participant {participant!r}")
+        return seed
+
+    def apply(self, index, outcome, scored, conceded, sign):
+        """Add (sign 1) or take back (sign -1) one result for a participant and move its key"""
+        columns = self.columns
+        self.ranked.remove(self.keys[index])
+        columns[outcome][index] += sign
+        columns['points'][index] += sign * self.outcome_points[outcome]
+        columns['played'][index] += sign
+        columns['score_for'][index] += sign * scored
+        columns['score_against'][index] += sign * conceded
+        columns['difference'][index] += sign * (scored - conceded)
+        key = self.keys[index] = self.sort_key(index)
+        self.ranked.add(key)
+
+    def record(self, home, away, home_score=0, away_score=0, winner=None, retract=False):
+        """Apply one result between seeds home and away; retract takes back a result reported earlier
+
+        The outcome comes from winner ('home', 'away' or 'draw') when given,
+        otherwise from the scores.
+        """
+        self.record_all([(home, away, home_score, away_score, winner, retract)])
+
+    def record_all(self, entries):
+        """Apply (home, away, home_score, away_score, winner, retract) entries as record() does
+
+        Every entry is checked before any is applied. A retraction must
+        match a result, scores and outcome included, that was reported
+        before or earlier in the batch and not already retracted.
+        """
+        with self.lock:
+            checked = []
+            change = {}
+            for home, away, home_score, away_score, winner, retract in entries:
+                home_outcome, away_outcome = result_outcomes(home, away, home_score, away_score, winner)
+                key = result_key(home, away, home_score, away_score, home_outcome)
+                sign = -1 if retract else 1
+                count = self.reported.get(key, 0) + change.get(key, 0)
+                if retract and count < 1:
+                    raise ValueError("That result was never reported")
+                change[key] = change.get(key, 0) + sign
+                checked.append((home, away, home_score, away_score, home_outcome, away_outcome, sign))
+            for home, away, home_score, away_score, home_outcome, away_outcome, sign in checked:
+                self.apply(home - 1, home_outcome, home_score, away_score, sign)
+                self.apply(away - 1, away_outcome, away_score, home_score, sign)
+                self.results += sign
+            for key, count in change.items():
+                count += self.reported.get(key, 0)
+                if count:
+                    self.reported[key] = count
+                else:
+                    self.reported.pop(key, None)
+
+    def rank(self, seed):
+        """Rank shared by everyone with the same record (1, 2, 2, 4), and the unshared position"""
+        key = self.keys[seed - 1]
+        return self.ranked.index(key[:-1]) + 1, self.ranked.index(key) + 1
+
+    def row(self, index, position):
+        """One participant's standing as a JSON-ready dict"""
+        key = self.keys[index]
+        row = {'position': position, 'rank': self.ranked.index(key[:-1]) + 1,
+               'seed': index + 1, 'name': self.names[index]}
+        for name in COLUMNS:
+            value = self.columns[name][index]
+            row[name] = int(value) if value.is_integer() else value
+        return row
+
+    def page(self, offset, limit):
+        """Standings rows for positions offset + 1 .. offset + limit"""
+        with self.lock:
+            keys = self.ranked.slice(offset, offset + limit)
+            return [self.row(key[-1], position) for position, key in enumerate(keys, offset + 1)]
+
+    def stats(self):
+        """Size, reported results and ranking rules"""
+        return {'participants': len(self.names), 'results': self.results, 'points': self.points,
+                'tiebreakers': self.tiebreakers}
+
+
+def leaderboard_from_request(data):
+    """Create a Leaderboard from API parameters: entrants (names) or teams/players (a count), tiebreakers, points"""
+    tiebreakers = data.get('tiebreakers', DEFAULT_TIEBREAKERS)
+    if not isinstance(tiebreakers, (list, tuple)):
+        raise ValueError("tiebreakers must be a list of names")
+    points = data.get('points') or {}
+    if not isinstance(points, dict):
+        raise ValueError("points gives win, draw and loss points")
+    points = {name: request_number(points, name) for name in points}
+    return Leaderboard(request_entrants(data), tiebreakers, points)
+
+
+def results_from_request(leaderboard, data):
+    """Apply {"results": [{"home": "A", "away": "B", "home_score": 2, "away_score": 1}, ...]}
+
+    Participants are names or seeds. An entry may give winner ('home',
+    'away' or 'draw') instead of scores, and retract: true to take back a
+    result reported by mistake. Every entry is checked before any is
+    applied.
+    """
+    results = data.get('results')
+    if not isinstance(results, list) or not results:
+        raise ValueError("Send results as a list of {home, away, home_score, away_score}")
+    entries = []
+    for entry in results:
+        if not isinstance(entry, dict) or 'home' not in entry or 'away' not in entry:
+            raise ValueError("Each result needs a home and an away participant")
+        winner = entry.get('winner')
+        if winner is None and ('home_score' not in entry or 'away_score' not in entry):
+            raise ValueError("Each result needs home_score and away_score, or a winner")
+        home, away = leaderboard.seed(entry['home']), leaderboard.seed(entry['away'])
+        entries.append((home, away, request_number(entry, 'home_score', 0), request_number(entry, 'away_score', 0),
+                        winner, entry.get('retract') is True))
+    leaderboard.record_all(entries)
+    return leaderboard.stats()
+
+
+def page_from_request(leaderboard, data):
+    """Return one page of standings (offset, limit), or the page around participant when one is named"""
+    limit = min(max(1, request_number(data, 'limit', 50)), MAX_STANDINGS_PAGE)
+    result = leaderboard.stats()
+    if data.get('participant'):
+        seed = leaderboard.seed(data['participant'])
+        with leaderboard.lock:
+            _, position = leaderboard.rank(seed)
+            result['participant'] = leaderboard.row(seed - 1, position)
+        offset = max(0, position - 1 - limit // 2)
+    else:
+        offset = max(0, request_number(data, 'offset', 0))
+    result['standings'] = leaderboard.page(offset, limit)
+    return result
@@ -0,0 +1,381 @@
+import threading
+
+from fixtures import entrant_names, request_entrants, request_number
+
+WHITE = 1
+BLACK = -1
+
+# Candidates checked for a colour-compatible opponent before settling for
+# any opponent the player has not met
+COLOUR_WINDOW = 16
+
+RESULTS = {
+    '1-0': 1.0, '0-1': 0.0, '1/2-1/2': 0.5, '½-½': 0.5, '0.5-0.5': 0.5, 'draw': 0.5,
+    'white': 1.0, 'black': 0.0, 'home': 1.0, 'away': 0.0, '1': 1.0, '0': 0.0, '0.5': 0.5,
+}
+
+MAX_STANDINGS_PAGE = 1000
+
+
+class SwissPlayer:
+    """One entrant's running score, colour history and tiebreaks
+
+    games holds [opponent, points scored against them] for every reported
+    game, which is what keeps Buchholz (sum of opponents' scores) and
+    Sonneborn-Berger (sum of points scored times each opponent's score)
+    up to date as scores change.
+    """
+
+    __slots__ = ('seed', 'name', 'score', 'colours', 'played', 'games', 'byes', 'buchholz', 'sonneborn_berger')
+
+    def __init__(self, seed, name):
+        self.seed = seed
+        self.name = name
+        self.score = 0.0
+        self.colours = []
+        self.played = set()
+        self.games = []
+        self.byes = 0
+        self.buchholz = 0.0
+        self.sonneborn_berger = 0.0
+
+    def colour_preference(self):
+        """Return (colour wanted or 0, whether the preference is absolute)"""
+        balance = sum(self.colours)
+        last_two = self.colours[-2:]
+        if balance < 0 or (balance == 0 and last_two[-1:] == [BLACK]):
+            return WHITE, balance <= -2 or last_two == [BLACK, BLACK]
+        if balance > 0 or (balance == 0 and last_two[-1:] == [WHITE]):
+            return BLACK, balance >= 2 or last_two == [WHITE, WHITE]
+        return 0, False
+
+    def adjust_score(self, change):
+        """Add change to the score and pass it on to opponents' tiebreaks"""
+        self.score += change
+        for opponent, points in self.games:
+            opponent.buchholz += change
+            opponent.sonneborn_berger += (1.0 - points) * change
+
+
+class Pairing:
+    """A board in a round: white and black players and, once reported, white's points"""
+
+    __slots__ = ('board', 'white', 'black', 'result')
+
+    def __init__(self, board, white, black):
+        self.board = board
+        self.white = white
+        self.black = black
+        self.result = None
+
+
+def colours_compatible(first, second):
+    """False when both players must have the same colour"""
+    first_colour, first_absolute = first.colour_preference()
+    second_colour, second_absolute = second.colour_preference()
+    return not (first_colour and first_colour == second_colour and first_absolute and second_absolute)
+
+
+def assign_colours(board, higher, lower, round_number):
+    """Return a Pairing giving white to whoever wants it more (the higher ranked player on ties)"""
+    higher_colour, higher_absolute = higher.colour_preference()
+    lower_colour, lower_absolute = lower.colour_preference()
+    if higher_colour == lower_colour:
+        if higher_colour == 0:
+            # Nobody has a preference (round one): alternate down the boards
+            higher_white = (board + round_number) % 2 == 0
+        elif higher_absolute != lower_absolute:
+            higher_white = (higher_colour == WHITE) == higher_absolute
+        else:
+            higher_white = higher_colour == WHITE
+    else:
+        higher_white = higher_colour == WHITE or lower_colour == BLACK
+    return Pairing(board, higher, lower) if higher_white else Pairing(board, lower, higher)
+
+
+def pair_bracket(bracket):
+    """Pair one score bracket top half against bottom half; return (pairs, unpaired)
+
+    Each player in the top half takes the first player from the bottom half,
+    in order, they have not met and whose colour needs fit, looking
+    COLOUR_WINDOW candidates ahead before accepting a colour clash.
+    Players left over float down into the next bracket.
+    """
+    half = len(bracket) // 2
+    top = bracket[:half]
+    # Reversed so the preferred candidate is popped from the end of the list
+    bottom = bracket[half:][::-1]
+    pairs, unpaired = [], []
+    for player in top:
+        chosen = fallback = None
+        for index in range(len(bottom) - 1, -1, -1):
+            candidate = bottom[index]
+            if candidate.seed in player.played:
+                continue
+            if colours_compatible(player, candidate):
+                chosen = index
+                break
+            if fallback is None:
+                fallback = index
+            if len(bottom) - index >= COLOUR_WINDOW:
+                break
+        if chosen is None:
+            chosen = fallback
+        if chosen is None:
+            unpaired.append(player)
+        else:
+            pairs.append((player, bottom.pop(chosen)))
+    unpaired.extend(reversed(bottom))
+    return pairs, unpaired
+
+
+def repair(pairs, unpaired):
+    """Pair the players left at the bottom, breaking up earlier pairs instead of allowing rematches
+
+    Returns the number of rematches that could not be avoided.
+    """
+    rematches = 0
+    while len(unpaired) >= 2:
+        player = unpaired.pop(0)
+        partner = next((other for other in unpaired if other.seed not in player.played), None)
+        if partner is not None:
+            unpaired.remove(partner)
+            pairs.append((player, partner))
+            continue
+        swapped = False
+        # Try trading places with a recent pair: player takes one side, another leftover the other
+        for index in range(len(pairs) - 1, -1, -1):
+            first, second = pairs[index]
+            for other in unpaired:
+                if first.seed not in player.played and second.seed not in other.played:
+                    pairs[index] = (first, player)
+                    pairs.append((second, other))
+                elif second.seed not in player.played and first.seed not in other.played:
+                    pairs[index] = (second, player)
+                    pairs.append((first, other))
+                else:
+                    continue
+                unpaired.remove(other)
+                swapped = True
+                break
+            if swapped:
+                break
+        if not swapped:
+            pairs.append((player, unpaired.pop(0)))
+            rematches += 1
+    return rematches
+
+
+def result_points(result):
+    """White's points for a result: 1, 0.5, 0, "1-0", "0-1" or "1/2-1/2"; ValueError otherwise"""
+    points = RESULTS.get(result.strip().lower()) if isinstance(result, str) else result
+    if points not in (0, 0.5, 1):
+        raise ValueError(f"Unknown result {result!r}; use 1-0, 0-1 or 1/2-1/2")
+    return points
+
+
+class SwissTournament:
+    """Swiss-system pairing with incrementally maintained standings
+
+    Each round pairs players within score groups (highest first), top half
+    against bottom half, avoiding rematches and balancing colours; players
+    who cannot be paired in their group float down to the next one. With
+    an odd number of players the lowest ranked player without a bye gets
+    one (a win, no opponent). Reporting a result updates scores, Buchholz
+    and Sonneborn-Berger in O(rounds) time rather than recomputing the
+    table.
+    """
+
+    def __init__(self, entrants, rounds=None):
+        self.players = [SwissPlayer(seed, name) for seed, name in enumerate(entrant_names(entrants), 1)]
+        self.planned_rounds = rounds
+        self.rounds = []
+        self.byes = []
+        self.missing = 0
+        self.rematches = 0
+        self.lock = threading.Lock()
+
+    def ranking(self):
+        """Players by score, then seed: the order pairing works through"""
+        return sorted(self.players, key=lambda player: (-player.score, player.seed))
+
+    def pair_round(self):
+        """Pair the next round; return (pairings, bye player or None)"""
+        with self.lock:
+            if self.missing:
+                raise ValueError(f"{self.missing} results from round {len(self.rounds)} are still missing")
+            if self.planned_rounds is not None and len(self.rounds) >= self.planned_rounds:
+                raise ValueError(f"All {self.planned_rounds} rounds have been paired")
+            round_number = len(self.rounds) + 1
+            ranked = self.ranking()
+
+            bye = None
+            if len(ranked) % 2:
+                bye = next((player for player in reversed(ranked) if not player.byes), ranked[-1])
+                ranked.remove(bye)
+                bye.byes += 1
+                bye.adjust_score(1.0)
+
+            pairs, floaters, start = [], [], 0
+            while start < len(ranked):
+                end = start
+                score = ranked[start].score
+                while end < len(ranked) and ranked[end].score == score:
+                    end += 1
+                bracket_pairs, floaters = pair_bracket(floaters + ranked[start:end])
+                pairs += bracket_pairs
+                start = end
+            self.rematches += repair(pairs, floaters)
+
+            pairings = []
+            for board, (higher, lower) in enumerate(pairs, 1):
+                pairing = assign_colours(board, higher, lower, round_number)
+                pairing.white.colours.append(WHITE)
+                pairing.black.colours.append(BLACK)
+                pairing.white.played.add(pairing.black.seed)
+                pairing.black.played.add(pairing.white.seed)
+                pairings.append(pairing)
+            self.rounds.append(pairings)
+            self.byes.append(bye)
+            self.missing = len(pairings)
+            return pairings, bye
+
+    def report(self, board, result, round_number=None):
+        """Record white's points (1, 0.5, 0 or "1-0"/"0-1"/"1/2-1/2") on a board; re-reporting corrects it"""
+        self.report_all([(board, result, round_number)])
+
+    def report_all(self, entries):
+        """Record (board, result, round_number) entries as report() does; all are checked before any is applied"""
+        with self.lock:
+            checked = [(self.find_board(board, round_number), result_points(result))
+                       for board, result, round_number in entries]
+            for (round_number, pairing), points in checked:
+                white, black = pairing.white, pairing.black
+                if pairing.result is not None:
+                    self.unrecord(white, black, pairing.result)
+                elif round_number == len(self.rounds):
+                    self.missing -= 1
+                pairing.result = float(points)
+                self.record(white, black, pairing.result)
+
+    def find_board(self, board, round_number=None):
+        """Return (round_number, pairing) for a board, the latest round by default (lock held)"""
+        if not self.rounds:
+            raise ValueError("No round has been paired yet")
+        round_number = round_number or len(self.rounds)
+        if not 1 <= round_number <= len(self.rounds):
+            raise ValueError(f"round must be between 1 and {len(self.rounds)}")
+        pairings = self.rounds[round_number - 1]
+        if not 1 <= board <= len(pairings):
+            raise ValueError(f"board must be between 1 and {len(pairings)}")
+        return round_number, pairings[board - 1]
+
+    def record(self, white, black, points):
+        """Add a game: each side's tiebreaks count the other's current score, then scores move"""
+        white.buchholz += black.score
+        black.buchholz += white.score
+        white.sonneborn_berger += points * black.score
+        black.sonneborn_berger += (1.0 - points) * white.score
+        white.games.append([black, points])
+        black.games.append([white, 1.0 - points])
+        white.adjust_score(points)
+        black.adjust_score(1.0 - points)
+
+    def unrecord(self, white, black, points):
+        """Undo record() so a corrected result can be entered"""
+        white.adjust_score(-points)
+        black.adjust_score(points - 1.0)
+        white.games.remove([black, points])
+        black.games.remove([white, 1.0 - points])
+        white.buchholz -= black.score
+        black.buchholz -= white.score
+        white.sonneborn_berger -= points * black.score
+        black.sonneborn_berger -= (1.0 - points) * white.score
+
+    def standings(self):
+        """Players ranked by score, Buchholz, Sonneborn-Berger, then seed"""
+        with self.lock:
+            return sorted(self.players, key=lambda player: (-player.score, -player.buchholz,
+                                                            -player.sonneborn_berger, player.seed))
+
+    def stats(self):
+        """Return the tournament's progress"""
+        with self.lock:
+            return {
+                'players': len(self.players),
+                'rounds_paired': len(self.rounds),
+                'planned_rounds': self.planned_rounds,
+                'results_missing': self.missing,
+                'rematches': self.rematches,
+            }
+
+
+def player_json(player):
+    """Return a player's seed and name"""
+    return {'seed': player.seed, 'name': player.name}
+
+
+def pairings_json(round_number, pairings, bye):
+    """Return a round's boards and bye as a JSON-ready dict"""
+    return {
+        'round': round_number,
+        'pairings': [{'board': pairing.board, 'white': player_json(pairing.white),
+                      'black': player_json(pairing.black), 'result': pairing.result} for pairing in pairings],
+        'bye': None if bye is None else player_json(bye),
+    }
+
+
+def standings_json(players, offset=0, limit=50):
+    """Return one page of standings as JSON-ready dicts"""
+    return [dict(player_json(player), rank=rank, score=player.score, buchholz=player.buchholz,
+                 sonneborn_berger=player.sonneborn_berger, games=len(player.games), byes=player.byes)
+            for rank, player in enumerate(players[offset:offset + limit], offset + 1)]
+
+
+def swiss_from_request(data):
+    """Create a SwissTournament from API parameters: entrants (names) or players (a count), optional rounds"""
+    rounds = None
+    if data.get('rounds') is not None:
+        rounds = request_number(data, 'rounds')
+        if rounds < 1:
+            raise ValueError("rounds must be at least 1")
+    return SwissTournament(request_entrants(data), rounds)
+
+
+def round_from_request(tournament, data):
+    """Return progress and the latest round's boards"""
+    with tournament.lock:
+        latest = len(tournament.rounds)
+        current = pairings_json(latest, tournament.rounds[-1], tournament.byes[-1]) if latest else None
+    return dict(tournament.stats(), current_round=current)
+
+
+def pair_from_request(tournament, data):
+    """Pair the next round and return its boards"""
+    pairings, bye = tournament.pair_round()
+    return pairings_json(len(tournament.rounds), pairings, bye)
+
+
+def report_from_request(tournament, data):
+    """Apply {"results": [{"board": 1, "result": "1-0", "round": 2}, ...]}; round defaults to the latest
+
+    Every entry is checked before any is applied.
+    """
+    results = data.get('results')
+    if not isinstance(results, list) or not results:
+        raise ValueError("Send results as a list of {board, result}")
+    entries = []
+    for entry in results:
+        if not isinstance(entry, dict) or 'board' not in entry or 'result' not in entry:
+            raise ValueError("Each result needs a board and a result")
+        round_number = request_number(entry, 'round') if entry.get('round') is not None else None
+        entries.append((request_number(entry, 'board'), entry['result'], round_number))
+    tournament.report_all(entries)
+    return tournament.stats()
+
+
+def standings_from_request(tournament, data):
+    """Return progress and one page of standings (offset, limit)"""
+    offset = max(0, request_number(data, 'offset', 0))
+    limit = min(max(1, request_number(data, 'limit', 50)), MAX_STANDINGS_PAGE)
+    return dict(tournament.stats(), standings=standings_json(tournament.standings(), offset, limit))
@@ -0,0 +1,118 @@
+import pytest
+import requests
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def client(clock, make_client):
+    """A client without retries behind a breaker that opens after 3 failures for 10 s"""
+    breaker = CircuitBreaker(failure_threshold=3, window=30, recovery_time=10, clock=clock)
+    return make_client(max_retries=0, read_timeout=0.2, breaker=breaker)
+
+
+def states(breaker):
+    """The breaker's transitions as (from, to) pairs"""
+    return [(t['from'], t['to']) for t in breaker.stats()['transitions']]
+
+
+def test_stays_closed_while_healthy(stub, payload, client):
+    for _ in range(5):
+        response, _ = client.post(stub.url, payload)
+        assert response.status_code == 200
+    assert client.breaker.state == CLOSED
+    assert states(client.breaker) == []
+
+
+def test_opens_after_threshold_failures(stub, payload, client):
+    stub.mode = 'failing'
+    for _ in range(3):
+        response, _ = client.post(stub.url, payload)
+        assert response.status_code == 500
+    assert client.breaker.state == OPEN
+    assert stub.requests == 3
+
+    with pytest.raises(CircuitOpen):
+        client.post(stub.url, payload)
+    assert stub.requests == 3
+    assert client.breaker.stats()['rejected'] == 1
+    assert client.breaker.stats()['retry_in'] == 10
+
+
+def test_timeouts_count_as_failures(stub, payload, client):
+    stub.latency = 0.5
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.post(stub.url, payload)
+    assert client.breaker.state == OPEN
+
+
+def test_failures_outside_the_window_are_forgotten(stub, payload, clock, client):
+    stub.mode = 'failing'
+    for _ in range(2):
+        client.post(stub.url, payload)
+    clock.now += 31
+    client.post(stub.url, payload)
+    assert client.breaker.state == CLOSED
+    assert client.breaker.stats()['recent_failures'] == 1
+
+
+def test_successful_probe_closes(stub, payload, clock, client):
+    stub.mode = 'failing'
+    for _ in range(3):
+        client.post(stub.url, payload)
+    stub.mode = 'healthy'
+
+    clock.now += 9
+    with pytest.raises(CircuitOpen):
+        client.post(stub.url, payload)
+    clock.now += 1
+    response, _ = client.post(stub.url, payload)
+    assert response.status_code == 200
+    assert client.breaker.state == CLOSED
+    assert states(client.breaker) == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+    assert stub.requests == 4
+
+
+def test_failed_probe_reopens(stub, payload, clock, client):
+    stub.mode = 'failing'
+    for _ in range(3):
+        client.post(stub.url, payload)
+
+    clock.now += 10
+    response, _ = client.post(stub.url, payload)
+    assert response.status_code == 500
+    assert client.breaker.state == OPEN
+    assert states(client.breaker) == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, OPEN)]
+    with pytest.raises(CircuitOpen):
+        client.post(stub.url, payload)
+    assert stub.requests == 4
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=10, clock=clock)
+    breaker.record_failure('test')
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
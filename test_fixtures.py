@@ -0,0 +1,31 @@
+import pytest
+
+from fixtures import bracket_size, group_knockout
+
+
+def first_knockout_round(fixtures):
+    """The matches of the knockout's first round"""
+    knockout = next(stage for stage in fixtures.stages if stage.name == 'Knockout')
+    return knockout.rounds[0]
+
+
+@pytest.mark.parametrize('group_count', range(2, 11))
+def test_group_winners_meet_runners_up_from_other_groups(group_count):
+    matches = first_knockout_round(group_knockout(4 * group_count))
+    for match in matches:
+        assert match.home.group != match.away.group
+    # A winner never meets another winner, so runners-up only meet each
+    # other once every winner without a bye has a runner-up to play
+    assert all(1 not in (match.home.place, match.away.place) or match.home.place != match.away.place
+               for match in matches)
+
+
+@pytest.mark.parametrize('group_count', range(2, 11))
+def test_byes_go_to_group_winners(group_count):
+    qualifiers = 2 * group_count
+    matches = first_knockout_round(group_knockout(4 * group_count))
+    playing = [side for match in matches for side in (match.home, match.away)]
+    assert len(playing) == len(set(playing))
+    byes = bracket_size(qualifiers) - qualifiers
+    assert len(playing) == qualifiers - byes
+    assert sum(1 for side in playing if side.place == 1) == group_count - min(byes, group_count)
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import app
+import async_app
+
+# Routes taking a JSON object body, with a body each accepts
+ROUTES = [
+    ('/api/chat', {'message': 'hello'}),
+    ('/api/chat/stream', {'message': 'hello'}),
+    ('/api/chat/batch', {'messages': ['hello']}),
+    ('/api/fixtures', {'format': 'round_robin', 'teams': 4}),
+    ('/api/schedule', {'format': 'round_robin', 'teams': 4}),
+    ('/api/swiss', {'players': 4}),
+    ('/api/standings', {'teams': 4}),
+]
+RESULT_ROUTES = [
+    ('/api/swiss', {'players': 4}, '/api/swiss/{}/results'),
+    ('/api/standings', {'teams': 4}, '/api/standings/{}/results'),
+]
+# Bodies that are not a JSON object
+BAD_BODIES = [b'[1, 2]', b'"hello"', b'42', b'{"message": ', b'null']
+
+
+def test_json_object():
+    assert app.json_object(b'') == {}
+    assert app.json_object(b' \n') == {}
+    assert app.json_object(b'{"a": 1}') == {'a': 1}
+    for body in BAD_BODIES:
+        with pytest.raises(ValueError):
+            app.json_object(body)
+
+
+@pytest.fixture
+def flask_client():
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize('path, good', ROUTES)
+@pytest.mark.parametrize('body', BAD_BODIES)
+def test_flask_rejects_bodies_that_are_not_objects(flask_client, path, good, body):
+    response = flask_client.post(path, data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Send a JSON object'}
+
+
+@pytest.mark.parametrize('path, good', ROUTES)
+def test_flask_accepts_objects(flask_client, path, good):
+    assert flask_client.post(path, json=good).status_code in (200, 201)
+
+
+@pytest.mark.parametrize('create, good, path', RESULT_ROUTES)
+def test_flask_result_reports_reject_bodies_that_are_not_objects(flask_client, create, good, path):
+    created = flask_client.post(create, json=good).get_json()
+    response = flask_client.post(path.format(created['id']), data=b'[]', content_type='application/json')
+    assert response.status_code == 400
+
+
+def run_async(check):
+    """Run check(client) against the aiohttp app"""
+    async def main():
+        async with TestClient(TestServer(async_app.create_app())) as client:
+            await check(client)
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('path, good', ROUTES)
+def test_aiohttp_rejects_bodies_that_are_not_objects(path, good):
+    async def check(client):
+        for body in BAD_BODIES:
+            response = await client.post(path, data=body, headers={'Content-Type': 'application/json'})
+            assert response.status == 400
+            assert await response.json() == {'error': 'Send a JSON object'}
+        response = await client.post(path, json=good)
+        assert response.status in (200, 201)
+    run_async(check)
+
+
+@pytest.mark.parametrize('create, good, path', RESULT_ROUTES)
+def test_aiohttp_result_reports_reject_bodies_that_are_not_objects(create, good, path):
+    async def check(client):
+        created = await (await client.post(create, json=good)).json()
+        response = await client.post(path.format(created['id']), data=b'[]',
+                                     headers={'Content-Type': 'application/json'})
+        assert response.status == 400
+    run_async(check)
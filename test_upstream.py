@@ -0,0 +1,97 @@
+import pytest
+import requests
+
+from upstream import iter_tokens
+
+
+def test_success_takes_one_attempt(stub, payload, make_client):
+    response, timing = make_client().post(stub.url, payload)
+    assert response.status_code == 200
+    assert response.json()[0]['generated_text']
+    assert timing.attempts == 1
+    assert timing.status == 200
+    assert timing.backoff == 0
+    assert stub.requests == 1
+
+
+def test_connections_are_reused(stub, payload, make_client):
+    client = make_client(pool_size=1)
+    for _ in range(10):
+        client.post(stub.url, payload)
+    assert stub.requests == 10
+    assert len(stub.connections) == 1
+
+
+def test_loading_responses_are_retried_with_backoff(stub, payload, make_client):
+    stub.loading_responses = 2
+    response, timing = make_client(max_retries=2).post(stub.url, payload)
+    assert response.status_code == 200
+    assert timing.attempts == 3
+    assert 0 <= timing.backoff <= 2 * 0.02
+    assert stub.requests == 3
+
+
+def test_backoff_waits_for_the_loading_estimate(stub, payload, make_client):
+    stub.loading_responses = 1
+    stub.estimated_time = 0.2
+    client = make_client(backoff_max=0.01)
+    delays = []
+    original = client.backoff_delay
+
+    def recorded(attempt, response=None):
+        delay = original(attempt, response)
+        delays.append(delay)
+        return delay
+    client.backoff_delay = recorded
+    response, timing = client.post(stub.url, payload)
+    assert response.status_code == 200
+    assert len(delays) == 1
+    assert 0 <= delays[0] <= 0.2
+    assert timing.backoff == delays[0]
+
+
+def test_retries_stop_at_the_limit(stub, payload, make_client):
+    stub.loading_responses = 5
+    response, timing = make_client(max_retries=2).post(stub.url, payload)
+    assert response.status_code == 503
+    assert timing.attempts == 3
+    assert timing.status == 503
+    assert stub.requests == 3
+
+
+def test_server_errors_are_not_retried(stub, payload, make_client):
+    stub.mode = 'failing'
+    response, timing = make_client(max_retries=2).post(stub.url, payload)
+    assert response.status_code == 500
+    assert timing.attempts == 1
+    assert stub.requests == 1
+
+
+def test_read_timeouts_are_not_retried(stub, payload, make_client):
+    stub.latency = 0.5
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        make_client(read_timeout=0.1, max_retries=2).post(stub.url, payload)
+    assert stub.requests == 1
+
+
+def test_connection_errors_are_retried(stub, payload, make_client):
+    url = stub.url
+    stub.shutdown()
+    stub.server_close()
+    client = make_client(max_retries=2, connect_timeout=0.5)
+    attempts = []
+    post = client.session.post
+
+    def counted(*args, **kwargs):
+        attempts.append(1)
+        return post(*args, **kwargs)
+    client.session.post = counted
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post(url, payload)
+    assert len(attempts) == 3
+
+
+def test_stream_yields_every_token(stub, payload, make_client):
+    response, timing = make_client().post(stub.url, dict(payload, stream=True), stream=True)
+    assert timing.attempts == 1
+    assert ''.join(iter_tokens(response)) == stub.text
@@ -0,0 +1,161 @@
+import json
+import random
+import time
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from breaker import CircuitOpen
+
+# Statuses that mean the request never reached a model worker (or the model
+# is still loading), so sending it again cannot duplicate a generation
+RETRY_STATUSES = frozenset([502, 503, 504])
+
+UpstreamTiming = namedtuple('UpstreamTiming', ['attempts', 'elapsed', 'backoff', 'status'])
+
+
+def jittered_backoff(attempt, base, maximum, estimated_time=0):
+    """Full-jitter exponential backoff, stretched by a model loading estimate"""
+    ceiling = min(maximum, max(base * (2 ** attempt), estimated_time))
+    return random.uniform(0, ceiling)
+
+
+def parse_stream_line(line):
+    """Return the token text carried by one server-sent event line, or None
+
+    Events look like data:{"token": {"text": ..., "special": false}, ...};
+    special tokens such as </s> carry no text for the user.
+    """
+    if not line.startswith('data:'):
+        return None
+    event = json.loads(line[5:])
+    if 'error' in event:
+        raise ValueError(event['error'])
+    token = event.get('token') or {}
+    if token.get('text') and not token.get('special'):
+        return token['text']
+    return None
+
+
+class InferenceClient:
+    """Shared keep-alive HTTP client for the inference API
+
+    One requests.Session backs every call, so TCP and TLS connections are
+    reused across requests instead of being set up per message. Only
+    retry-safe failures are retried: connection errors, and 502/503/504
+    responses (503 is what Hugging Face returns while a model is loading).
+    Read timeouts are not retried because the generation may still be
+    running upstream. With a circuit breaker, calls fail fast with
+    CircuitOpen while the upstream is considered down.
+    """
+
+    def __init__(self, api_key, pool_size=16, connect_timeout=3.05, read_timeout=20,
+                 max_retries=2, backoff_base=0.5, backoff_max=4.0, breaker=None):
+        self.breaker = breaker
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+        # Size the pool to the number of requests we may have in flight at once;
+        # pool_block makes extra callers wait for a connection instead of
+        # opening throwaway ones
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def backoff_delay(self, attempt, response=None):
+        """Backoff before the next attempt, honouring a 503 loading estimate"""
+        estimated = 0
+        if response is not None:
+            try:
+                estimated = float(response.json().get('estimated_time', 0))
+            except (ValueError, AttributeError):
+                pass
+        return jittered_backoff(attempt, self.backoff_base, self.backoff_max, estimated)
+
+    def post(self, url, payload, stream=False):
+        """POST a JSON payload, retrying safe failures; returns (response, timing)
+
+        With stream set, the call returns once headers arrive and the body is
+        left unread for iter_tokens(). Raises the last requests exception if
+        every attempt failed without a response, or CircuitOpen without
+        trying while the breaker is open.
+        """
+        if self.breaker is None:
+            return self.post_with_retries(url, payload, stream)
+        if not self.breaker.allow():
+            raise CircuitOpen(f"upstream circuit open, not calling {url}")
+
+        outcome = None
+        try:
+            response, timing = self.post_with_retries(url, payload, stream)
+            outcome = response.status_code == 200 or f"status {response.status_code}"
+            return response, timing
+        except requests.exceptions.RequestException as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            record_outcome(self.breaker, outcome)
+
+    def post_with_retries(self, url, payload, stream=False):
+        """The retry loop behind post(), without the circuit breaker"""
+        start = time.perf_counter()
+        backoff = 0.0
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, json=payload, stream=stream,
+                                             timeout=(self.connect_timeout, self.read_timeout))
+            except requests.exceptions.ConnectionError:
+                # Connect failures (ConnectTimeout included) and sockets the
+                # server dropped before answering, such as a stale keep-alive
+                # connection; ReadTimeout is not a ConnectionError
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    timing = UpstreamTiming(attempt + 1, time.perf_counter() - start, backoff, response.status_code)
+                    return response, timing
+                delay = self.backoff_delay(attempt, response)
+                response.close()
+
+            time.sleep(delay)
+            backoff += delay
+            attempt += 1
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+def record_outcome(breaker, outcome):
+    """Report a call to the breaker: True for success, a failure reason, or None if abandoned"""
+    if outcome is True:
+        breaker.record_success()
+    elif outcome:
+        breaker.record_failure(outcome)
+    else:
+        breaker.release()
+
+
+def iter_tokens(response, parse_line=parse_stream_line):
+    """Yield generated text from a server-sent event stream, parsing each line with parse_line"""
+    if response.encoding is None:
+        response.encoding = 'utf-8'
+    try:
+        for line in response.iter_lines(decode_unicode=True):
+            text = parse_line(line) if line else None
+            if text:
+                yield text
+    finally:
+        response.close()